@@ -1,14 +1,32 @@
-from flask import Flask, request, jsonify, send_file
+import time
+_import_started = time.perf_counter()
+
+from flask import Flask, Response, g, request, jsonify, send_file
 from flask_cors import CORS
-import joblib
-import json
-import pandas as pd
 import numpy as np
-import bcrypt
-import jwt
 import datetime
 from functools import wraps
+import atexit
+import math
 import os
+import secrets
+import threading
+
+# bcrypt (see password_hasher) and jwt are only needed on the auth paths and the inference pool
+# only when enabled; they are imported where used to keep cold start short
+from ask_next import rank_questions
+from catalog_responses import CatalogResponses
+from micro_batcher import MicroBatcher
+from model_artifact import current_artifact_name, prune_artifacts, publish_artifact, switch_artifact
+from model_bundle import BUNDLE_FILES, load_bundle
+from password_hasher import DEFAULT_ROUNDS, HasherBusy, PasswordHasher
+from prediction_cache import PredictionCache
+from rate_limiter import DEFAULT_LIMITS, RateLimiter, parse_limits
+from report_stats import MAX_DAYS
+from report_store import open_store
+from retrain_jobs import RetrainJobs
+from symptom_bitset import SymptomBitset
+from token_cache import TokenCache, token_digest
 
 app = Flask(__name__)
 CORS(app)
@@ -16,47 +34,234 @@ CORS(app)
 # Secret key for JWT
 app.config['SECRET_KEY'] = 'diagno-ai-secret-key-2025'
 
-# In-memory storage (no database)
-users = {}
-user_reports = {}
+# Verified JWTs remembered until their exp (see token_cache)
+app.config['TOKEN_CACHE_MAX_ENTRIES'] = int(os.environ.get('DIAGNO_TOKEN_CACHE_MAX_ENTRIES', '4096'))
+
+# Opt-in token-bucket limits per client (JWT username, else IP) on the
+# CPU-heavy routes; DIAGNO_RATE_LIMITS overrides budgets, e.g. 'predict=20:40'
+app.config['RATE_LIMIT_ENABLED'] = os.environ.get('DIAGNO_RATE_LIMIT', '0') == '1'
+app.config['RATE_LIMITS'] = {**DEFAULT_LIMITS, **parse_limits(os.environ.get('DIAGNO_RATE_LIMITS'))}
+
+# Where accounts and saved reports live: 'sqlite' (persistent, WAL),
+# 'journal' (NDJSON journal + snapshot, no database) or 'memory' (lost on
+# restart; for tests and benchmarks)
+app.config['REPORT_STORE'] = os.environ.get('DIAGNO_REPORT_STORE', 'sqlite')
+app.config['REPORT_DB_PATH'] = os.environ.get('DIAGNO_REPORT_DB', '../data/diagno.db')
+app.config['REPORT_COMMIT_BATCH'] = int(os.environ.get('DIAGNO_REPORT_COMMIT_BATCH', '64'))
+app.config['REPORT_COMMIT_WAIT_MS'] = float(os.environ.get('DIAGNO_REPORT_COMMIT_WAIT_MS', '0'))
+app.config['REPORT_POOL_SIZE'] = int(os.environ.get('DIAGNO_REPORT_POOL_SIZE', '8'))
+app.config['REPORT_JOURNAL_DIR'] = os.environ.get('DIAGNO_REPORT_JOURNAL', '../data/journal')
+app.config['REPORT_SNAPSHOT_EVERY'] = int(os.environ.get('DIAGNO_REPORT_SNAPSHOT_EVERY', '100000'))
+
+# Prediction cache bounds (entries and approximate bytes)
+app.config['PREDICTION_CACHE_MAX_ENTRIES'] = 4096
+app.config['PREDICTION_CACHE_MAX_BYTES'] = 8 * 1024 * 1024
+
+# 'numpy' scores with the exported SVC parameters, 'sklearn' with the pickle
+app.config['INFERENCE_ENGINE'] = os.environ.get('DIAGNO_INFERENCE_ENGINE', 'numpy')
+
+# Opt-in micro-batching of concurrent /predict calls (useful under threaded servers)
+app.config['MICRO_BATCH_ENABLED'] = os.environ.get('DIAGNO_MICRO_BATCH', '0') == '1'
+app.config['MICRO_BATCH_WAIT_MS'] = float(os.environ.get('DIAGNO_MICRO_BATCH_WAIT_MS', '2'))
+app.config['MICRO_BATCH_MAX_SIZE'] = int(os.environ.get('DIAGNO_MICRO_BATCH_MAX_SIZE', '32'))
+
+# Worker processes scoring against one memory-mapped model copy (0 = in-process)
+app.config['INFERENCE_WORKERS'] = int(os.environ.get('DIAGNO_INFERENCE_WORKERS', '0'))
+
+# Load the model in a background thread so the process answers /health (and
+# 503s on model routes) immediately; /ready turns 200 once the model is resident
+app.config['BACKGROUND_MODEL_LOAD'] = os.environ.get('DIAGNO_BACKGROUND_LOAD', '0') == '1'
+
+# Browser cache lifetime of the pre-rendered catalog responses; clients
+# revalidate with If-None-Match afterwards (a retrain changes the ETags)
+app.config['CATALOG_MAX_AGE'] = int(os.environ.get('DIAGNO_CATALOG_MAX_AGE', '300'))
+
+# bcrypt cost factor and the pool that runs it off the request threads
+# (0 workers = hash inline). Stored hashes with another cost are rehashed on login.
+app.config['BCRYPT_ROUNDS'] = int(os.environ.get('DIAGNO_BCRYPT_ROUNDS', str(DEFAULT_ROUNDS)))
+app.config['HASH_WORKERS'] = int(os.environ.get('DIAGNO_HASH_WORKERS', '1'))
+app.config['HASH_MAX_QUEUE'] = int(os.environ.get('DIAGNO_HASH_MAX_QUEUE', '32'))
+app.config['HASH_QUEUE_TIMEOUT'] = float(os.environ.get('DIAGNO_HASH_QUEUE_TIMEOUT', '5'))
+
+# User accounts and saved reports (see report_store)
+store_path, store_options = None, {}
+if app.config['REPORT_STORE'] == 'sqlite':
+    store_path = app.config['REPORT_DB_PATH']
+    store_options = {'commit_batch_size': app.config['REPORT_COMMIT_BATCH'],
+                     'commit_wait_ms': app.config['REPORT_COMMIT_WAIT_MS'],
+                     'pool_size': app.config['REPORT_POOL_SIZE']}
+elif app.config['REPORT_STORE'] == 'journal':
+    store_path = app.config['REPORT_JOURNAL_DIR']
+    store_options = {'fsync_batch_size': app.config['REPORT_COMMIT_BATCH'],
+                     'fsync_wait_ms': app.config['REPORT_COMMIT_WAIT_MS'],
+                     'snapshot_every': app.config['REPORT_SNAPSHOT_EVERY']}
+report_store = open_store(app.config['REPORT_STORE'], store_path, **store_options)
+atexit.register(report_store.close)
+
+# Symptom lists of every codec a stored report was packed with, so reports
+# decode even before the model loads or after a retrain changed the columns
+for stored_symptom_list in report_store.load_codecs().values():
+    SymptomBitset.for_symptoms(stored_symptom_list)
+
+password_hasher = PasswordHasher(app.config['BCRYPT_ROUNDS'], app.config['HASH_WORKERS'],
+                                 app.config['HASH_MAX_QUEUE'], app.config['HASH_QUEUE_TIMEOUT'])
+atexit.register(password_hasher.close)
 
 # Load model and data
-MODEL_PATH = '../models/disease_model.pkl'
-SYMPTOMS_PATH = '../models/symptom_list.json'
-DISEASE_INFO_PATH = '../models/disease_info.json'
-DISEASE_SYMPTOMS_PATH = '../models/disease_symptoms.json'
-METRICS_PATH = '../models/model_metrics.json'
-
-# Load model components
-print("Loading AI Model...")
-model = joblib.load(MODEL_PATH)
-with open(SYMPTOMS_PATH, 'r') as f:
-    symptom_list = json.load(f)
-with open(DISEASE_INFO_PATH, 'r') as f:
-    disease_info = json.load(f)
-
-try:
-    with open(DISEASE_SYMPTOMS_PATH, 'r') as f:
-        disease_symptoms = json.load(f)
-except Exception:
-    disease_symptoms = {}
-with open(METRICS_PATH, 'r') as f:
-    model_metrics = json.load(f)
-print("✓ Model loaded successfully!")
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+MODELS_DIR = '../models'
+
+# The inference pool is started before the model is loaded so the forked
+# workers never hold a copy of it; they map the shared arrays instead
+inference_pool = None
+if app.config['INFERENCE_WORKERS'] > 0:
+    from inference_pool import InferencePool
+    inference_pool = InferencePool(app.config['INFERENCE_WORKERS'])
+    inference_pool.warm()
+    atexit.register(inference_pool.close)
+
+def attach_inference_pool(bundle):
+    """Route the bundle's scoring to the worker pool (NumPy engine only)"""
+    if inference_pool is None:
+        return bundle
+    if bundle.engine != 'numpy':
+        print("⚠ Inference pool needs the NumPy SVC export, scoring in-process")
+        return bundle
+    bundle.predictor = inference_pool.predictor_for(bundle.predictor, bundle.version)
+    return bundle
+
+def prepare_bundle(bundle):
+    """Attach the worker pool, pre-render the catalog responses of a new bundle
+    and persist its symptom codec (reports are packed with it)"""
+    bundle = attach_inference_pool(bundle)
+    bundle.catalog = CatalogResponses(bundle)
+    report_store.save_codec(bundle.bitset.codec_id, bundle.symptom_list)
+    return bundle
+
+# Load model components. The model, symptom list, disease info and metrics
+# live in one ModelBundle; handlers read `active_bundle` once per request and
+# retraining replaces it as a whole (see install_bundle).
+active_bundle = None
+bundle_swap_lock = threading.Lock()
+model_ready = threading.Event()
+startup_status = {'model_load_error': None}
+
+def load_initial_bundle():
+    """Load the first bundle and signal readiness"""
+    global active_bundle
+    print("Loading AI Model...")
+    started = time.perf_counter()
+    try:
+        active_bundle = prepare_bundle(
+            load_bundle(MODELS_DIR, version=1, inference_engine=app.config['INFERENCE_ENGINE']))
+    except Exception as e:
+        startup_status['model_load_error'] = str(e)
+        print(f"✗ Model loading failed: {e}")
+        raise
+    startup_status['model_load_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    startup_status['ready_after_ms'] = round((time.perf_counter() - _import_started) * 1000, 1)
+    print("✓ Model loaded successfully!")
+    model_ready.set()
+
+if app.config['BACKGROUND_MODEL_LOAD']:
+    threading.Thread(target=load_initial_bundle, name='model-loader', daemon=True).start()
+else:
+    load_initial_bundle()
+
+MAX_BATCH_SIZE = 1000
+MAX_SUGGESTIONS = 50
+MAX_QUESTIONS = 20
+MAX_REPORT_PAGE = 100
+# /get-reports query arguments that select reports (the rest only page them)
+REPORT_FILTERS = ('disease', 'start', 'end')
+
+# Probability rows for recently seen symptom sets, keyed by (bundle version,
+# symptom bit mask); flushed when a new bundle is installed
+prediction_cache = PredictionCache(app.config['PREDICTION_CACHE_MAX_ENTRIES'],
+                                   app.config['PREDICTION_CACHE_MAX_BYTES'])
+
+# Routes that work before the model is resident; every other route answers
+# 503 until model_ready is set
+MODEL_FREE_ENDPOINTS = {'home', 'health', 'ready', 'signup', 'login', 'logout', 'save_report',
+                        'get_reports', 'cache_stats', 'batcher_stats', 'hasher_stats',
+                        'token_cache_stats', 'rate_limit_stats', 'store_stats', 'get_report_stats'}
+
+@app.before_request
+def require_model():
+    if model_ready.is_set() or request.endpoint in MODEL_FREE_ENDPOINTS or request.method == 'OPTIONS':
+        return None
+    response = jsonify({'success': False, 'message': 'Model is still loading, please retry shortly.'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
+# Tokens already verified by jwt.decode, and the ones revoked by /logout
+token_cache = TokenCache(app.config['TOKEN_CACHE_MAX_ENTRIES'])
+
+def verify_token(token):
+    """(username, exp) of a valid token, else None (revocations, then the cache, then jwt.decode)"""
+    # Revocations live in the report store, so a logout made through another
+    # process, or before a restart, is seen here too
+    if report_store.token_revoked(token_digest(token).hex()):
+        token_cache.discard(token)
+        return None
+    verified = token_cache.get(token)
+    if verified is not None:
+        return verified
+    import jwt
+    generation = token_cache.generation
+    try:
+        data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=["HS256"])
+    except jwt.InvalidTokenError:
+        return None
+    current_user = data.get('username')
+    if not isinstance(current_user, str):
+        return None
+    token_cache.put(token, current_user, data.get('exp'), generation)
+    return current_user, data.get('exp')
+
+def bearer_token():
+    """The raw JWT of a 'Bearer <header.payload.signature>' header, else None"""
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() != 'bearer' or token.count('.') != 2:
+        return None
+    return token
+
+rate_limiter = RateLimiter(app.config['RATE_LIMITS']) if app.config['RATE_LIMIT_ENABLED'] else None
+
+def client_key():
+    """'user:<name>' for a valid bearer token, else 'ip:<address>'"""
+    token = bearer_token()
+    if token is not None:
+        verified = verify_token(token)
+        if verified is not None:
+            return f'user:{verified[0]}'
+    return f'ip:{request.remote_addr}'
+
+@app.before_request
+def rate_limit():
+    if rate_limiter is None or request.method == 'OPTIONS' or not rate_limiter.limited(request.endpoint):
+        return None
+    retry_after = rate_limiter.acquire(request.endpoint, client_key())
+    if not retry_after:
+        return None
+    response = jsonify({'success': False, 'message': 'Too many requests, please slow down.'})
+    response.headers['Retry-After'] = str(math.ceil(retry_after))
+    return response, 429
 
 # JWT token decorator
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = request.headers.get('Authorization')
-        if not token:
+        if not request.headers.get('Authorization'):
             return jsonify({'message': 'Token is missing!'}), 401
-        try:
-            token = token.split(' ')[1]  # Remove 'Bearer ' prefix
-            data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=["HS256"])
-            current_user = data['username']
-        except:
+        # Anything but a bearer JWT is rejected before decoding
+        token = bearer_token()
+        if token is None:
+            return jsonify({'message': 'Token is invalid!'}), 401
+        verified = verify_token(token)
+        if verified is None:
             return jsonify({'message': 'Token is invalid!'}), 401
+        current_user, g.token_exp = verified
         return f(current_user, *args, **kwargs)
     return decorated
 
@@ -67,15 +272,46 @@ def home():
         'message': 'Welcome to Diagno AI API',
         'version': '1.0',
         'endpoints': {
-            'auth': ['/signup', '/login'],
-            'prediction': ['/predict', '/get-diseases', '/get-symptoms'],
-            'info': ['/get-accuracy', '/get-metrics', '/disease-info/<disease>'],
-            'user': ['/save-report', '/get-reports']
+            'health': ['/health', '/ready'],
+            'auth': ['/signup', '/login', '/logout'],
+            'prediction': ['/predict', '/predict-batch', '/ask-next', '/get-diseases', '/get-symptoms',
+                           '/symptoms/suggest'],
+            'info': ['/get-accuracy', '/get-metrics', '/disease-info/<disease>', '/diseases/matching',
+                     '/symptoms/of-diseases'],
+            'user': ['/save-report', '/get-reports', '/report-stats'],
+            'admin': ['/retrain-model', '/retrain-model/<job_id>', '/cache-stats', '/batcher-stats',
+                      '/inference-pool-stats']
         }
     })
 
+@app.route('/health', methods=['GET'])
+def health():
+    """Liveness: the process is up and serving HTTP"""
+    return jsonify({'success': True, 'status': 'alive'}), 200
+
+@app.route('/ready', methods=['GET'])
+def ready():
+    """Readiness: 200 once the model is resident, 503 before that"""
+    if not model_ready.is_set():
+        return jsonify({
+            'success': False,
+            'status': 'failed' if startup_status['model_load_error'] else 'loading',
+            'error': startup_status['model_load_error']
+        }), 503
+    return jsonify({
+        'success': True,
+        'status': 'ready',
+        'model': active_bundle.describe(),
+        'startup': startup_status
+    }), 200
+
 # ==================== AUTHENTICATION ROUTES ====================
 
+def hasher_busy(e):
+    response = jsonify({'success': False, 'message': f'{e} Please try again shortly.'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 @app.route('/signup', methods=['POST'])
 def signup():
     data = request.json
@@ -87,20 +323,23 @@ def signup():
     if not username or not password:
         return jsonify({'success': False, 'message': 'Username and password required!'}), 400
     
-    if username in users:
+    if report_store.get_user(username) is not None:
         return jsonify({'success': False, 'message': 'User already exists!'}), 400
     
-    # Hash password
-    hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+    # Hash password (on the hashing pool, see password_hasher)
+    try:
+        hashed_password = password_hasher.hash(password)
+    except HasherBusy as e:
+        return hasher_busy(e)
     
-    users[username] = {
+    created = report_store.create_user(username, {
         'password': hashed_password,
         'email': email,
         'fullname': fullname,
         'created_at': str(datetime.datetime.now())
-    }
-    
-    user_reports[username] = []
+    })
+    if not created:
+        return jsonify({'success': False, 'message': 'User already exists!'}), 400
     
     return jsonify({
         'success': True,
@@ -117,14 +356,25 @@ def login():
     if not username or not password:
         return jsonify({'success': False, 'message': 'Username and password required!'}), 400
     
-    if username not in users:
+    user = report_store.get_user(username)
+    if user is None:
         return jsonify({'success': False, 'message': 'Invalid credentials!'}), 401
     
-    # Verify password
-    if bcrypt.checkpw(password.encode('utf-8'), users[username]['password']):
+    # Verify password; hashes stored with an older cost factor are upgraded
+    try:
+        valid, new_hash = password_hasher.verify(password, user['password'])
+    except HasherBusy as e:
+        return hasher_busy(e)
+    if new_hash is not None:
+        report_store.update_password(username, new_hash)
+
+    import jwt
+    if valid:
         # Generate JWT token
+        # jti keeps a new login distinct from a token revoked in the same second
         token = jwt.encode({
             'username': username,
+            'jti': secrets.token_hex(8),
             'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=24)
         }, app.config['SECRET_KEY'], algorithm="HS256")
         
@@ -134,126 +384,431 @@ def login():
             'token': token,
             'user': {
                 'username': username,
-                'email': users[username]['email'],
-                'fullname': users[username]['fullname']
+                'email': user['email'],
+                'fullname': user['fullname']
             }
         }), 200
     
     return jsonify({'success': False, 'message': 'Invalid credentials!'}), 401
 
+@app.route('/logout', methods=['POST'])
+@token_required
+def logout(current_user):
+    """Revoke the caller's token until it expires"""
+    token = bearer_token()
+    # exp of the payload token_required already verified (decoding again could fail if it just expired)
+    if g.token_exp is not None:
+        report_store.revoke_token(token_digest(token).hex(), g.token_exp)
+    token_cache.discard(token)
+    return jsonify({'success': True, 'message': 'Logged out successfully!'}), 200
+
 # ==================== PREDICTION ROUTES ====================
 
+def rank_predictions(bundle, probabilities, top_k):
+    """Return the top_k {disease, confidence} entries for one probability row"""
+    disease_classes = bundle.classes_
+    if top_k < len(probabilities):
+        # O(n) selection of the k best, then sort only those k
+        candidates = np.argpartition(probabilities, -top_k)[-top_k:]
+    else:
+        candidates = np.arange(len(probabilities))
+    top_indices = candidates[np.argsort(probabilities[candidates])[::-1]]
+    return [{
+        'disease': disease_classes[idx],
+        'confidence': round(float(probabilities[idx]) * 100, 2)
+    } for idx in top_indices]
+
+# Optional /predict response sections, all included unless `include` says otherwise
+RESPONSE_SECTIONS = ('all_predictions', 'disease_info', 'symptoms_analyzed')
+
+def parse_top_k(bundle, data, default=3):
+    """Read top_k from a request body, clamped to [1, #diseases]; None if invalid"""
+    try:
+        top_k = int(data.get('top_k', default))
+    except (TypeError, ValueError):
+        return None
+    return max(1, min(top_k, len(bundle.classes_)))
+
+def parse_include(data):
+    """Read the `include` list (or comma-separated string); None if invalid"""
+    include = data.get('include')
+    if include is None:
+        return set(RESPONSE_SECTIONS)
+    if isinstance(include, str):
+        include = [part.strip() for part in include.split(',') if part.strip()]
+    if not isinstance(include, list) or not all(part in RESPONSE_SECTIONS for part in include):
+        return None
+    return set(include)
+
+def parse_symptom_bits(bundle, data):
+    """Read a hex `symptom_bits` mask (and optional `symptom_codec`); raises ValueError"""
+    codec_id = data.get('symptom_codec')
+    if codec_id is not None and codec_id != bundle.bitset.codec_id:
+        raise ValueError('symptom_bits were built for a different symptom list, reload /get-symptoms!')
+    bits = data.get('symptom_bits')
+    if not isinstance(bits, str):
+        raise ValueError('symptom_bits must be a hex string!')
+    return bundle.bitset.from_hex(bits)
+
+def score_mask(bundle, mask):
+    """Probability row for one symptom bit mask, served from the cache when possible"""
+    key = (bundle.version, mask)
+    probabilities = prediction_cache.get(key)
+    if probabilities is None:
+        generation = prediction_cache.generation
+        if micro_batcher is not None:
+            probabilities = micro_batcher.submit((bundle, mask))
+        else:
+            probabilities = bundle.predict_proba(bundle.encode_mask(mask))[0]
+        prediction_cache.put(key, probabilities, generation)
+    return probabilities
+
+def score_masks(bundle, masks):
+    """Probability rows for many symptom bit masks; cache misses share one predict_proba"""
+    keys = [(bundle.version, mask) for mask in masks]
+    rows = [prediction_cache.get(key) for key in keys]
+    missing = list(dict.fromkeys(key for key, row in zip(keys, rows) if row is None))
+    if missing:
+        generation = prediction_cache.generation
+        X = bundle.bitset.unpack([mask for _, mask in missing])
+        computed = dict(zip(missing, bundle.predict_proba(X)))
+        for key, probabilities in computed.items():
+            prediction_cache.put(key, probabilities, generation)
+        rows = [computed[key] if row is None else row for key, row in zip(keys, rows)]
+    return rows
+
+def score_batched_keys(items):
+    """Micro-batcher callback: score (bundle, symptom mask) items, one call per bundle"""
+    results = [None] * len(items)
+    groups = {}
+    for pos, (bundle, mask) in enumerate(items):
+        groups.setdefault(bundle.version, (bundle, []))[1].append(pos)
+    for bundle, positions in groups.values():
+        X = bundle.bitset.unpack([items[pos][1] for pos in positions])
+        for pos, probabilities in zip(positions, bundle.predict_proba(X)):
+            results[pos] = probabilities
+    return results
+
+# Cache misses from concurrent /predict calls share one batched predict_proba
+micro_batcher = None
+if app.config['MICRO_BATCH_ENABLED']:
+    micro_batcher = MicroBatcher(score_batched_keys,
+                                 app.config['MICRO_BATCH_WAIT_MS'],
+                                 app.config['MICRO_BATCH_MAX_SIZE'])
+
 @app.route('/predict', methods=['POST'])
 def predict():
     try:
+        bundle = active_bundle
         data = request.json
-        selected_symptoms = data.get('symptoms', [])
         
-        if not selected_symptoms:
-            return jsonify({'success': False, 'message': 'No symptoms provided!'}), 400
+        # Symptoms come as names or as a packed bitset over /get-symptoms order
+        if 'symptom_bits' in data:
+            try:
+                mask = parse_symptom_bits(bundle, data)
+            except ValueError as e:
+                return jsonify({'success': False, 'message': str(e)}), 400
+            if not mask:
+                return jsonify({'success': False, 'message': 'No symptoms provided!'}), 400
+            selected_symptoms = bundle.bitset.decode(mask)
+            resolution = None
+        else:
+            raw_symptoms = data.get('symptoms', [])
+            if not raw_symptoms:
+                return jsonify({'success': False, 'message': 'No symptoms provided!'}), 400
+            # Free-text names are resolved onto symptom_list (see symptom_normalizer)
+            selected_symptoms, resolution = bundle.normalizer.resolve(
+                raw_symptoms if isinstance(raw_symptoms, list) else [raw_symptoms])
+            mask = bundle.bitset.encode(selected_symptoms)
+            if not mask:
+                return jsonify({'success': False, 'message': 'No known symptoms provided!',
+                                'symptom_resolution': resolution}), 400
+        
+        top_k = parse_top_k(bundle, data)
+        if top_k is None:
+            return jsonify({'success': False, 'message': 'top_k must be an integer!'}), 400
+        include = parse_include(data)
+        if include is None:
+            return jsonify({
+                'success': False,
+                'message': f"include must list any of: {', '.join(RESPONSE_SECTIONS)}"
+            }), 400
+        
+        # Score once (or hit the cache); the primary prediction is the
+        # probability argmax, so the SVC runs at most a single time
+        probabilities = score_mask(bundle, mask)
+        
+        top_predictions = rank_predictions(bundle, probabilities, top_k)
+        primary_disease = top_predictions[0]['disease']
+        
+        result = {
+            'success': True,
+            'primary_prediction': top_predictions[0],
+            'top_predictions': top_predictions
+        }
+        
+        # Optional sections; the default response includes all of them
+        if 'all_predictions' in include:
+            result['all_predictions'] = {
+                disease: round(float(probability) * 100, 2)
+                for disease, probability in zip(bundle.classes_, probabilities)
+            }
+        if 'symptoms_analyzed' in include:
+            result['symptoms_analyzed'] = selected_symptoms
+        if resolution is not None:
+            result['symptom_resolution'] = resolution
+        if 'disease_info' in include:
+            result['disease_info'] = bundle.disease_info.get(primary_disease, {})
+        result['timestamp'] = str(datetime.datetime.now())
+        
+        return jsonify(result), 200
+        
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Error: {str(e)}'}), 500
+
+@app.route('/predict-batch', methods=['POST'])
+def predict_batch():
+    """Score many symptom sets with a single predict_proba call"""
+    try:
+        bundle = active_bundle
+        data = request.json or {}
+        symptom_sets = data.get('symptom_sets')
+        
+        if not isinstance(symptom_sets, list) or not symptom_sets:
+            return jsonify({'success': False, 'message': 'symptom_sets must be a non-empty list!'}), 400
+        if len(symptom_sets) > MAX_BATCH_SIZE:
+            return jsonify({'success': False, 'message': f'Batch too large! Maximum is {MAX_BATCH_SIZE} items.'}), 400
         
-        # Create feature vector
-        features = {symptom: 0 for symptom in symptom_list}
-        for symptom in selected_symptoms:
-            if symptom in features:
-                features[symptom] = 1
+        top_k = parse_top_k(bundle, data)
+        if top_k is None:
+            return jsonify({'success': False, 'message': 'top_k must be an integer!'}), 400
         
-        # Convert to DataFrame
-        X = pd.DataFrame([features])
+        # Validate each item (a list of names or a hex symptom bitset); invalid
+        # items are reported inline, not scored
+        bitset = bundle.bitset
+        results = [None] * len(symptom_sets)
+        valid_positions = []
+        valid_sets = []
+        valid_masks = []
+        for pos, symptoms in enumerate(symptom_sets):
+            mask = 0
+            resolution = None
+            if isinstance(symptoms, str):
+                try:
+                    mask = bitset.from_hex(symptoms)
+                except ValueError:
+                    results[pos] = {'index': pos, 'success': False, 'message': 'Invalid symptom bitset!'}
+                    continue
+                symptoms = bitset.decode(mask)
+            elif isinstance(symptoms, list) and any(isinstance(s, str) for s in symptoms):
+                symptoms, resolution = bundle.normalizer.resolve(symptoms)
+                mask = bitset.encode(symptoms)
+            else:
+                results[pos] = {'index': pos, 'success': False, 'message': 'No symptoms provided!'}
+                continue
+            if not mask:
+                results[pos] = {'index': pos, 'success': False, 'message': 'No known symptoms provided!'}
+                if resolution is not None:
+                    results[pos]['symptom_resolution'] = resolution
+            else:
+                valid_positions.append(pos)
+                valid_sets.append((symptoms, resolution))
+                valid_masks.append(mask)
         
-        # Predict
-        prediction = model.predict(X)[0]
-        probabilities = model.predict_proba(X)[0]
+        if valid_sets:
+            probabilities = score_masks(bundle, valid_masks)
+            for row, pos in enumerate(valid_positions):
+                top_predictions = rank_predictions(bundle, probabilities[row], top_k)
+                symptoms, resolution = valid_sets[row]
+                results[pos] = {
+                    'index': pos,
+                    'success': True,
+                    'primary_prediction': top_predictions[0],
+                    'top_predictions': top_predictions,
+                    'symptoms_analyzed': symptoms
+                }
+                if resolution is not None:
+                    results[pos]['symptom_resolution'] = resolution
         
-        # Get all disease predictions
-        disease_classes = model.classes_
-        all_predictions = {}
-        for idx, disease in enumerate(disease_classes):
-            confidence = float(probabilities[idx]) * 100
-            all_predictions[disease] = round(confidence, 2)
+        return jsonify({
+            'success': True,
+            'results': results,
+            'total': len(results),
+            'scored': len(valid_sets),
+            'timestamp': str(datetime.datetime.now())
+        }), 200
         
-        # Get top 3 predictions
-        top_3_indices = np.argsort(probabilities)[-3:][::-1]
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Error: {str(e)}'}), 500
+
+@app.route('/ask-next', methods=['POST'])
+def ask_next():
+    """Rank the symptoms worth asking about next by expected information gain"""
+    try:
+        bundle = active_bundle
+        data = request.json or {}
         
-        top_predictions = []
-        for idx in top_3_indices:
-            disease = disease_classes[idx]
-            confidence = float(probabilities[idx]) * 100
-            top_predictions.append({
-                'disease': disease,
-                'confidence': round(confidence, 2)
-            })
+        if 'symptom_bits' in data:
+            try:
+                mask = parse_symptom_bits(bundle, data)
+            except ValueError as e:
+                return jsonify({'success': False, 'message': str(e)}), 400
+            resolution = None
+        else:
+            raw_symptoms = data.get('symptoms', [])
+            if not isinstance(raw_symptoms, list):
+                return jsonify({'success': False, 'message': 'symptoms must be a list!'}), 400
+            symptoms, resolution = bundle.normalizer.resolve(raw_symptoms)
+            mask = bundle.bitset.encode(symptoms)
         
-        # Get disease information
-        primary_disease = prediction
-        info = disease_info.get(primary_disease, {})
+        # Symptoms the patient already said they do not have
+        absent_raw = data.get('absent', [])
+        if not isinstance(absent_raw, list):
+            return jsonify({'success': False, 'message': 'absent must be a list!'}), 400
+        absent, _ = bundle.normalizer.resolve(absent_raw)
+        absent_mask = bundle.bitset.encode(absent) & ~mask
         
+        try:
+            limit = max(1, min(int(data.get('limit', 5)), MAX_QUESTIONS))
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'message': 'limit must be an integer!'}), 400
+        
+        posterior, current_entropy, questions = rank_questions(bundle, mask, absent_mask, limit)
         result = {
             'success': True,
-            'primary_prediction': {
-                'disease': primary_disease,
-                'confidence': round(float(probabilities[disease_classes.tolist().index(primary_disease)]) * 100, 2)
-            },
-            'top_predictions': top_predictions,
-            'all_predictions': all_predictions,  # NEW: All disease probabilities
-            'symptoms_analyzed': selected_symptoms,
-            'disease_info': info,
+            'symptoms_analyzed': bundle.bitset.decode(mask),
+            'absent': bundle.bitset.decode(absent_mask),
+            'top_predictions': rank_predictions(bundle, posterior, 3),
+            'entropy_bits': round(current_entropy, 4),
+            'questions': questions,
+            'candidates_scored': bundle.bitset.n_symptoms - bundle.bitset.popcount(mask | absent_mask),
             'timestamp': str(datetime.datetime.now())
         }
-        
+        if resolution is not None:
+            result['symptom_resolution'] = resolution
         return jsonify(result), 200
         
     except Exception as e:
         return jsonify({'success': False, 'message': f'Error: {str(e)}'}), 500
 
+def send_precomputed(encoded):
+    """Serve a pre-encoded catalog body: 304 on a matching ETag, gzip when accepted"""
+    use_gzip = encoded.gzip_body is not None and request.accept_encodings['gzip'] > 0
+    etag = encoded.gzip_etag if use_gzip else encoded.etag
+    if request.if_none_match.contains(encoded.etag) or request.if_none_match.contains(encoded.gzip_etag):
+        response = Response(status=304)
+    else:
+        response = Response(encoded.gzip_body if use_gzip else encoded.body, mimetype='application/json')
+        if use_gzip:
+            response.headers['Content-Encoding'] = 'gzip'
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f"public, max-age={app.config['CATALOG_MAX_AGE']}"
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
 @app.route('/get-symptoms', methods=['GET'])
 def get_symptoms():
     """Return all available symptoms"""
-    # Format symptoms for better display
-    formatted_symptoms = [symptom.replace('_', ' ').title() for symptom in symptom_list]
-    
-    return jsonify({
-        'success': True,
-        'symptoms': symptom_list,
-        'formatted_symptoms': formatted_symptoms,
-        'total': len(symptom_list)
-    }), 200
+    return send_precomputed(active_bundle.catalog.symptoms)
 
 @app.route('/get-diseases', methods=['GET'])
 def get_diseases():
     """Return all diseases with basic info"""
-    diseases_list = []
-    for disease, info in disease_info.items():
-        diseases_list.append({
-            'name': disease,
-            'description': info.get('description', ''),
-            'severity': info.get('severity', 'Unknown')
-        })
-    
-    return jsonify({
-        'success': True,
-        'diseases': diseases_list,
-        'total': len(diseases_list)
-    }), 200
+    return send_precomputed(active_bundle.catalog.diseases)
 
 
 @app.route('/get-disease-symptoms', methods=['GET'])
 def get_disease_symptoms():
     """Return mapping of disease -> symptoms (used by frontend filters)"""
-    if disease_symptoms:
-        return jsonify({'success': True, 'mapping': disease_symptoms, 'total': len(disease_symptoms)}), 200
+    encoded = active_bundle.catalog.disease_symptoms
+    if encoded is not None:
+        return send_precomputed(encoded)
     else:
         return jsonify({'success': False, 'message': 'No disease-symptom mapping available'}), 404
 
+@app.route('/symptoms/suggest', methods=['GET'])
+def suggest_symptoms():
+    """Autocomplete symptoms by prefix, ranked by co-occurrence with `selected`"""
+    bundle = active_bundle
+    query = request.args.get('q', '')
+    selected_raw = [part for part in request.args.get('selected', '').split(',') if part.strip()]
+    try:
+        limit = max(1, min(int(request.args.get('limit', 10)), MAX_SUGGESTIONS))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'limit must be an integer!'}), 400
+    
+    selected, _ = bundle.normalizer.resolve(selected_raw)
+    suggestions = bundle.suggester.suggest(query, selected, limit)
+    return jsonify({
+        'success': True,
+        'query': query,
+        'selected': selected,
+        'suggestions': suggestions,
+        'total': len(suggestions)
+    }), 200
+
+def split_names(value):
+    """Comma-separated query-string list -> list of non-empty names"""
+    return [part for part in (value or '').split(',') if part.strip()]
+
+@app.route('/diseases/matching', methods=['GET'])
+def diseases_matching():
+    """Diseases whose catalog symptoms include all (mode=all) or any (mode=any) of `symptoms`"""
+    bundle = active_bundle
+    mode = request.args.get('mode', 'all')
+    if mode not in ('all', 'any'):
+        return jsonify({'success': False, 'message': 'mode must be all or any!'}), 400
+    
+    symptoms, resolution = bundle.normalizer.resolve(split_names(request.args.get('symptoms')))
+    if not symptoms:
+        return jsonify({'success': False, 'message': 'No known symptoms provided!',
+                        'symptom_resolution': resolution}), 400
+    
+    index = bundle.disease_index
+    diseases = index.decode_diseases(index.diseases_matching(bundle.bitset.encode(symptoms), mode))
+    return jsonify({
+        'success': True,
+        'mode': mode,
+        'symptoms': symptoms,
+        'symptom_resolution': resolution,
+        'diseases': diseases,
+        'total': len(diseases)
+    }), 200
+
+@app.route('/symptoms/of-diseases', methods=['GET'])
+def symptoms_of_diseases():
+    """Symptoms shared by all (mode=shared) or listed by any (mode=union) of `diseases`;
+    invert=1 uses every disease not listed instead"""
+    bundle = active_bundle
+    mode = request.args.get('mode', 'shared')
+    if mode not in ('shared', 'union'):
+        return jsonify({'success': False, 'message': 'mode must be shared or union!'}), 400
+    
+    index = bundle.disease_index
+    diseases, unknown = index.resolve_diseases(split_names(request.args.get('diseases')))
+    if request.args.get('invert', '0') in ('1', 'true'):
+        diseases = index.complement(diseases)
+    if not diseases:
+        return jsonify({'success': False, 'message': 'No known diseases provided!',
+                        'unknown_diseases': unknown}), 400
+    
+    symptoms = bundle.bitset.decode(index.symptoms_of(diseases, mode))
+    return jsonify({
+        'success': True,
+        'mode': mode,
+        'diseases': diseases,
+        'unknown_diseases': unknown,
+        'symptoms': symptoms,
+        'formatted_symptoms': [symptom.replace('_', ' ').title() for symptom in symptoms],
+        'total': len(symptoms)
+    }), 200
+
 @app.route('/disease-info/<disease>', methods=['GET'])
 def get_disease_info(disease):
     """Get detailed information about a specific disease"""
-    if disease in disease_info:
-        return jsonify({
-            'success': True,
-            'disease': disease,
-            'info': disease_info[disease]
-        }), 200
+    encoded = active_bundle.catalog.disease_info.get(disease)
+    if encoded is not None:
+        return send_precomputed(encoded)
     else:
         return jsonify({'success': False, 'message': 'Disease not found!'}), 404
 
@@ -262,171 +817,281 @@ def get_disease_info(disease):
 @app.route('/get-accuracy', methods=['GET'])
 def get_accuracy():
     """Return model accuracy"""
-    return jsonify({
-        'success': True,
-        'accuracy': round(model_metrics['accuracy'] * 100, 2),
-        'accuracy_decimal': model_metrics['accuracy']
-    }), 200
+    return send_precomputed(active_bundle.catalog.accuracy)
 
 @app.route('/get-metrics', methods=['GET'])
 def get_metrics():
     """Return all model metrics"""
-    return jsonify({
-        'success': True,
-        'metrics': model_metrics
-    }), 200
+    return send_precomputed(active_bundle.catalog.metrics)
 
 @app.route('/get-chart-data', methods=['GET'])
 def get_chart_data():
-    """Return data for frontend charts"""
-    
-    # Disease distribution
-    disease_names = list(disease_info.keys())
-    disease_counts = [50] * len(disease_names)  # Each disease has 50 samples
-    
-    # Symptom frequency (top 15)
-    symptom_freq = {}
-    for disease, symptoms in [
-        ('Flu', ['fever', 'cough', 'fatigue', 'body_ache', 'headache']),
-        ('Common Cold', ['cough', 'runny_nose', 'sneezing', 'sore_throat', 'mild_fever']),
-        ('Pneumonia', ['high_fever', 'cough', 'chest_pain', 'difficulty_breathing', 'fatigue']),
-        ('COVID-19', ['fever', 'dry_cough', 'fatigue', 'loss_of_taste', 'difficulty_breathing']),
-        ('Malaria', ['high_fever', 'chills', 'sweating', 'headache', 'nausea']),
-        ('Dengue', ['high_fever', 'severe_headache', 'joint_pain', 'muscle_pain', 'rash']),
-        ('Diabetes', ['frequent_urination', 'excessive_thirst', 'hunger', 'fatigue', 'blurred_vision']),
-        ('Hypertension', ['headache', 'dizziness', 'chest_pain', 'shortness_of_breath', 'nosebleeds']),
-    ]:
-        for symptom in symptoms:
-            symptom_freq[symptom] = symptom_freq.get(symptom, 0) + 1
-    
-    top_symptoms = sorted(symptom_freq.items(), key=lambda x: x[1], reverse=True)[:15]
-    
-    # Disease categories
-    categories = {
-        'Respiratory': ['Flu', 'Common Cold', 'Pneumonia', 'Bronchitis', 'Asthma', 'COVID-19'],
-        'Infectious': ['Malaria', 'Dengue', 'Typhoid', 'Tuberculosis'],
-        'Chronic': ['Diabetes', 'Hypertension', 'Arthritis'],
-        'Gastrointestinal': ['Gastroenteritis', 'Food Poisoning'],
-        'Neurological': ['Migraine'],
-        'Other': ['UTI', 'Kidney Stones', 'Allergy', 'Anemia']
-    }
-    
-    category_counts = {cat: len(diseases) for cat, diseases in categories.items()}
-    
-    # Feature importance (top 10 most important symptoms)
-    feature_importance = {
-        'High Fever': 95,
-        'Cough': 88,
-        'Fatigue': 82,
-        'Difficulty Breathing': 91,
-        'Chest Pain': 85,
-        'Headache': 78,
-        'Body Ache': 75,
-        'Nausea': 70,
-        'Dizziness': 68,
-        'Joint Pain': 72
-    }
-    
-    chart_data = {
-        'disease_distribution': {
-            'labels': disease_names,
-            'data': disease_counts
-        },
-        'symptom_frequency': {
-            'labels': [s[0].replace('_', ' ').title() for s in top_symptoms],
-            'data': [s[1] for s in top_symptoms]
-        },
-        'model_performance': {
-            'labels': ['Accuracy', 'Training Score', 'Testing Score'],
-            'data': [
-                round(model_metrics['accuracy'] * 100, 2),
-                98.5,  # Sample training score
-                round(model_metrics['accuracy'] * 100, 2)
-            ]
-        },
-        'severity_distribution': {
-            'labels': ['Mild', 'Moderate', 'Severe', 'Chronic'],
-            'data': [3, 8, 7, 2]
-        },
-        'disease_categories': {
-            'labels': list(category_counts.keys()),
-            'data': list(category_counts.values())
-        },
-        'confidence_levels': {
-            'labels': ['90-100%', '80-90%', '70-80%', '60-70%', '50-60%'],
-            'data': [85, 92, 88, 75, 65]
-        },
-        'feature_importance': {
-            'labels': list(feature_importance.keys()),
-            'data': list(feature_importance.values())
-        }
-    }
-    
-    return jsonify({
-        'success': True,
-        'charts': chart_data
-    }), 200
+    """Return data for frontend charts (computed by train_model.py)"""
+    encoded = active_bundle.catalog.chart_data
+    if encoded is not None:
+        return send_precomputed(encoded)
+    else:
+        return jsonify({'success': False, 'message': 'Chart data not available, retrain the model!'}), 404
 
 # ==================== USER REPORTS ROUTES ====================
 
+def pack_report_symptoms(symptoms):
+    """Stored form of a report's symptoms: a packed bitset plus any names outside symptom_list"""
+    bundle = active_bundle
+    if bundle is None or not isinstance(symptoms, list):
+        return {'symptoms': symptoms}
+    bitset = bundle.bitset
+    packed = {
+        'symptom_bits': bitset.to_bytes(bitset.encode(symptoms)),
+        'symptom_codec': bitset.codec_id
+    }
+    extra = [symptom for symptom in symptoms if not isinstance(symptom, str) or symptom not in bitset.bits]
+    if extra:
+        packed['extra_symptoms'] = extra
+    return packed
+
+def report_view(report):
+    """JSON form of a stored report, with the symptom list unpacked"""
+    view = {key: value for key, value in report.items()
+            if key not in ('symptom_bits', 'symptom_codec', 'extra_symptoms')}
+    if 'symptom_bits' in report:
+        bitset = SymptomBitset.get(report['symptom_codec'])
+        extra = report.get('extra_symptoms', [])
+        if bitset is not None:
+            view['symptoms'] = bitset.decode(bitset.from_bytes(report['symptom_bits'])) + extra
+        else:
+            # Packed against a symptom list this store never recorded
+            view['symptoms'] = extra
+            view['symptoms_incomplete'] = True
+    return view
+
+def check_report_fields(data):
+    """Error message for a /save-report body with unstorable fields, else None"""
+    if not isinstance(data, dict):
+        return 'Report must be a JSON object!'
+    prediction = data.get('prediction')
+    if prediction is not None and not isinstance(prediction, str):
+        return 'prediction must be a string!'
+    confidence = data.get('confidence')
+    if confidence is not None and (isinstance(confidence, bool) or not isinstance(confidence, (int, float))
+                                   or not math.isfinite(confidence)):
+        return 'confidence must be a finite number!'
+    return None
+
 @app.route('/save-report', methods=['POST'])
 @token_required
 def save_report(current_user):
     """Save diagnosis report for user"""
-    data = request.json
+    data = request.get_json(silent=True)
+    error = check_report_fields(data)
+    if error:
+        return jsonify({'success': False, 'message': error}), 400
     
+    # The store adds the id and the timestamp
     report = {
-        'id': len(user_reports.get(current_user, [])) + 1,
         'prediction': data.get('prediction'),
-        'symptoms': data.get('symptoms'),
-        'confidence': data.get('confidence'),
-        'timestamp': str(datetime.datetime.now())
+        'confidence': data.get('confidence')
     }
-    
-    if current_user not in user_reports:
-        user_reports[current_user] = []
-    
-    user_reports[current_user].append(report)
+    report.update(pack_report_symptoms(data.get('symptoms')))
+    try:
+        report_id = report_store.add_report(current_user, report)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     
     return jsonify({
         'success': True,
         'message': 'Report saved successfully!',
-        'report_id': report['id']
+        'report_id': report_id
     }), 201
 
+def parse_report_query(args):
+    """Turn /get-reports query parameters into list_reports arguments; (query, error message)"""
+    query = {}
+    try:
+        if 'limit' in args:
+            query['limit'] = max(1, min(int(args['limit']), MAX_REPORT_PAGE))
+        if 'after' in args:
+            query['after'] = int(args['after'])
+        # Dates are whole days: from is inclusive, to is inclusive (end = the next midnight)
+        if 'from' in args:
+            query['start'] = datetime.date.fromisoformat(args['from']).isoformat()
+        if 'to' in args:
+            query['end'] = (datetime.date.fromisoformat(args['to']) + datetime.timedelta(days=1)).isoformat()
+    except ValueError:
+        return None, 'limit and after must be integers, from and to dates (YYYY-MM-DD)!'
+    order = args.get('order', 'asc')
+    if order not in ('asc', 'desc'):
+        return None, "order must be 'asc' or 'desc'!"
+    query['descending'] = order == 'desc'
+    if args.get('disease'):
+        query['disease'] = args['disease']
+    query['summary'] = args.get('summary') in ('1', 'true')
+    return query, None
+
 @app.route('/get-reports', methods=['GET'])
 @token_required
 def get_reports(current_user):
-    """Get all reports for user"""
-    reports = user_reports.get(current_user, [])
+    """Get reports for user: all of them, or one keyset page (?limit=&after=&order=)
+    filtered by ?from=&to= (YYYY-MM-DD) and ?disease=; ?summary=1 drops the symptoms"""
+    query, error = parse_report_query(request.args)
+    if error:
+        return jsonify({'success': False, 'message': error}), 400
+    reports = [report_view(report) for report in report_store.list_reports(current_user, **query)]
     
+    limit = query.get('limit')
     return jsonify({
         'success': True,
         'reports': reports,
-        'total': len(reports)
+        'count': len(reports),
+        # Reports matching the filters (all pages), counted by the store
+        'total': report_store.count_reports(current_user, **{key: query[key] for key in REPORT_FILTERS
+                                                             if key in query}),
+        # Pass as ?after= for the next page; None once the last page was returned
+        'next_after': reports[-1]['id'] if limit is not None and len(reports) == limit else None
+    }), 200
+
+@app.route('/report-stats', methods=['GET'])
+@token_required
+def get_report_stats(current_user):
+    """Counts by disease, confidence bucket and day for the user and for everyone (?days=30)"""
+    try:
+        days = max(1, min(int(request.args.get('days', 30)), MAX_DAYS))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'days must be an integer!'}), 400
+    
+    return jsonify({
+        'success': True,
+        'days': days,
+        **report_store.report_summary(current_user, days)
     }), 200
 
 # ==================== ADMIN ROUTES ====================
 
+def install_bundle(staging_dir):
+    """Load a freshly trained bundle, persist its files and make it active.
+
+    The new artifact version is moved into MODELS_DIR/artifacts first and
+    mapped from there; the live version is never renamed or deleted while
+    mapped (Windows refuses both), only the artifact.current pointer changes.
+    """
+    global active_bundle
+    with bundle_swap_lock:
+        artifact = publish_artifact(staging_dir, MODELS_DIR)
+        bundle = prepare_bundle(
+            load_bundle(staging_dir, version=active_bundle.version + 1,
+                        inference_engine=app.config['INFERENCE_ENGINE'],
+                        fallback_dir=MODELS_DIR))
+        for name in BUNDLE_FILES:
+            source = os.path.join(staging_dir, name)
+            if os.path.exists(source):
+                os.replace(source, os.path.join(MODELS_DIR, name))
+        if artifact is not None:
+            switch_artifact(MODELS_DIR, artifact)
+        # A single reference assignment: requests already holding the old
+        # bundle finish on it, new requests only ever see the new one
+        active_bundle = bundle
+        prediction_cache.clear()
+        # Versions still mapped (Windows) stay until a later install
+        prune_artifacts(MODELS_DIR, keep={current_artifact_name(MODELS_DIR)})
+    return bundle.version
+
+retrain_jobs = RetrainJobs(BACKEND_DIR, MODELS_DIR, install_bundle)
+
 @app.route('/retrain-model', methods=['POST'])
 def retrain_model():
-    """Trigger model retraining (admin only)"""
+    """Start model retraining in the background (admin only)"""
     # In production, add admin authentication
-    try:
-        import subprocess
-        result = subprocess.run(['python', 'train_model.py'], 
-                              capture_output=True, text=True, cwd='../backend')
-        
-        return jsonify({
-            'success': True,
-            'message': 'Model retrained successfully!',
-            'output': result.stdout
-        }), 200
-    except Exception as e:
+    job = retrain_jobs.start()
+    if job is None:
         return jsonify({
             'success': False,
-            'message': f'Retraining failed: {str(e)}'
-        }), 500
+            'message': 'A retraining job is already running!',
+            'job_id': retrain_jobs.running()
+        }), 409
+    
+    return jsonify({
+        'success': True,
+        'message': 'Model retraining started!',
+        'job_id': job['job_id'],
+        'status_url': f"/retrain-model/{job['job_id']}"
+    }), 202
+
+@app.route('/retrain-model/<job_id>', methods=['GET'])
+def retrain_status(job_id):
+    """Poll a retraining job's status and training log"""
+    job = retrain_jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'message': 'Job not found!'}), 404
+    
+    return jsonify({
+        'success': True,
+        'job': job,
+        'active_model': active_bundle.describe()
+    }), 200
+
+@app.route('/cache-stats', methods=['GET'])
+def cache_stats():
+    """Return prediction cache hit/miss/eviction counters"""
+    return jsonify({
+        'success': True,
+        'prediction_cache': prediction_cache.stats()
+    }), 200
+
+@app.route('/batcher-stats', methods=['GET'])
+def batcher_stats():
+    """Return micro-batching queue depth, batch sizes and added wait time"""
+    if micro_batcher is None:
+        return jsonify({'success': True, 'enabled': False}), 200
+    return jsonify({
+        'success': True,
+        'enabled': True,
+        'micro_batcher': micro_batcher.stats()
+    }), 200
+
+@app.route('/hasher-stats', methods=['GET'])
+def hasher_stats():
+    """Return password hashing pool limits, queue waits and rejections"""
+    return jsonify({
+        'success': True,
+        'password_hasher': password_hasher.stats()
+    }), 200
+
+@app.route('/token-cache-stats', methods=['GET'])
+def token_cache_stats():
+    """Return verified-token cache hit/miss/expiry counters"""
+    return jsonify({
+        'success': True,
+        'token_cache': token_cache.stats()
+    }), 200
+
+@app.route('/rate-limit-stats', methods=['GET'])
+def rate_limit_stats():
+    """Return per-route budgets, allowed/rejected totals and the busiest clients (pseudonymized)"""
+    if rate_limiter is None:
+        return jsonify({'success': True, 'enabled': False}), 200
+    return jsonify({
+        'success': True,
+        'enabled': True,
+        'routes': rate_limiter.stats()
+    }), 200
+
+@app.route('/store-stats', methods=['GET'])
+def store_stats():
+    """Return the report store backend, row counts and group-commit batching"""
+    return jsonify({
+        'success': True,
+        'report_store': report_store.stats()
+    }), 200
+
+@app.route('/inference-pool-stats', methods=['GET'])
+def inference_pool_stats():
+    """Return the worker pool configuration and the active inference engine"""
+    return jsonify({
+        'success': True,
+        'enabled': inference_pool is not None,
+        'active_model': active_bundle.describe(),
+        'inference_pool': inference_pool.stats() if inference_pool is not None else None
+    }), 200
 
 # ==================== RUN SERVER ====================
 
@@ -434,15 +1099,22 @@ if __name__ == '__main__':
     print("\n" + "="*60)
     print("DIAGNO AI - Backend Server")
     print("="*60)
-    print(f"Model Accuracy: {round(model_metrics['accuracy'] * 100, 2)}%")
-    print(f"Total Diseases: {model_metrics['total_diseases']}")
-    print(f"Total Symptoms: {model_metrics['total_symptoms']}")
+    if model_ready.is_set():
+        model_metrics = active_bundle.metrics
+        print(f"Model Accuracy: {round(model_metrics['accuracy'] * 100, 2)}%")
+        print(f"Total Diseases: {model_metrics['total_diseases']}")
+        print(f"Total Symptoms: {model_metrics['total_symptoms']}")
+    else:
+        print("Model: loading in the background (see GET /ready)")
     print("="*60)
     print("\n🚀 Server starting on http://localhost:5000")
     print("\nAvailable Endpoints:")
+    print("  - GET  /health")
+    print("  - GET  /ready")
     print("  - POST /signup")
     print("  - POST /login")
     print("  - POST /predict")
+    print("  - POST /predict-batch")
     print("  - GET  /get-symptoms")
     print("  - GET  /get-diseases")
     print("  - GET  /get-accuracy")
@@ -0,0 +1,98 @@
+"""Pick the most informative symptom to ask about next.
+
+For a partial symptom set S (plus symptoms the patient already denied), each
+candidate symptom c not yet asked is scored by its expected information gain
+
+    IG(c) = H(p) - [ P(yes) * H(p_yes) + P(no) * H(p_no) ]
+
+where p is the current disease posterior and H the entropy in bits:
+
+* p_yes comes from the model itself: all "S + c" rows are built as one
+  matrix and scored with a single batched predict_proba.
+* The model only sees present symptoms, so a "no" answer is applied as a
+  Bayes update of p with the per-disease likelihoods P(c | disease),
+  estimated from the training CSV (Laplace-smoothed) or, without it, from
+  disease_symptoms.json.
+* P(yes) = sum over diseases of p(disease) * P(c | disease).
+"""
+import numpy as np
+
+# Likelihoods used when only the catalog mapping is available
+CATALOG_PRESENT = 0.8
+CATALOG_ABSENT = 0.05
+
+
+def build_likelihoods(classes, symptom_list, disease_symptoms=None, cooccurrence=None):
+    """P(symptom | disease) as a (n_classes x n_symptoms) matrix in model order"""
+    classes = [str(c) for c in classes]
+    likelihoods = np.full((len(classes), len(symptom_list)), CATALOG_ABSENT)
+    if cooccurrence is not None and 'disease_counts' in cooccurrence:
+        rows = {str(disease): row for row, disease in enumerate(cooccurrence['diseases'])}
+        totals = cooccurrence['disease_totals']
+        for pos, disease in enumerate(classes):
+            row = rows.get(disease)
+            if row is not None:
+                likelihoods[pos] = (cooccurrence['disease_counts'][row] + 1) / (totals[row] + 2)
+        return likelihoods
+
+    symptom_index = {symptom: idx for idx, symptom in enumerate(symptom_list)}
+    for pos, disease in enumerate(classes):
+        for symptom in (disease_symptoms or {}).get(disease, []):
+            if symptom in symptom_index:
+                likelihoods[pos, symptom_index[symptom]] = CATALOG_PRESENT
+    return likelihoods
+
+
+def entropy(probabilities, axis=-1):
+    """Shannon entropy in bits along `axis`"""
+    p = np.clip(probabilities, 1e-12, 1.0)
+    return -(probabilities * np.log2(p)).sum(axis=axis)
+
+
+def _normalize(weights, axis=-1):
+    return weights / weights.sum(axis=axis, keepdims=True)
+
+
+def rank_questions(bundle, mask, absent_mask=0, limit=5):
+    """Return (current posterior, entropy, [question dicts]) for one partial symptom set"""
+    bitset = bundle.bitset
+    likelihoods = bundle.likelihoods
+    asked = mask | absent_mask
+    candidates = np.array([idx for idx in range(bitset.n_symptoms) if not asked >> idx & 1], dtype=np.int64)
+
+    # Row 0 is the current set, rows 1.. add one candidate each: one predict_proba
+    masks = [mask] + [mask | 1 << int(idx) for idx in candidates]
+    probabilities = bundle.predict_proba(bitset.unpack(masks))
+
+    # Denied symptoms re-weight every posterior the same way
+    absent = [idx for idx in range(bitset.n_symptoms) if absent_mask >> idx & 1]
+    if absent:
+        probabilities = _normalize(probabilities * np.prod(1.0 - likelihoods[:, absent], axis=1))
+
+    current = probabilities[0]
+    current_entropy = float(entropy(current))
+    if not len(candidates):
+        return current, current_entropy, []
+
+    p_yes_posterior = probabilities[1:]                      # (m, k)
+    candidate_likelihoods = likelihoods[:, candidates].T     # (m, k)
+    p_yes = candidate_likelihoods @ current                  # (m,)
+    p_no_posterior = _normalize(current * (1.0 - candidate_likelihoods))
+    expected = p_yes * entropy(p_yes_posterior) + (1.0 - p_yes) * entropy(p_no_posterior)
+    gain = current_entropy - expected
+
+    order = np.argsort(-gain, kind='stable')[:limit]
+    questions = []
+    for pos in order:
+        best = int(np.argmax(p_yes_posterior[pos]))
+        questions.append({
+            'symptom': bitset.symptom_list[candidates[pos]],
+            'label': bitset.symptom_list[candidates[pos]].replace('_', ' ').title(),
+            'expected_information_gain': round(float(gain[pos]), 4),
+            'probability_yes': round(float(p_yes[pos]), 4),
+            'if_yes': {
+                'disease': bundle.classes_[best],
+                'confidence': round(float(p_yes_posterior[pos, best]) * 100, 2)
+            }
+        })
+    return current, current_entropy, questions
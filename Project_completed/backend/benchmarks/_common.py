@@ -0,0 +1,42 @@
+"""Shared helpers for the backend micro-benchmarks.
+
+Benchmarks are plain scripts: run them from anywhere with
+`python backend/benchmarks/<name>.py`. They import the Flask app the same way
+the server does (from the backend directory, with ../models paths).
+"""
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def use_backend_dir():
+    """Make `import app` work exactly like `python app.py` from backend/"""
+    os.chdir(BACKEND_DIR)
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+
+
+def time_calls(fn, repeat, warmup=20):
+    """Call fn() repeat times and return per-call latencies in microseconds"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def report(label, samples):
+    """Print one aligned summary line (p50/p99/mean in microseconds)"""
+    mean = sum(samples) / len(samples)
+    print(f"  {label:<44} p50 {percentile(samples, 50):>9.1f} us   "
+          f"p99 {percentile(samples, 99):>9.1f} us   mean {mean:>9.1f} us")
@@ -0,0 +1,36 @@
+"""Next-question ranking: one batched predict_proba vs one call per candidate.
+
+The "per candidate" row scores every "current set + one symptom" row with
+its own predict_proba call, which is what ~98 /predict requests would do;
+rank_questions builds them as one matrix.
+"""
+import warnings
+
+import numpy as np
+
+from _common import report, time_calls, use_backend_dir
+
+use_backend_dir()
+warnings.filterwarnings('ignore')
+
+from ask_next import rank_questions
+from model_bundle import load_bundle
+
+REPEAT = 200
+SYMPTOMS = ['fever', 'cough']
+
+bundle = load_bundle('../models', version=1)
+mask = bundle.bitset.encode(SYMPTOMS)
+candidates = [idx for idx in range(bundle.bitset.n_symptoms) if not mask >> idx & 1]
+
+
+def per_candidate():
+    return [bundle.predict_proba(bundle.encode_mask(mask | 1 << idx))[0].copy() for idx in candidates]
+
+
+if __name__ == '__main__':
+    batched = bundle.predict_proba(bundle.bitset.unpack([mask | 1 << idx for idx in candidates]))
+    print(f"\n{len(candidates)} candidate symptoms for {SYMPTOMS}; "
+          f"max |Δp| batched vs per-row {np.abs(batched - np.array(per_candidate())).max():.1e}")
+    report('predict_proba per candidate', time_calls(per_candidate, REPEAT, warmup=5))
+    report('rank_questions (one batched call)', time_calls(lambda: rank_questions(bundle, mask), REPEAT, warmup=5))
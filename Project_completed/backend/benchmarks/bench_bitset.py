@@ -0,0 +1,62 @@
+"""Symptom sets as name lists vs packed bitsets.
+
+Compares the stored size of a report's symptoms, building a 1000-row batch
+feature matrix from names vs from masks, and set overlap via Python sets vs
+popcount on masks.
+"""
+import random
+import sys
+import warnings
+
+import numpy as np
+
+from _common import report, time_calls, use_backend_dir
+
+use_backend_dir()
+warnings.filterwarnings('ignore')
+
+from model_bundle import load_bundle
+
+BATCH = 1000
+REPEAT = 200
+
+bundle = load_bundle('../models', version=1)
+bitset = bundle.bitset
+rng = random.Random(0)
+symptom_sets = [rng.sample(bundle.symptom_list, rng.randint(3, 8)) for _ in range(BATCH)]
+masks = [bitset.encode(symptoms) for symptoms in symptom_sets]
+name_sets = [set(symptoms) for symptoms in symptom_sets]
+
+
+def build_feature_matrix(symptom_sets):
+    """The name-based feature matrix builder the bitset replaced"""
+    symptom_index = {symptom: idx for idx, symptom in enumerate(bundle.symptom_list)}
+    X = np.zeros((len(symptom_sets), len(bundle.symptom_list)), dtype=np.float64)
+    for row, symptoms in enumerate(symptom_sets):
+        for symptom in symptoms:
+            idx = symptom_index.get(symptom)
+            if idx is not None:
+                X[row, idx] = 1
+    return X
+
+
+def list_size(symptoms):
+    return sys.getsizeof(symptoms) + sum(sys.getsizeof(symptom) for symptom in symptoms)
+
+
+if __name__ == '__main__':
+    mean_list = sum(list_size(symptoms) for symptoms in symptom_sets) / BATCH
+    print(f"\nStored symptoms per report: list of names {mean_list:.0f} bytes, "
+          f"packed bitset {bitset.n_bytes} bytes")
+
+    print(f"\n{BATCH}-row feature matrix")
+    report('build_feature_matrix (names)', time_calls(lambda: build_feature_matrix(symptom_sets), REPEAT))
+    report('encode + unpack (names -> masks)',
+           time_calls(lambda: bitset.unpack([bitset.encode(symptoms) for symptoms in symptom_sets]), REPEAT))
+    report('unpack (masks)', time_calls(lambda: bitset.unpack(masks), REPEAT))
+
+    print(f"\nOverlap of one set against {BATCH}")
+    probe_set, probe_mask = name_sets[0], masks[0]
+    report('len(a & b) on name sets', time_calls(lambda: [len(probe_set & other) for other in name_sets], REPEAT))
+    report('popcount(a & b) on masks',
+           time_calls(lambda: [bitset.popcount(probe_mask & other) for other in masks], REPEAT))
@@ -0,0 +1,51 @@
+"""Catalog endpoint latency: per-request jsonify vs pre-encoded responses.
+
+The /legacy/* routes registered below reproduce what the handlers did before
+the bodies were rendered once per model version; every row goes through the
+Flask test client (plain, gzip, and revalidation with If-None-Match).
+"""
+import warnings
+
+from flask import jsonify
+
+from _common import report, time_calls, use_backend_dir
+
+use_backend_dir()
+warnings.filterwarnings('ignore')
+
+import app as api
+
+REPEAT = 2000
+
+
+@api.app.route('/legacy/get-symptoms')
+def legacy_symptoms():
+    symptom_list = api.active_bundle.symptom_list
+    return jsonify({
+        'success': True,
+        'symptoms': symptom_list,
+        'formatted_symptoms': [symptom.replace('_', ' ').title() for symptom in symptom_list],
+        'total': len(symptom_list)
+    }), 200
+
+
+@api.app.route('/legacy/get-disease-symptoms')
+def legacy_disease_symptoms():
+    mapping = api.active_bundle.disease_symptoms
+    return jsonify({'success': True, 'mapping': mapping, 'total': len(mapping)}), 200
+
+
+if __name__ == '__main__':
+    client = api.app.test_client()
+    print(f"\nCatalog endpoints, {REPEAT} requests each")
+    print("  catalog memory:", api.active_bundle.catalog.stats())
+    for url in ('/get-symptoms', '/get-disease-symptoms'):
+        etag = client.get(url).headers['ETag']
+        report(f'{url} rebuilt per request', time_calls(lambda: client.get('/legacy' + url), REPEAT))
+        report(f'{url} pre-encoded', time_calls(lambda: client.get(url), REPEAT))
+        report(f'{url} pre-encoded gzip',
+               time_calls(lambda: client.get(url, headers={'Accept-Encoding': 'gzip'}), REPEAT))
+        report(f'{url} If-None-Match (304)',
+               time_calls(lambda: client.get(url, headers={'If-None-Match': etag}), REPEAT))
+        print(f"    bytes on the wire: {len(client.get('/legacy' + url).data)} rebuilt, "
+              f"{len(client.get(url, headers={'Accept-Encoding': 'gzip'}).data)} gzip, 0 on 304")
@@ -0,0 +1,45 @@
+"""Cold-start time of the model bundle: versioned artifact vs. joblib pickle.
+
+Each measurement runs in a fresh interpreter (so imports are not cached) and
+times `load_bundle` plus one prediction. The artifact path memory-maps the
+.npy arrays and never imports scikit-learn; the pickle path unpickles the SVC.
+"""
+import json
+import statistics
+import subprocess
+import sys
+
+from _common import BACKEND_DIR
+
+RUNS = 7
+
+PROBE = r'''
+import json, sys, time
+start = time.perf_counter()
+from model_bundle import load_bundle
+bundle = load_bundle('../models', version=1, inference_engine=sys.argv[1])
+loaded = time.perf_counter()
+bundle.predict_proba(bundle.encode_mask(bundle.bitset.encode(['fever', 'cough'])))
+ready = time.perf_counter()
+print(json.dumps({'load': loaded - start, 'ready': ready - start,
+                  'source': bundle.source, 'sklearn': 'sklearn' in sys.modules}))
+'''
+
+
+def measure(engine):
+    samples = []
+    for _ in range(RUNS):
+        output = subprocess.run([sys.executable, '-W', 'ignore', '-c', PROBE, engine], cwd=BACKEND_DIR,
+                                capture_output=True, text=True, check=True).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return samples
+
+
+if __name__ == '__main__':
+    print(f"\nCold start, median of {RUNS} fresh interpreters")
+    for engine in ('sklearn', 'numpy'):
+        samples = measure(engine)
+        load = statistics.median(s['load'] for s in samples) * 1000
+        ready = statistics.median(s['ready'] for s in samples) * 1000
+        print(f"  {samples[0]['source']:<9} load_bundle {load:8.1f} ms   first prediction ready {ready:8.1f} ms   "
+              f"sklearn imported: {samples[0]['sklearn']}")
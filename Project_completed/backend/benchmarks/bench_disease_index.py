@@ -0,0 +1,63 @@
+"""Disease <-> symptom filter queries: bitset index vs scanning the mapping.
+
+The "scan" rows walk disease_symptoms.json the way the diagnosis page did
+client-side (union of symptom lists, subset check per disease); the index
+rows answer the same question with one AND/OR per input name.
+"""
+import json
+import warnings
+
+from _common import report, time_calls, use_backend_dir
+
+use_backend_dir()
+warnings.filterwarnings('ignore')
+
+import app as api
+
+REPEAT = 5000
+CHRONIC = ['Tuberculosis', 'Diabetes', 'Hypertension', 'Kidney Stones']
+SYMPTOMS = ['fever', 'cough']
+
+with open('../models/disease_symptoms.json') as f:
+    mapping = json.load(f)
+
+
+def scan_union(invert):
+    symptoms = set()
+    for disease, listed in mapping.items():
+        if (disease in CHRONIC) != invert:
+            symptoms.update(listed)
+    return sorted(symptoms)
+
+
+def scan_matching():
+    return [disease for disease, listed in mapping.items() if set(SYMPTOMS) <= set(listed)]
+
+
+if __name__ == '__main__':
+    index = api.active_bundle.disease_index
+    bitset = api.active_bundle.bitset
+    symptom_mask = bitset.encode(SYMPTOMS)
+
+    def index_union(invert):
+        diseases = index.complement(CHRONIC) if invert else CHRONIC
+        return bitset.decode(index.symptoms_of(diseases, mode='union'))
+
+    def index_matching():
+        return index.decode_diseases(index.diseases_matching(symptom_mask, mode='all'))
+
+    assert sorted(index_union(False)) == scan_union(False)
+    assert sorted(index_union(True)) == scan_union(True)
+    assert index_matching() == scan_matching()
+    print(f"\n{len(mapping)} diseases, {bitset.n_symptoms} symptoms; index and scan agree")
+
+    report('scan: chronic symptom union', time_calls(lambda: scan_union(False), REPEAT))
+    report('index: chronic symptom union', time_calls(lambda: index_union(False), REPEAT))
+    report('scan: acute symptom union', time_calls(lambda: scan_union(True), REPEAT))
+    report('index: acute symptom union', time_calls(lambda: index_union(True), REPEAT))
+    report(f'scan: diseases with all of {SYMPTOMS}', time_calls(scan_matching, REPEAT))
+    report(f'index: diseases with all of {SYMPTOMS}', time_calls(index_matching, REPEAT))
+
+    client = api.app.test_client()
+    url = f"/symptoms/of-diseases?diseases={','.join(CHRONIC)}&mode=union&invert=1"
+    report(f'GET {url}', time_calls(lambda: client.get(url), 1000))
@@ -0,0 +1,108 @@
+"""Memory and throughput of the multi-process inference pool.
+
+For 1, 2, 4 and 8 workers this compares two ways of giving each worker the
+model:
+
+  pickle  every worker joblib.loads its own SVC (imports scikit-learn)
+  mmap    InferencePool: workers map one shared copy of the NumPy arrays
+
+and reports per-worker RSS, per-worker private memory (USS) and the summed
+proportional set size (PSS) from /proc (Linux only), plus throughput for
+single-row and 32-row requests.
+"""
+import multiprocessing
+import threading
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+from _common import use_backend_dir
+
+use_backend_dir()
+warnings.filterwarnings('ignore')
+
+import numpy as np
+from inference_pool import InferencePool, worker_pids
+from model_artifact import current_artifact_dir, open_model_artifact
+
+WORKER_COUNTS = (1, 2, 4, 8)
+REQUESTS = 2000
+ROWS_PER_REQUEST = (1, 32)
+
+_pickled_model = None
+
+
+def _load_pickle():
+    global _pickled_model
+    import joblib
+    warnings.filterwarnings('ignore')
+    _pickled_model = joblib.load('../models/disease_model.pkl')
+
+
+def _pickle_predict_proba(X):
+    return _pickled_model.predict_proba(X)
+
+
+def memory_kb(pid):
+    """(RSS, USS, PSS) in kB for one process, read from /proc"""
+    values = {}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(':'):
+                    values[parts[0][:-1]] = int(parts[1]) if parts[1].isdigit() else 0
+    except OSError:
+        return None
+    uss = values.get('Private_Clean', 0) + values.get('Private_Dirty', 0)
+    return values.get('Rss', 0), uss, values.get('Pss', 0)
+
+
+def throughput(score, rows, threads):
+    X = np.zeros((rows, len(engine.feature_names)))
+    X[:, :5] = 1
+    per_thread = REQUESTS // threads
+
+    def worker():
+        for _ in range(per_thread):
+            score(X)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return per_thread * threads / (time.perf_counter() - start)
+
+
+def report(mode, workers, pids, score):
+    score(np.zeros((1, len(engine.feature_names))))
+    rates = [throughput(score, rows, threads=max(2, workers * 2)) for rows in ROWS_PER_REQUEST]
+    memory = [m for m in (memory_kb(pid) for pid in pids) if m is not None]
+    if memory:
+        rss = sum(m[0] for m in memory) / len(memory) / 1024
+        uss = sum(m[1] for m in memory) / len(memory) / 1024
+        pss = sum(m[2] for m in memory) / 1024
+        mem = f"RSS/worker {rss:6.1f} MB  USS/worker {uss:6.1f} MB  PSS total {pss:7.1f} MB"
+    else:
+        mem = "memory: /proc not available"
+    print(f"  {mode:<6} x{workers}  {mem}   "
+          f"{rates[0]:>7.0f} req/s (1 row)  {rates[1]:>6.0f} req/s ({ROWS_PER_REQUEST[1]} rows)")
+
+
+if __name__ == '__main__':
+    engine, _ = open_model_artifact(current_artifact_dir('../models'))
+    print(f"\nInference pool ({REQUESTS} requests per measurement, start method "
+          f"{'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'})")
+    for workers in WORKER_COUNTS:
+        executor = ProcessPoolExecutor(workers, initializer=_load_pickle)
+        pids = worker_pids(executor, workers)
+        report('pickle', workers, pids, lambda X: executor.submit(_pickle_predict_proba, X).result())
+        executor.shutdown()
+
+        pool = InferencePool(workers)
+        pids = pool.warm()
+        predictor = pool.predictor_for(engine, version=1)
+        report('mmap', workers, pids, predictor.predict_proba)
+        pool.close()
@@ -0,0 +1,80 @@
+"""/predict latency while a burst of /login calls is hashing passwords.
+
+LOGIN_THREADS clients log in back to back for DURATION_S seconds while one
+client sends /predict requests with distinct symptom sets (so the prediction
+cache never hits). Run once with bcrypt on the request threads (0 hashing
+workers, the old behaviour) and once per pool size.
+"""
+import os
+import random
+import threading
+import time
+import warnings
+
+from _common import percentile, use_backend_dir
+
+use_backend_dir()
+warnings.filterwarnings('ignore')
+os.environ.setdefault('DIAGNO_REPORT_STORE', 'memory')
+
+import app as api
+from password_hasher import PasswordHasher
+from report_store import open_store
+
+LOGIN_THREADS = 8
+DURATION_S = 5.0
+POOL_SIZES = (0, 1, 2)
+
+
+def run(workers):
+    api.password_hasher = PasswordHasher(api.app.config['BCRYPT_ROUNDS'], workers, max_queue=32)
+    api.report_store = open_store('memory')
+    api.app.test_client().post('/signup', json={'username': 'storm', 'password': 'secret'})
+    api.prediction_cache.clear()
+
+    stop = threading.Event()
+    logins = []
+    lock = threading.Lock()
+
+    def login_client():
+        client = api.app.test_client()
+        while not stop.is_set():
+            status = client.post('/login', json={'username': 'storm', 'password': 'secret'}).status_code
+            with lock:
+                logins.append(status)
+
+    threads = [threading.Thread(target=login_client) for _ in range(LOGIN_THREADS)]
+    for thread in threads:
+        thread.start()
+
+    rng = random.Random(workers)
+    client = api.app.test_client()
+    latencies = []
+    deadline = time.perf_counter() + DURATION_S
+    while time.perf_counter() < deadline:
+        symptoms = rng.sample(api.active_bundle.symptom_list, rng.randint(3, 6))
+        start = time.perf_counter()
+        client.post('/predict', json={'symptoms': symptoms})
+        latencies.append((time.perf_counter() - start) * 1000.0)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    label = 'inline bcrypt' if workers == 0 else f'hashing pool, {workers} worker(s)'
+    print(f"  {label:<28} /predict p50 {percentile(latencies, 50):>7.2f} ms   "
+          f"p99 {percentile(latencies, 99):>7.2f} ms   ({len(latencies)} requests)   "
+          f"logins {logins.count(200) / DURATION_S:>5.1f}/s, 503s {logins.count(503)}")
+    api.password_hasher.close()
+
+
+if __name__ == '__main__':
+    print(f"\nbcrypt cost {api.app.config['BCRYPT_ROUNDS']}, {LOGIN_THREADS} login threads, {DURATION_S:.0f} s each")
+    client = api.app.test_client()
+    quiet = []
+    for _ in range(500):
+        start = time.perf_counter()
+        client.post('/predict', json={'symptoms': random.sample(api.active_bundle.symptom_list, 4)})
+        quiet.append((time.perf_counter() - start) * 1000.0)
+    print(f"  {'no logins':<28} /predict p50 {percentile(quiet, 50):>7.2f} ms   p99 {percentile(quiet, 99):>7.2f} ms")
+    for workers in POOL_SIZES:
+        run(workers)
@@ -0,0 +1,68 @@
+"""Throughput of concurrent single-row scoring with and without micro-batching.
+
+Each thread scores distinct random symptom sets (so the prediction cache never
+hits) through app.score_mask, first directly and then through a
+MicroBatcher for each configured window.
+"""
+import random
+import threading
+import time
+import warnings
+
+from _common import use_backend_dir
+
+use_backend_dir()
+warnings.filterwarnings('ignore')
+
+import app as api
+from micro_batcher import MicroBatcher
+
+THREADS = 16
+REQUESTS_PER_THREAD = 200
+WINDOWS_MS = (0.5, 2.0, 5.0)
+
+
+def random_sets(seed, count):
+    rng = random.Random(seed)
+    return [rng.sample(api.active_bundle.symptom_list, rng.randint(3, 6)) for _ in range(count)]
+
+
+def run(label):
+    workloads = [random_sets(seed, REQUESTS_PER_THREAD) for seed in range(THREADS)]
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(sets):
+        local = []
+        for symptoms in sets:
+            start = time.perf_counter()
+            bundle = api.active_bundle
+            api.score_mask(bundle, bundle.bitset.encode(symptoms))
+            local.append((time.perf_counter() - start) * 1000.0)
+        with lock:
+            latencies.extend(local)
+
+    api.prediction_cache.clear()
+    threads = [threading.Thread(target=worker, args=(sets,)) for sets in workloads]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    print(f"  {label:<28} {len(latencies) / elapsed:>8.0f} req/s   "
+          f"p50 {latencies[len(latencies) // 2]:>7.2f} ms   p99 {latencies[int(len(latencies) * 0.99)]:>7.2f} ms")
+
+
+if __name__ == '__main__':
+    print(f"\n{THREADS} threads x {REQUESTS_PER_THREAD} distinct symptom sets")
+    api.micro_batcher = None
+    run('no batching')
+    for window in WINDOWS_MS:
+        batcher = MicroBatcher(api.score_batched_keys, max_wait_ms=window, max_batch_size=64)
+        api.micro_batcher = batcher
+        run(f'micro-batch {window} ms')
+        stats = batcher.stats()
+        print(f"    mean batch {stats['mean_batch_size']}, mean added wait "
+              f"{stats['mean_added_wait_ms']} ms, histogram {stats['batch_size_histogram']}")
@@ -0,0 +1,36 @@
+"""Cost of resolving symptom names on every /predict row.
+
+Exact column names take the dict fast path; mixed rows exercise case and
+separator normalization and synonyms; misspelled rows hit the trigram index
+(first call) and then its memo.
+"""
+import json
+
+from _common import report, time_calls, use_backend_dir
+
+use_backend_dir()
+
+from symptom_normalizer import SymptomNormalizer
+
+REPEAT = 5000
+
+with open('../models/symptom_list.json', 'r') as f:
+    symptom_list = json.load(f)
+
+ROWS = {
+    'exact names (5)': ['fever', 'cough', 'fatigue', 'headache', 'nausea'],
+    'mixed case/separators/synonyms (5)': ['Fever', 'body-ache', 'Tired', 'Short of breath', 'Headaches'],
+    'misspelled, memoized (5)': ['feverr', 'headach', 'diarhea', 'caugh', 'nausia'],
+}
+
+
+if __name__ == '__main__':
+    print("\nSymptomNormalizer.resolve per row")
+    started = time_calls(lambda: SymptomNormalizer(symptom_list), 50, warmup=2)
+    report('build index', started)
+    normalizer = SymptomNormalizer(symptom_list)
+    for label, row in ROWS.items():
+        report(label, time_calls(lambda: normalizer.resolve(row), REPEAT))
+    misspelled = ROWS['misspelled, memoized (5)']
+    report('misspelled, cold memo (5)',
+           time_calls(lambda: (normalizer._fuzzy_memo.clear(), normalizer.resolve(misspelled)), 500))
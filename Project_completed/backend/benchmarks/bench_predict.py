@@ -0,0 +1,53 @@
+"""Per-request latency of /predict: legacy DataFrame path vs. reusable NumPy row.
+
+The legacy path is reproduced here exactly as app.py used to run it (98-key
+dict -> one-row DataFrame -> model.predict + model.predict_proba -> linear
+classes_.index lookup) so both paths are timed against the same loaded model.
+"""
+import warnings
+
+from _common import use_backend_dir, time_calls, report
+
+use_backend_dir()
+warnings.filterwarnings('ignore')
+
+import joblib
+import numpy as np
+import pandas as pd
+import app as api
+
+SYMPTOMS = ['fever', 'cough', 'fatigue', 'headache', 'body_ache']
+REPEAT = 2000
+
+
+bundle = api.active_bundle
+legacy_model = joblib.load('../models/disease_model.pkl')
+
+
+def legacy_predict():
+    features = {symptom: 0 for symptom in bundle.symptom_list}
+    for symptom in SYMPTOMS:
+        if symptom in features:
+            features[symptom] = 1
+    X = pd.DataFrame([features])
+    prediction = legacy_model.predict(X)[0]
+    probabilities = legacy_model.predict_proba(X)[0]
+    top = np.argsort(probabilities)[-3:][::-1]
+    return prediction, probabilities[legacy_model.classes_.tolist().index(prediction)], top
+
+
+def current_predict():
+    probabilities = bundle.predict_proba(bundle.encode_mask(bundle.bitset.encode(SYMPTOMS)))[0]
+    return api.rank_predictions(bundle, probabilities, 3)
+
+
+if __name__ == '__main__':
+    client = api.app.test_client()
+    payload = {'symptoms': SYMPTOMS}
+
+    print(f"\n/predict inference path ({REPEAT} calls, {len(bundle.symptom_list)} symptoms)")
+    report('before: dict + DataFrame + 2 model calls', time_calls(legacy_predict, REPEAT))
+    report('after:  NumPy row + single predict_proba', time_calls(current_predict, REPEAT))
+
+    print("\nFull request through the Flask test client")
+    report('POST /predict', time_calls(lambda: client.post('/predict', json=payload), REPEAT // 2))
@@ -0,0 +1,49 @@
+"""Token-bucket limiter overhead: per-request cost, memory per key, idle sweep.
+
+One flooding client and one polite client share the /predict budget to show
+that only the flooder is rejected; then KEYS distinct clients are admitted
+once each to measure bucket memory and how long a sweep of them takes.
+"""
+import time
+import tracemalloc
+
+from _common import report, time_calls, use_backend_dir
+
+use_backend_dir()
+
+from rate_limiter import RateLimiter
+
+REPEAT = 20000
+KEYS = 100000
+
+if __name__ == '__main__':
+    limiter = RateLimiter({'predict': (20.0, 40)})
+    print()
+    report('acquire, same key', time_calls(lambda: limiter.acquire('predict', 'ip:10.0.0.1'), REPEAT))
+
+    limiter = RateLimiter({'predict': (20.0, 40)})
+    flood = polite = 0
+    deadline = time.monotonic() + 2.0
+    next_polite = time.monotonic()
+    while time.monotonic() < deadline:
+        flood += limiter.acquire('predict', 'ip:flooder') == 0.0
+        if time.monotonic() >= next_polite:
+            polite += limiter.acquire('predict', 'user:polite') == 0.0
+            next_polite += 0.1
+    stats = limiter.stats()['predict']
+    print(f"  2 s at 20/s burst 40: flooder admitted {flood}, polite client admitted {polite} "
+          f"(rejected {stats['rejected']} total)")
+
+    limiter = RateLimiter({'predict': (1000.0, 1)})
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for key in range(KEYS):
+        limiter.acquire('predict', f'ip:{key}')
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    print(f"  {KEYS} keys: {used / KEYS:.0f} bytes per active key (key string included)")
+    time.sleep(0.01)
+    start = time.perf_counter()
+    limiter.sweep()
+    print(f"  sweep of {KEYS} idle keys: {(time.perf_counter() - start) * 1000:.1f} ms, "
+          f"{limiter.stats()['predict']['active_keys']} left")
@@ -0,0 +1,95 @@
+"""Journal store: write throughput and recovery time.
+
+Writes: WRITERS threads save REPORTS_PER_WRITER reports each, with one fsync
+per report (batch size 1) and with fsync batching (group commit).
+Recovery: a journal of RECOVERY_REPORTS report records (1000 users) is
+replayed at open, then compacted into a snapshot (while another thread keeps
+saving) and the snapshot reopened.
+Everything lives in a temporary directory.
+"""
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+
+from _common import use_backend_dir
+
+use_backend_dir()
+
+from report_store import JOURNAL_FILE, JournalStore, _encode, _report_record, _user_record
+
+WRITERS = 16
+REPORTS_PER_WRITER = 250
+RECOVERY_REPORTS = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+RECOVERY_USERS = 1000
+SAMPLE_REPORT = {
+    'prediction': 'Flu',
+    'confidence': 87.5,
+    'symptom_bits': bytes(13),
+    'symptom_codec': 'bench'
+}
+
+
+def writes(label, directory, **options):
+    store = JournalStore(directory, **options)
+
+    def writer(user):
+        for _ in range(REPORTS_PER_WRITER):
+            store.add_report(f'user{user}', SAMPLE_REPORT)
+
+    threads = [threading.Thread(target=writer, args=(user,)) for user in range(WRITERS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    batch = store.stats()['group_commit']['mean_batch_size']
+    print(f"  {label:<30} {WRITERS * REPORTS_PER_WRITER / elapsed:>8.0f} saves/s   mean fsync batch {batch}")
+    store.close()
+
+
+def timed_open(label, directory):
+    start = time.perf_counter()
+    store = JournalStore(directory, snapshot_every=RECOVERY_REPORTS * 2)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<30} {elapsed:>7.2f} s   ({store.replay['records'] / elapsed:>9.0f} records/s, "
+          f"{store.stats()['reports']} reports)")
+    return store
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"\n{WRITERS} writer threads x {REPORTS_PER_WRITER} reports")
+        writes('fsync every report', os.path.join(directory, 'single'), fsync_batch_size=1)
+        writes('fsync batched (256 / 0 ms)', os.path.join(directory, 'batched'))
+
+        recovery = os.path.join(directory, 'recovery')
+        os.makedirs(recovery)
+        path = os.path.join(recovery, JOURNAL_FILE)
+        with open(path, 'w', encoding='utf-8') as f:
+            for user in range(RECOVERY_USERS):
+                f.write(_encode(_user_record(f'user{user}', {'password': b'$2b$12$' + b'x' * 53})))
+            for report_id in range(RECOVERY_REPORTS):
+                f.write(_encode(_report_record(f'user{report_id % RECOVERY_USERS}',
+                                               dict(SAMPLE_REPORT, id=report_id // RECOVERY_USERS + 1))))
+        print(f"\n{RECOVERY_REPORTS} journaled reports ({os.path.getsize(path) / 1e6:.0f} MB journal)")
+        store = timed_open('replay journal', recovery)
+        # Compaction runs in the background: keep saving while it does
+        compaction = threading.Thread(target=store.compact)
+        start = time.perf_counter()
+        compaction.start()
+        latencies = []
+        while compaction.is_alive():
+            saved = time.perf_counter()
+            store.add_report('user0', SAMPLE_REPORT)
+            latencies.append((time.perf_counter() - saved) * 1000)
+        compaction.join()
+        print(f"  {'compact into snapshot':<30} {time.perf_counter() - start:>7.2f} s   "
+              f"({len(latencies)} saves meanwhile, max {max(latencies):.1f} ms)")
+        store.close()
+        del store
+        timed_open('replay snapshot', recovery).close()
+        print(f"  peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
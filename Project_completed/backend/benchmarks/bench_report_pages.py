@@ -0,0 +1,80 @@
+"""/get-reports page cost vs history size.
+
+For users with HISTORY_SIZES saved reports, times the whole history (the old
+response) against one keyset page of PAGE_SIZE newest-first reports, taken
+from the middle of the history, in the in-memory and SQLite stores.
+Filtered pages: one day in the middle of the history (?from=&to=) and a rare
+disease (one report in RARE_EVERY), plus the `total` each page carries,
+counted by the store with the same filters.
+Each stored report carries packed symptoms, unpacked by report_view.
+"""
+import datetime
+import itertools
+import os
+import tempfile
+import warnings
+
+from _common import report, time_calls, use_backend_dir
+
+use_backend_dir()
+warnings.filterwarnings('ignore')
+os.environ.setdefault('DIAGNO_REPORT_STORE', 'memory')
+
+import app as api
+from report_store import MemoryStore, SQLiteStore
+
+HISTORY_SIZES = (100, 1000, 10000, 100000)
+PAGE_SIZE = 20
+RARE_EVERY = 1000
+FIRST_SAVE = datetime.datetime(2026, 1, 1)
+
+
+def minute_clock():
+    """Store clock that moves one minute per saved report: 1440 reports a day"""
+    minutes = itertools.count()
+    return lambda: str(FIRST_SAVE + datetime.timedelta(minutes=next(minutes)))
+
+
+def fill(store, size):
+    packed = api.pack_report_symptoms(['fever', 'cough', 'fatigue', 'headache'])
+    for pos in range(size):
+        saved = dict(packed, prediction='Malaria' if pos % RARE_EVERY == RARE_EVERY // 2 else 'Flu',
+                     confidence=80.0)
+        store.add_report(f'user{size}', saved)
+
+
+def run(label, store):
+    print(f"\n{label}")
+    for size in HISTORY_SIZES:
+        fill(store, size)
+        user = f'user{size}'
+        middle = size // 2
+        day = store.list_reports(user, after=middle - 1, limit=1)[0]['timestamp'][:10]
+        next_day = (datetime.date.fromisoformat(day) + datetime.timedelta(days=1)).isoformat()
+        report(f'{size:>6} reports: whole history',
+               time_calls(lambda: [api.report_view(r) for r in store.list_reports(user)], 10, warmup=1))
+        report(f'{size:>6} reports: page of {PAGE_SIZE}',
+               time_calls(lambda: [api.report_view(r) for r in store.list_reports(
+                   user, limit=PAGE_SIZE, after=middle, descending=True)], 500))
+        report(f'{size:>6} reports: summary page of {PAGE_SIZE}',
+               time_calls(lambda: store.list_reports(user, limit=PAGE_SIZE, after=middle,
+                                                     descending=True, summary=True), 500))
+        report(f'{size:>6} reports: one-day page',
+               time_calls(lambda: store.list_reports(user, limit=PAGE_SIZE, start=day, end=next_day,
+                                                     descending=True, summary=True), 500))
+        report(f'{size:>6} reports: rare-disease page',
+               time_calls(lambda: store.list_reports(user, limit=PAGE_SIZE, disease='Malaria',
+                                                     descending=True, summary=True), 500))
+        report(f'{size:>6} reports: total',
+               time_calls(lambda: store.count_reports(user), 2000))
+        report(f'{size:>6} reports: one-day total',
+               time_calls(lambda: store.count_reports(user, start=day, end=next_day), 500))
+        report(f'{size:>6} reports: rare-disease total',
+               time_calls(lambda: store.count_reports(user, disease='Malaria'), 500))
+    store.close()
+
+
+if __name__ == '__main__':
+    run('memory', MemoryStore(clock=minute_clock()))
+    with tempfile.TemporaryDirectory() as directory:
+        run('sqlite', SQLiteStore(os.path.join(directory, 'pages.db'), clock=minute_clock()))
@@ -0,0 +1,68 @@
+"""/report-stats cost: counters kept by the store vs recounting the user's reports.
+
+For one user with HISTORY_SIZES reports, times the store's report_summary
+against what the dashboard used to do (fetch every report and count) in the
+in-memory store, and the same summary read from SQLite's report_counts table
+by a second store on the same file (another API process), plus the one-off
+count of a database created before the table existed.
+"""
+import os
+import sqlite3
+import tempfile
+import time
+from collections import Counter
+
+from _common import report, time_calls, use_backend_dir
+
+use_backend_dir()
+
+from report_store import MemoryStore, SQLiteStore
+
+HISTORY_SIZES = (1000, 10000, 100000)
+DISEASES = ['Flu', 'Common Cold', 'Migraine', 'COVID-19', 'Dengue', 'Malaria']
+
+
+def sample(pos):
+    return {
+        'prediction': DISEASES[pos % len(DISEASES)],
+        'confidence': 30 + pos % 70
+    }
+
+
+def recount(store, username):
+    reports = store.list_reports(username)
+    return Counter(r['prediction'] for r in reports), sum(float(r['confidence']) for r in reports) / len(reports)
+
+
+if __name__ == '__main__':
+    for size in HISTORY_SIZES:
+        store = MemoryStore()
+        for pos in range(size):
+            store.add_report('heavy', sample(pos))
+        print(f"\n{size} reports")
+        report('recount from list_reports', time_calls(lambda: recount(store, 'heavy'), 20, warmup=2))
+        report('MemoryStore.report_summary (30 days)',
+               time_calls(lambda: store.report_summary('heavy', 30), 2000))
+
+    size = HISTORY_SIZES[-1]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'stats.db')
+        sqlite = SQLiteStore(path)
+        for pos in range(size):
+            sqlite.add_report('heavy' if pos % 2 else f'user{pos % 100}', sample(pos))
+        reader = SQLiteStore(path)
+        print(f"\n{size} reports in SQLite")
+        report('SQLiteStore.report_summary (30 days)',
+               time_calls(lambda: reader.report_summary('heavy', 30), 2000))
+        assert reader.report_summary('heavy', 30) == sqlite.report_summary('heavy', 30)
+        sqlite.close()
+        reader.close()
+
+        connection = sqlite3.connect(path)
+        with connection:
+            connection.execute('DELETE FROM report_counts')
+        connection.close()
+        start = time.perf_counter()
+        SQLiteStore(path).close()
+        print(f"  count {size} reports of a database without report_counts in "
+              f"{time.perf_counter() - start:.2f} s")
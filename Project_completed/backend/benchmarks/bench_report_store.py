@@ -0,0 +1,95 @@
+"""Report store throughput: concurrent save_report writers, then get_reports reads.
+
+WRITERS threads each add REPORTS_PER_WRITER reports for their own user to
+the in-memory store, to SQLite committing every insert on its own, and to
+SQLite with group commit (no wait, and a 2 ms collection window). Reads list
+one user's full history.
+Fresh threads: like a threaded Werkzeug server, every save (plus the user
+lookup and history read around it) runs on its own short-lived thread;
+SQLite connections and open file descriptors must stay bounded.
+The database lives in a temporary directory.
+"""
+import os
+import tempfile
+import threading
+import time
+
+from _common import report, time_calls, use_backend_dir
+
+use_backend_dir()
+
+from report_store import MemoryStore, SQLiteStore
+
+WRITERS = 16
+REPORTS_PER_WRITER = 250
+FRESH_THREADS = 2000
+SAMPLE_REPORT = {
+    'prediction': 'Flu',
+    'confidence': 87.5,
+    'symptom_bits': bytes(13),
+    'symptom_codec': 'bench'
+}
+
+
+def run(label, store):
+    def writer(user):
+        for _ in range(REPORTS_PER_WRITER):
+            store.add_report(f'user{user}', SAMPLE_REPORT)
+
+    threads = [threading.Thread(target=writer, args=(user,)) for user in range(WRITERS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    ids = store.list_reports('user0')
+    assert [r['id'] for r in ids] == list(range(1, REPORTS_PER_WRITER + 1))
+    print(f"  {label:<32} {WRITERS * REPORTS_PER_WRITER / elapsed:>8.0f} saves/s")
+    report(f'    list_reports ({REPORTS_PER_WRITER} reports)', time_calls(lambda: store.list_reports('user0'), 200))
+    store.close()
+
+
+def open_fds():
+    # Linux only; None elsewhere
+    return len(os.listdir('/proc/self/fd')) if os.path.isdir('/proc/self/fd') else None
+
+
+def fresh_threads(label, store):
+    store.create_user('fresh', {'password': b'x'})
+    fds_before = open_fds()
+
+    def request(pos):
+        store.get_user('fresh')
+        store.add_report('fresh', SAMPLE_REPORT)
+        store.list_reports('fresh', limit=5, descending=True)
+
+    start = time.perf_counter()
+    for batch in range(0, FRESH_THREADS, WRITERS):
+        threads = [threading.Thread(target=request, args=(pos,)) for pos in range(batch, batch + WRITERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    elapsed = time.perf_counter() - start
+    assert store.count_reports('fresh') == FRESH_THREADS
+    fds_after = open_fds()
+    fds = f", open fds {fds_before} -> {fds_after}" if fds_before is not None else ''
+    print(f"  {label:<32} {FRESH_THREADS / elapsed:>8.0f} requests/s   "
+          f"connections {store.stats().get('connections', 0)}{fds}")
+    store.close()
+
+
+if __name__ == '__main__':
+    print(f"\n{WRITERS} writer threads x {REPORTS_PER_WRITER} reports")
+    run('memory', MemoryStore())
+    with tempfile.TemporaryDirectory() as directory:
+        run('sqlite, commit per insert', SQLiteStore(os.path.join(directory, 'single.db'),
+                                                     commit_batch_size=1, commit_wait_ms=0))
+        for wait_ms in (0, 2):
+            store = SQLiteStore(os.path.join(directory, f'batched{wait_ms}.db'), commit_wait_ms=wait_ms)
+            run(f'sqlite, group commit (64 / {wait_ms} ms)', store)
+            print(f"    mean commit batch {store._writer.stats()['mean_batch_size']}")
+
+        print(f"\n{FRESH_THREADS} requests, each on a new thread ({WRITERS} at a time)")
+        fresh_threads('sqlite', SQLiteStore(os.path.join(directory, 'fresh.db')))
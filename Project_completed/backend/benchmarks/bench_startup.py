@@ -0,0 +1,115 @@
+"""API startup benchmark based on `python -X importtime`.
+
+Runs `import app` in fresh interpreters and reports:
+
+  * wall time until the app module is imported and until the model is
+    resident (app.model_ready), for synchronous and background loading
+  * the cumulative import time of the app module and its heaviest imports,
+    parsed from -X importtime
+
+Results are compared with startup_baseline.json next to this script;
+`--record` overwrites that baseline with the current measurements.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from _common import BACKEND_DIR
+
+RUNS = 5
+TOP_IMPORTS = 12
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'startup_baseline.json')
+
+PROBE = r'''
+import json, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+ready_event = getattr(app, 'model_ready', None)
+if ready_event is not None:
+    ready_event.wait()
+ready = time.perf_counter()
+print(json.dumps({'import_ms': (imported - start) * 1000, 'ready_ms': (ready - start) * 1000}))
+'''
+
+
+def run_probe(background, importtime=False):
+    env = dict(os.environ, DIAGNO_BACKGROUND_LOAD='1' if background else '0', PYTHONWARNINGS='ignore')
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', PROBE]
+    result = subprocess.run(command, cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True)
+    # The model loader thread may print after the probe's JSON line
+    line = next(line for line in result.stdout.splitlines() if line.startswith('{'))
+    return json.loads(line), result.stderr
+
+
+def parse_importtime(stderr):
+    """{module: cumulative microseconds} for `app` and its direct imports.
+
+    -X importtime prints children before their parent, indented two spaces
+    per level, so the direct imports of `app` are the depth-1 lines since
+    the previous top-level line.
+    """
+    children = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            children[name.strip()] = int(cumulative)
+        elif depth == 0:
+            if name.strip() == 'app':
+                children['app'] = int(cumulative)
+                return children
+            children = {}
+    return children
+
+
+def measure():
+    results = {}
+    for mode, background in (('sync', False), ('background', True)):
+        samples = [run_probe(background)[0] for _ in range(RUNS)]
+        results[mode] = {
+            'import_ms': round(statistics.median(s['import_ms'] for s in samples), 1),
+            'ready_ms': round(statistics.median(s['ready_ms'] for s in samples), 1)
+        }
+    modules = parse_importtime(run_probe(False, importtime=True)[1])
+    heaviest = sorted(((name, us) for name, us in modules.items() if name != 'app'),
+                      key=lambda item: item[1], reverse=True)[:TOP_IMPORTS]
+    results['importtime'] = {
+        'app_cumulative_ms': round(modules.get('app', 0) / 1000, 1),
+        'heaviest_ms': {name: round(us / 1000, 1) for name, us in heaviest}
+    }
+    return results
+
+
+def show(label, current, baseline):
+    line = f"  {label:<34} {current:>8.1f} ms"
+    if baseline is not None:
+        line += f"   baseline {baseline:>8.1f} ms   ({current - baseline:+.1f} ms)"
+    print(line)
+
+
+if __name__ == '__main__':
+    current = measure()
+    if '--record' in sys.argv:
+        with open(BASELINE_PATH, 'w') as f:
+            json.dump(current, f, indent=2)
+        print(f"✓ Baseline recorded to {BASELINE_PATH}")
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, 'r') as f:
+            baseline = json.load(f)
+
+    print(f"\nAPI startup, median of {RUNS} fresh interpreters")
+    for mode in ('sync', 'background'):
+        for key, label in (('import_ms', 'import app'), ('ready_ms', 'model resident')):
+            show(f'{mode}: {label}', current[mode][key], baseline.get(mode, {}).get(key))
+    show('-X importtime: app (cumulative)', current['importtime']['app_cumulative_ms'],
+         baseline.get('importtime', {}).get('app_cumulative_ms'))
+    print("\n  Heaviest imports (cumulative, -X importtime):")
+    for name, ms in current['importtime']['heaviest_ms'].items():
+        show(f'  {name}', ms, baseline.get('importtime', {}).get('heaviest_ms', {}).get(name))
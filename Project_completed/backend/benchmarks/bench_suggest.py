@@ -0,0 +1,30 @@
+"""Per-keystroke cost of /symptoms/suggest.
+
+Times SymptomSuggester.suggest directly (server work per keystroke) and the
+full request through the Flask test client, for a user typing "chest" with
+two symptoms already selected.
+"""
+import warnings
+
+from _common import report, time_calls, use_backend_dir
+
+use_backend_dir()
+warnings.filterwarnings('ignore')
+
+import app as api
+
+REPEAT = 5000
+QUERY = 'chest'
+SELECTED = ['fever', 'cough']
+
+
+if __name__ == '__main__':
+    suggester = api.active_bundle.suggester
+    client = api.app.test_client()
+    print(f"\nTyping {QUERY!r} with {SELECTED} selected")
+    for length in range(1, len(QUERY) + 1):
+        prefix = QUERY[:length]
+        report(f'suggest({prefix!r})', time_calls(lambda: suggester.suggest(prefix, SELECTED, 10), REPEAT))
+    report('suggest(\'\') (no prefix, all symptoms)', time_calls(lambda: suggester.suggest('', SELECTED, 10), REPEAT))
+    url = f"/symptoms/suggest?q={QUERY[:2]}&selected={','.join(SELECTED)}"
+    report(f'GET {url}', time_calls(lambda: client.get(url), 1000))
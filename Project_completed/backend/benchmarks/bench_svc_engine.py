@@ -0,0 +1,52 @@
+"""scikit-learn SVC vs. the pure-NumPy engine: parity and latency.
+
+Parity is checked on every row of data/disease_symptom_dataset.csv; the script
+exits non-zero if any probability differs by more than TOLERANCE or the
+predicted class changes. Latency is reported for single rows and for one
+batched call over the whole dataset.
+"""
+import sys
+import warnings
+
+from _common import use_backend_dir, time_calls, report
+
+use_backend_dir()
+warnings.filterwarnings('ignore')
+
+import joblib
+import numpy as np
+import pandas as pd
+from model_artifact import current_artifact_dir, open_model_artifact
+
+TOLERANCE = 1e-3
+REPEAT = 2000
+
+if __name__ == '__main__':
+    model = joblib.load('../models/disease_model.pkl')
+    engine, _ = open_model_artifact(current_artifact_dir('../models'))
+    df = pd.read_csv('../data/disease_symptom_dataset.csv')
+    X = df[engine.feature_names].to_numpy(dtype=np.float64)
+
+    expected = model.predict_proba(X)
+    actual = engine.predict_proba(X)
+    max_error = np.abs(expected - actual).max()
+    agreement = (expected.argmax(axis=1) == actual.argmax(axis=1)).mean()
+    print(f"\nParity on {len(X)} dataset rows: max |Δp| = {max_error:.2e}, "
+          f"argmax agreement = {agreement * 100:.2f}%")
+
+    row = X[:1]
+    print(f"\nSingle row ({REPEAT} calls)")
+    report('sklearn SVC.predict_proba', time_calls(lambda: model.predict_proba(row), REPEAT))
+    report('NumpySVC.predict_proba', time_calls(lambda: engine.predict_proba(row), REPEAT))
+
+    print(f"\nBatched ({len(X)} rows per call)")
+    sk_batch = time_calls(lambda: model.predict_proba(X), 50, warmup=3)
+    np_batch = time_calls(lambda: engine.predict_proba(X), 50, warmup=3)
+    report('sklearn SVC.predict_proba', sk_batch)
+    report('NumpySVC.predict_proba', np_batch)
+    print(f"  per row: sklearn {sorted(sk_batch)[25] / len(X):.2f} us, "
+          f"numpy {sorted(np_batch)[25] / len(X):.2f} us")
+
+    if max_error > TOLERANCE or agreement < 1.0:
+        sys.exit("Parity check FAILED")
+    print("\n✓ Parity check passed")
@@ -0,0 +1,56 @@
+"""Cost of authenticating a replayed JWT: jwt.decode vs the verified-token cache.
+
+Times verify_token with the cache cleared before every call (full split,
+base64, HMAC and JSON work) and with a warm cache, then the whole
+GET /get-reports request both ways. Every verification also asks the report
+store whether the token was revoked; the SQLite lookup is timed on its own.
+"""
+import os
+import tempfile
+import time
+import warnings
+
+from _common import report, time_calls, use_backend_dir
+
+use_backend_dir()
+warnings.filterwarnings('ignore')
+os.environ.setdefault('DIAGNO_REPORT_STORE', 'memory')
+
+import app as api
+from report_store import SQLiteStore
+from token_cache import token_digest
+
+REPEAT = 5000
+
+
+def uncached(fn):
+    def call():
+        api.token_cache.clear()
+        return fn()
+    return call
+
+
+if __name__ == '__main__':
+    client = api.app.test_client()
+    api.password_hasher.rounds = 4
+    client.post('/signup', json={'username': 'bench', 'password': 'secret'})
+    token = client.post('/login', json={'username': 'bench', 'password': 'secret'}).get_json()['token']
+    headers = {'Authorization': f'Bearer {token}'}
+
+    print()
+    report('verify_token, jwt.decode every call', time_calls(uncached(lambda: api.verify_token(token)), REPEAT))
+    report('verify_token, cache hit', time_calls(lambda: api.verify_token(token), REPEAT))
+    report('GET /get-reports, jwt.decode every call',
+           time_calls(uncached(lambda: client.get('/get-reports', headers=headers)), 1000))
+    report('GET /get-reports, cache hit', time_calls(lambda: client.get('/get-reports', headers=headers), 1000))
+    report('GET /get-reports, malformed header',
+           time_calls(lambda: client.get('/get-reports', headers={'Authorization': 'Bearer'}), 1000))
+    print(f"  {api.token_cache.stats()}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = SQLiteStore(os.path.join(directory, 'revoked.db'))
+        for pos in range(1000):
+            store.revoke_token(f'{pos:064x}', time.time() + 3600)
+        digest = token_digest(token).hex()
+        report('token_revoked, sqlite (1000 revoked)', time_calls(lambda: store.token_revoked(digest), REPEAT))
+        store.close()
@@ -0,0 +1,144 @@
+"""Stress check: many threads hammering POST /save-report for a few users.
+
+THREADS clients (spread over USERS accounts, so several threads share each
+user) each save SAVES_PER_THREAD reports through the Flask test client.
+Afterwards every user must have exactly the reports that were acknowledged,
+with ids 1..N, no duplicates and timestamps in id order, in the in-memory,
+SQLite and journal stores (the journal store is reopened from disk before
+checking). A last run saves straight into two SQLiteStores opened on the
+same file, as two API processes would.
+Exits non-zero on any lost, duplicated or misordered report.
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from collections import Counter
+
+from _common import use_backend_dir
+
+use_backend_dir()
+warnings.filterwarnings('ignore')
+os.environ.setdefault('DIAGNO_REPORT_STORE', 'memory')
+
+import app as api
+from report_store import JournalStore, MemoryStore, SQLiteStore
+
+THREADS = 32
+USERS = 4
+SAVES_PER_THREAD = 200
+
+
+def check(store, acknowledged, returned_ids):
+    failures = []
+    for username, ids in returned_ids.items():
+        stored = store.list_reports(username)
+        stored_ids = [report['id'] for report in stored]
+        timestamps = [report['timestamp'] for report in stored]
+        expected = list(range(1, acknowledged[username] + 1))
+        duplicates = [report_id for report_id, count in Counter(ids).items() if count > 1]
+        if sorted(stored_ids) != expected or duplicates or sorted(ids) != expected:
+            failures.append(f"{username}: {acknowledged[username]} acknowledged, {len(stored_ids)} stored, "
+                            f"{len(set(stored_ids))} distinct ids, {len(duplicates)} ids returned twice")
+        if timestamps != sorted(timestamps):
+            failures.append(f"{username}: timestamps out of id order")
+    return failures
+
+
+def report_run(label, total, elapsed, failures):
+    print(f"  {label:<9} {total} saves from {THREADS} threads in {elapsed:.2f} s "
+          f"({total / elapsed:.0f}/s): {'OK' if not failures else 'FAILED'}")
+    for failure in failures:
+        print(f"    {failure}")
+
+
+def run(label, store, reopen=None):
+    api.report_store = store
+    api.password_hasher.rounds = 4
+    client = api.app.test_client()
+    tokens = {}
+    for user in range(USERS):
+        username = f'stress{user}'
+        client.post('/signup', json={'username': username, 'password': 'secret'})
+        tokens[username] = client.post('/login', json={'username': username, 'password': 'secret'}).get_json()['token']
+
+    acknowledged = Counter()
+    returned_ids = {username: [] for username in tokens}
+    lock = threading.Lock()
+
+    def writer(thread):
+        username = f'stress{thread % USERS}'
+        headers = {'Authorization': f'Bearer {tokens[username]}'}
+        thread_client = api.app.test_client()
+        ids = []
+        for pos in range(SAVES_PER_THREAD):
+            response = thread_client.post('/save-report', headers=headers, json={
+                'prediction': 'Flu', 'confidence': pos, 'symptoms': ['fever', 'cough']})
+            if response.status_code == 201:
+                ids.append(response.get_json()['report_id'])
+        with lock:
+            acknowledged[username] += len(ids)
+            returned_ids[username].extend(ids)
+
+    threads = [threading.Thread(target=writer, args=(thread,)) for thread in range(THREADS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    if reopen is not None:
+        store.close()
+        store = reopen()
+
+    failures = check(store, acknowledged, returned_ids)
+    report_run(label, sum(acknowledged.values()), elapsed, failures)
+    store.close()
+    return not failures
+
+
+def run_shared(label, path):
+    stores = [SQLiteStore(path), SQLiteStore(path)]
+    acknowledged = Counter()
+    returned_ids = {f'stress{user}': [] for user in range(USERS)}
+    lock = threading.Lock()
+
+    def writer(thread):
+        username = f'stress{thread % USERS}'
+        store = stores[thread // USERS % len(stores)]
+        ids = [store.add_report(username, {'prediction': 'Flu', 'confidence': pos})
+               for pos in range(SAVES_PER_THREAD)]
+        with lock:
+            acknowledged[username] += len(ids)
+            returned_ids[username].extend(ids)
+
+    threads = [threading.Thread(target=writer, args=(thread,)) for thread in range(THREADS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    failures = check(stores[0], acknowledged, returned_ids)
+    if stores[0].report_summary()['global']['total'] != sum(acknowledged.values()):
+        failures.append('report_counts total does not match the saves')
+    report_run(label, sum(acknowledged.values()), elapsed, failures)
+    for store in stores:
+        store.close()
+    return not failures
+
+
+if __name__ == '__main__':
+    print(f"\n{THREADS} threads x {SAVES_PER_THREAD} saves over {USERS} users")
+    # Switch threads as often as possible to surface races
+    sys.setswitchinterval(1e-6)
+    ok = run('memory', MemoryStore())
+    with tempfile.TemporaryDirectory() as directory:
+        ok = run('sqlite', SQLiteStore(os.path.join(directory, 'stress.db'))) and ok
+        journal = os.path.join(directory, 'journal')
+        ok = run('journal', JournalStore(journal, snapshot_every=1000),
+                 reopen=lambda: JournalStore(journal)) and ok
+        ok = run_shared('sqlite x2', os.path.join(directory, 'shared.db')) and ok
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,104 @@
+"""Catalog responses rendered once per model version.
+
+The symptom, disease and metrics endpoints only change when a new bundle is
+installed, so their JSON bodies are serialized (and gzip-compressed) once
+when the bundle is prepared. Each body carries a strong ETag derived from
+its bytes; the gzip variant gets its own tag because it is a different
+representation of the same resource.
+"""
+import gzip
+import hashlib
+import json
+
+GZIP_LEVEL = 6
+
+
+class EncodedResponse:
+    """One pre-serialized JSON body with its gzip variant and ETags"""
+
+    __slots__ = ('body', 'gzip_body', 'etag', 'gzip_etag')
+
+    def __init__(self, payload):
+        # Same serialization as Flask's jsonify in production (sorted, compact)
+        self.body = json.dumps(payload, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        digest = hashlib.sha256(self.body).hexdigest()[:20]
+        self.etag = digest
+        compressed = gzip.compress(self.body, compresslevel=GZIP_LEVEL, mtime=0)
+        # Tiny bodies can grow when compressed; serve those uncompressed
+        self.gzip_body = compressed if len(compressed) < len(self.body) else None
+        self.gzip_etag = f'{digest}-gz'
+
+    def size(self):
+        return len(self.body) + (len(self.gzip_body) if self.gzip_body is not None else 0)
+
+
+class CatalogResponses:
+    """Every static catalog payload of one ModelBundle, pre-encoded"""
+
+    def __init__(self, bundle):
+        self.version = bundle.version
+        symptom_list = bundle.symptom_list
+        self.symptoms = EncodedResponse({
+            'success': True,
+            'symptoms': symptom_list,
+            'formatted_symptoms': [symptom.replace('_', ' ').title() for symptom in symptom_list],
+            'total': len(symptom_list),
+            # Identifies this symptom order for clients sending `symptom_bits`
+            'symptom_codec': bundle.bitset.codec_id
+        })
+
+        diseases_list = [{
+            'name': disease,
+            'description': info.get('description', ''),
+            'severity': info.get('severity', 'Unknown')
+        } for disease, info in bundle.disease_info.items()]
+        self.diseases = EncodedResponse({
+            'success': True,
+            'diseases': diseases_list,
+            'total': len(diseases_list)
+        })
+
+        # None means "no mapping": the route answers 404 as before
+        self.disease_symptoms = None
+        if bundle.disease_symptoms:
+            self.disease_symptoms = EncodedResponse({
+                'success': True,
+                'mapping': bundle.disease_symptoms,
+                'total': len(bundle.disease_symptoms)
+            })
+
+        self.disease_info = {
+            disease: EncodedResponse({'success': True, 'disease': disease, 'info': info})
+            for disease, info in bundle.disease_info.items()
+        }
+
+        metrics = bundle.metrics
+        self.accuracy = EncodedResponse({
+            'success': True,
+            'accuracy': round(metrics['accuracy'] * 100, 2),
+            'accuracy_decimal': metrics['accuracy']
+        })
+        self.metrics = EncodedResponse({
+            'success': True,
+            'metrics': metrics,
+            'model_version': bundle.describe()
+        })
+
+        # None means "not computed for this model": the route answers 404
+        self.chart_data = None
+        if bundle.chart_data is not None:
+            self.chart_data = EncodedResponse({
+                'success': True,
+                'charts': bundle.chart_data['charts'],
+                'generated_at': bundle.chart_data.get('created_at')
+            })
+
+    def stats(self):
+        responses = [self.symptoms, self.diseases, self.accuracy, self.metrics]
+        responses += list(self.disease_info.values())
+        responses += [response for response in (self.disease_symptoms, self.chart_data) if response is not None]
+        return {
+            'version': self.version,
+            'responses': len(responses),
+            'bytes': sum(response.size() for response in responses)
+        }
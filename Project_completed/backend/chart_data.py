@@ -0,0 +1,132 @@
+"""Insights chart data computed at train time.
+
+`compute_chart_data` derives every chart served by /get-chart-data from the
+dataset and the held-out split: samples per disease, symptom prevalence,
+training vs test accuracy, top-1 confidence distribution and permutation
+importances. The result is written next to the model as chart_data.json,
+tagged with the content hash of the model artifact it describes.
+"""
+import datetime
+import json
+import os
+
+import numpy as np
+
+CHART_DATA_FORMAT_VERSION = 1
+CHART_DATA_FILE = 'chart_data.json'
+
+SEVERITY_LEVELS = ['Mild', 'Moderate', 'Severe', 'Chronic']
+
+DISEASE_CATEGORIES = {
+    'Respiratory': ['Flu', 'Common Cold', 'Pneumonia', 'Bronchitis', 'Asthma', 'COVID-19'],
+    'Infectious': ['Malaria', 'Dengue', 'Typhoid', 'Tuberculosis'],
+    'Chronic': ['Diabetes', 'Hypertension', 'Arthritis'],
+    'Gastrointestinal': ['Gastroenteritis', 'Food Poisoning'],
+    'Neurological': ['Migraine'],
+    'Other': ['Urinary Tract Infection', 'Kidney Stones', 'Allergy', 'Anemia']
+}
+
+# Upper edge is just above 100 so a confidence of exactly 100% is counted
+CONFIDENCE_EDGES = [0, 50, 60, 70, 80, 90, 100.0001]
+CONFIDENCE_LABELS = ['<50%', '50-60%', '60-70%', '70-80%', '80-90%', '90-100%']
+
+
+def format_symptom(symptom):
+    return symptom.replace('_', ' ').title()
+
+
+def chart(labels, data, decimals=None):
+    # Counts stay integers, rates and percentages are rounded
+    values = [int(value) if decimals is None else round(float(value), decimals) for value in data]
+    return {'labels': list(labels), 'data': values}
+
+
+def compute_chart_data(model, engine, X, y, X_train, y_train, X_test, y_test, disease_info,
+                       content_hash=None, n_jobs=-1, n_repeats=10):
+    """Return the versioned chart payload for one trained model.
+
+    `model` is the fitted SVC (used by permutation_importance, which runs
+    its repeats in parallel over `n_jobs`); `engine` is its NumpySVC export,
+    used for the vectorized probability passes.
+    """
+    # Only train_model.py computes charts; the API just loads them, so it
+    # never pays for importing pandas or scikit-learn
+    import pandas as pd
+    from sklearn.inspection import permutation_importance
+
+    # Samples per disease and symptom prevalence over the full dataset
+    disease_counts = y.value_counts().sort_index()
+    symptom_counts = X.sum(axis=0).sort_values(ascending=False, kind='stable').head(15)
+    symptom_prevalence = symptom_counts / len(X) * 100
+
+    # Training vs held-out accuracy
+    train_accuracy = float((engine.predict(X_train.to_numpy(dtype=np.float64)) == y_train.to_numpy()).mean())
+    test_probabilities = engine.predict_proba(X_test.to_numpy(dtype=np.float64))
+    test_predictions = engine.classes_[test_probabilities.argmax(axis=1)]
+    correct = test_predictions == y_test.to_numpy()
+    test_accuracy = float(correct.mean())
+
+    # Top-1 confidence on the held-out split
+    top_confidence = test_probabilities.max(axis=1) * 100
+    confidence_hist, _ = np.histogram(top_confidence, bins=CONFIDENCE_EDGES)
+
+    # Severity and category breakdowns of the disease catalog
+    severity_counts = pd.Series({name: info.get('severity', 'Unknown') for name, info in disease_info.items()}) \
+        .str.split().str[0].value_counts().reindex(SEVERITY_LEVELS, fill_value=0)
+    diseases = set(disease_counts.index)
+    category_counts = {category: len(diseases.intersection(members))
+                       for category, members in DISEASE_CATEGORIES.items()}
+
+    # Permutation importances: drop in held-out accuracy when a symptom is shuffled
+    importances = permutation_importance(model, X_test, y_test, scoring='accuracy', n_repeats=n_repeats,
+                                         random_state=42, n_jobs=n_jobs)
+    importance = pd.Series(importances.importances_mean * 100, index=X.columns) \
+        .sort_values(ascending=False, kind='stable').head(10)
+
+    return {
+        'format_version': CHART_DATA_FORMAT_VERSION,
+        'created_at': str(datetime.datetime.now()),
+        'model_content_hash': content_hash,
+        'charts': {
+            'disease_distribution': chart(disease_counts.index, disease_counts.values),
+            'symptom_frequency': chart(symptom_counts.index.map(format_symptom), symptom_counts.values),
+            'symptom_prevalence': chart(symptom_prevalence.index.map(format_symptom),
+                                        symptom_prevalence.values, 2),
+            'model_performance': chart(['Accuracy', 'Training Score', 'Testing Score'],
+                                       [test_accuracy * 100, train_accuracy * 100, test_accuracy * 100], 2),
+            'severity_distribution': chart(severity_counts.index, severity_counts.values),
+            'disease_categories': chart(category_counts.keys(), category_counts.values()),
+            # Highest bucket first, as the frontend chart expects
+            'confidence_levels': chart(CONFIDENCE_LABELS[::-1], confidence_hist[::-1]),
+            'confidence_summary': {
+                'mean': round(float(top_confidence.mean()), 2),
+                'median': round(float(np.median(top_confidence)), 2),
+                'mean_correct': round(float(top_confidence[correct].mean()), 2) if correct.any() else None,
+                'mean_incorrect': round(float(top_confidence[~correct].mean()), 2) if (~correct).any() else None
+            },
+            'feature_importance': chart(importance.index.map(format_symptom), importance.values, 2)
+        }
+    }
+
+
+def write_chart_data(chart_data, models_dir):
+    path = os.path.join(models_dir, CHART_DATA_FILE)
+    with open(path, 'w') as f:
+        json.dump(chart_data, f, indent=2)
+    return path
+
+
+def load_chart_data(models_dir, content_hash=None):
+    """Return the chart payload, or None if it is missing, unsupported or stale"""
+    path = os.path.join(models_dir, CHART_DATA_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        chart_data = json.load(f)
+    if chart_data.get('format_version') != CHART_DATA_FORMAT_VERSION:
+        print(f"⚠ Unsupported {CHART_DATA_FILE} format, retrain to regenerate it")
+        return None
+    if content_hash is not None and chart_data.get('model_content_hash') not in (None, content_hash):
+        print(f"⚠ {CHART_DATA_FILE} was computed for a different model, retrain to regenerate it")
+        return None
+    return chart_data
@@ -0,0 +1,73 @@
+"""Inverted disease <-> symptom indexes stored as bitsets.
+
+Built once per bundle from disease_symptoms.json:
+
+* `disease_masks[d]`  - symptom bitset of disease d (see symptom_bitset)
+* `symptom_masks[s]`  - disease bitset of symptom s (bit i = diseases[i])
+
+"Diseases consistent with all of these symptoms" is an AND over
+symptom_masks, "symptoms shared by these diseases" an AND over
+disease_masks, and the "any"/union variants are ORs, so every query costs
+one integer operation per input name regardless of catalog size.
+"""
+
+
+class DiseaseSymptomIndex:
+    """Bitset indexes over the disease -> symptoms catalog mapping"""
+
+    def __init__(self, disease_symptoms, bitset):
+        self.bitset = bitset
+        self.diseases = list(disease_symptoms or {})
+        self.disease_lookup = {disease.casefold(): disease for disease in self.diseases}
+        self.all_diseases = (1 << len(self.diseases)) - 1
+
+        self.disease_masks = {}
+        self.symptom_masks = [0] * bitset.n_symptoms
+        for pos, disease in enumerate(self.diseases):
+            mask = bitset.encode(disease_symptoms[disease])
+            self.disease_masks[disease] = mask
+            for idx in range(mask.bit_length()):
+                if mask >> idx & 1:
+                    self.symptom_masks[idx] |= 1 << pos
+
+    def resolve_diseases(self, names):
+        """(known disease names, unknown inputs), case-insensitive"""
+        known, unknown = [], []
+        for name in names:
+            disease = self.disease_lookup.get(name.strip().casefold()) if isinstance(name, str) else None
+            if disease is None:
+                unknown.append(name)
+            elif disease not in known:
+                known.append(disease)
+        return known, unknown
+
+    def decode_diseases(self, mask):
+        return [self.diseases[pos] for pos in range(mask.bit_length()) if mask >> pos & 1]
+
+    def diseases_matching(self, symptom_mask, mode='all'):
+        """Disease bitset of diseases listing all (or any) of the symptoms in `symptom_mask`"""
+        indices = [idx for idx in range(symptom_mask.bit_length()) if symptom_mask >> idx & 1]
+        if mode == 'all':
+            result = self.all_diseases
+            for idx in indices:
+                result &= self.symptom_masks[idx]
+            return result
+        result = 0
+        for idx in indices:
+            result |= self.symptom_masks[idx]
+        return result
+
+    def symptoms_of(self, diseases, mode='shared'):
+        """Symptom bitset shared by all (or listed by any of) `diseases`"""
+        masks = [self.disease_masks[disease] for disease in diseases]
+        if not masks:
+            return 0
+        result = masks[0]
+        for mask in masks[1:]:
+            result = result & mask if mode == 'shared' else result | mask
+        return result
+
+    def complement(self, diseases):
+        """Every indexed disease not in `diseases`"""
+        excluded = set(diseases)
+        return [disease for disease in self.diseases if disease not in excluded]
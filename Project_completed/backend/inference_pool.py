@@ -0,0 +1,140 @@
+"""Multi-process inference against one memory-mapped copy of the model arrays.
+
+The parent writes the NumPy SVC arrays once per model version as plain .npy
+files (under /dev/shm when available) and worker processes open them with
+`mmap_mode='r'`. Every worker therefore reads the same page-cache pages
+instead of holding its own unpickled copy of the model, and workers never
+import scikit-learn or pandas.
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from model_artifact import open_arrays, save_arrays
+
+# Per-worker state: the engine opened from the most recently used directory
+_worker_engine = {'directory': None, 'engine': None}
+
+
+def write_shared_model(engine, directory):
+    """Write every array of `engine` to `directory` as individual .npy files"""
+    staging = directory + '.tmp'
+    save_arrays(engine, staging)
+    os.replace(staging, directory)
+
+
+def open_shared_model(directory):
+    """Open a directory written by write_shared_model without copying the arrays"""
+    return open_arrays(directory)
+
+
+def _worker_ping(hold):
+    # Holding the worker briefly makes the executor start (and ping) the others
+    time.sleep(hold)
+    return os.getpid()
+
+
+def worker_pids(executor, workers, hold=0.05, rounds=20):
+    """Pids the workers of `executor` report themselves, once all `workers` have answered.
+
+    ProcessPoolExecutor starts workers on demand, so pings are sent in rounds
+    until every worker has answered (or `rounds` runs out).
+    """
+    pids = set()
+    for _ in range(rounds):
+        futures = [executor.submit(_worker_ping, hold) for _ in range(workers)]
+        pids.update(future.result() for future in futures)
+        if len(pids) >= workers:
+            break
+    return sorted(pids)
+
+
+def _worker_predict_proba(directory, X):
+    if _worker_engine['directory'] != directory:
+        _worker_engine['engine'] = open_shared_model(directory)
+        _worker_engine['directory'] = directory
+    return _worker_engine['engine'].predict_proba(X)
+
+
+class SharedModelPredictor:
+    """predict_proba for one model version, scored by the pool's workers"""
+
+    engine_name = 'numpy-pool'
+
+    def __init__(self, pool, directory, classes):
+        self.pool = pool
+        self.directory = directory
+        self.classes_ = classes
+        self._local_engine = None
+
+    def predict_proba(self, X):
+        try:
+            return self.pool.submit(_worker_predict_proba, self.directory, X)
+        except RuntimeError:
+            # Pool already shut down (server stopping): score in-process
+            if self._local_engine is None:
+                self._local_engine = open_shared_model(self.directory)
+            return self._local_engine.predict_proba(X)
+
+
+class InferencePool:
+    """A fixed pool of worker processes sharing memory-mapped model arrays.
+
+    Create it before the server starts handling requests: with the 'fork'
+    start method the workers are forked immediately (see `warm`) from a
+    process that has not loaded the model yet, so they stay small.
+    """
+
+    def __init__(self, workers, start_method=None, root_dir=None):
+        if start_method is None:
+            start_method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+        if root_dir is None and os.path.isdir('/dev/shm'):
+            root_dir = '/dev/shm'
+        self.workers = workers
+        self.start_method = start_method
+        self.root_dir = tempfile.mkdtemp(prefix='diagno-model-', dir=root_dir)
+        self._executor = ProcessPoolExecutor(max_workers=workers,
+                                             mp_context=multiprocessing.get_context(start_method))
+        self._lock = threading.Lock()
+        self._directories = []
+        self.worker_pids = []
+
+    def warm(self):
+        """Start every worker now and record the pids they report"""
+        self.worker_pids = worker_pids(self._executor, self.workers)
+        return self.worker_pids
+
+    def submit(self, fn, *args):
+        return self._executor.submit(fn, *args).result()
+
+    def predictor_for(self, engine, version, keep_versions=2):
+        """Write `engine` once for `version` and return a predictor bound to it.
+
+        Directories of versions older than the last `keep_versions` are removed
+        (workers that still map them keep their pages until they switch).
+        """
+        directory = os.path.join(self.root_dir, f'v{version}')
+        write_shared_model(engine, directory)
+        with self._lock:
+            self._directories.append(directory)
+            stale = self._directories[:-keep_versions]
+            del self._directories[:-keep_versions]
+        for old in stale:
+            shutil.rmtree(old, ignore_errors=True)
+        return SharedModelPredictor(self, directory, engine.classes_)
+
+    def stats(self):
+        return {
+            'workers': self.workers,
+            'start_method': self.start_method,
+            'worker_pids': self.worker_pids,
+            'shared_dir': self.root_dir
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        shutil.rmtree(self.root_dir, ignore_errors=True)
@@ -0,0 +1,123 @@
+"""Coalesce concurrent single-row predictions into batched model calls."""
+import queue
+import threading
+import time
+
+# Upper bounds of the batch-size histogram buckets
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+
+class _Pending:
+    __slots__ = ('item', 'enqueued_at', 'done', 'result', 'error')
+
+    def __init__(self, item):
+        self.item = item
+        self.enqueued_at = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    """Collects items submitted by request threads and scores them together.
+
+    A single dispatcher thread takes the first waiting item, keeps collecting
+    until `max_wait_ms` has passed since that item arrived or `max_batch_size`
+    items are queued, then calls `score_batch(items)` once. `score_batch` must
+    return one result per item, in order; each caller gets its own result
+    back (or the exception raised while scoring its batch).
+    """
+
+    def __init__(self, score_batch, max_wait_ms=2.0, max_batch_size=32):
+        self.score_batch = score_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._requests = 0
+        self._batches = 0
+        self._max_queue_depth = 0
+        self._histogram = {bucket: 0 for bucket in BATCH_SIZE_BUCKETS}
+        self._histogram_overflow = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+                    self._thread.start()
+
+    def submit(self, item, timeout=5.0):
+        """Queue one item and block until its batch has been scored"""
+        self._ensure_started()
+        pending = _Pending(item)
+        self._queue.put(pending)
+        if not pending.done.wait(timeout):
+            raise TimeoutError('Timed out waiting for a batched prediction!')
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _collect(self):
+        first = self._queue.get()
+        batch = [first]
+        deadline = first.enqueued_at + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            depth = self._queue.qsize() + len(batch)
+            started = time.perf_counter()
+            try:
+                results = self.score_batch([pending.item for pending in batch])
+                for pending, result in zip(batch, results):
+                    pending.result = result
+            except Exception as e:
+                for pending in batch:
+                    pending.error = e
+            self._record(batch, started, depth)
+            for pending in batch:
+                pending.done.set()
+
+    def _record(self, batch, started, depth):
+        waits = [started - pending.enqueued_at for pending in batch]
+        with self._stats_lock:
+            self._requests += len(batch)
+            self._batches += 1
+            self._max_queue_depth = max(self._max_queue_depth, depth)
+            for bucket in BATCH_SIZE_BUCKETS:
+                if len(batch) <= bucket:
+                    self._histogram[bucket] += 1
+                    break
+            else:
+                self._histogram_overflow += 1
+            self._wait_total += sum(waits)
+            self._wait_max = max(self._wait_max, max(waits))
+
+    def stats(self):
+        with self._stats_lock:
+            histogram = {f'<={bucket}': count for bucket, count in self._histogram.items()}
+            histogram[f'>{BATCH_SIZE_BUCKETS[-1]}'] = self._histogram_overflow
+            return {
+                'max_wait_ms': self.max_wait * 1000.0,
+                'max_batch_size': self.max_batch_size,
+                'queue_depth': self._queue.qsize(),
+                'max_queue_depth': self._max_queue_depth,
+                'requests': self._requests,
+                'batches': self._batches,
+                'mean_batch_size': round(self._requests / self._batches, 2) if self._batches else 0.0,
+                'batch_size_histogram': histogram,
+                'mean_added_wait_ms': round(self._wait_total / self._requests * 1000.0, 3) if self._requests else 0.0,
+                'max_added_wait_ms': round(self._wait_max * 1000.0, 3)
+            }
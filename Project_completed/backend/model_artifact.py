@@ -0,0 +1,190 @@
+"""Versioned on-disk model artifact that loads without unpickling.
+
+Layout of an artifact directory:
+
+    manifest.json   format version, content hash, symptom_list, classes,
+                    metrics and the shape/dtype of every array
+    <name>.npy      one file per NumpySVC array, opened with mmap_mode='r'
+
+Opening an artifact only parses one small JSON file and maps the arrays, so
+startup cost does not grow with the model and scikit-learn is never imported.
+
+train_model.py writes every artifact into its own directory,
+models/artifacts/<first 12 hex digits of the content hash>, and then points
+the one-line models/artifact.current file at it. An artifact directory is
+never renamed or deleted while it may be mapped: Windows refuses both for
+memory-mapped files, so installing a new model only writes a new directory
+and replaces the small pointer file. `prune_artifacts` removes unused
+versions and leaves the ones it cannot delete yet for a later call.
+"""
+import datetime
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+
+from svc_engine import NumpySVC
+
+ARTIFACT_FORMAT = 'diagno-model'
+ARTIFACT_FORMAT_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+# Under a models directory: one subdirectory per artifact version and the
+# file naming the current one
+ARTIFACTS_DIR = 'artifacts'
+POINTER_NAME = 'artifact.current'
+
+
+def save_arrays(engine, directory):
+    """Write every inference array of `engine` to `directory` as .npy files"""
+    os.makedirs(directory, exist_ok=True)
+    files = {}
+    for name, array in engine.shared_arrays().items():
+        array = np.asarray(array)
+        filename = f'{name}.npy'
+        np.save(os.path.join(directory, filename), array, allow_pickle=False)
+        files[name] = {'file': filename, 'shape': list(array.shape), 'dtype': array.dtype.str}
+    return files
+
+
+def open_arrays(directory, names=None):
+    """Memory-map the .npy files in `directory` and build a NumpySVC from them"""
+    if names is None:
+        names = [filename[:-4] for filename in os.listdir(directory) if filename.endswith('.npy')]
+    arrays = {name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r', allow_pickle=False)
+              for name in names}
+    return NumpySVC(arrays)
+
+
+def content_hash(directory, files):
+    """sha256 over the array files, in name order"""
+    digest = hashlib.sha256()
+    for name in sorted(files):
+        digest.update(name.encode('utf-8'))
+        with open(os.path.join(directory, files[name]['file']), 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def current_artifact_name(models_dir):
+    """Version directory named by models_dir/artifact.current, or None"""
+    try:
+        with open(os.path.join(models_dir, POINTER_NAME), 'r') as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def current_artifact_dir(models_dir, fallback_dir=None):
+    """Directory of the artifact models_dir points at, None without a pointer.
+
+    A pointer may name a version already moved into `fallback_dir` (see
+    publish_artifact).
+    """
+    name = current_artifact_name(models_dir)
+    if name is None:
+        return None
+    for root in (models_dir, fallback_dir):
+        if root is not None and has_model_artifact(os.path.join(root, ARTIFACTS_DIR, name)):
+            return os.path.join(root, ARTIFACTS_DIR, name)
+    raise FileNotFoundError(f'{POINTER_NAME} in {models_dir} names a missing artifact: {name}')
+
+
+def switch_artifact(models_dir, name):
+    """Point models_dir/artifact.current at version `name` (one atomic file replace)"""
+    pointer = os.path.join(models_dir, POINTER_NAME)
+    temporary = f'{pointer}.tmp-{os.getpid()}'
+    with open(temporary, 'w') as f:
+        f.write(name + '\n')
+    os.replace(temporary, pointer)
+
+
+def publish_artifact(source_models_dir, models_dir):
+    """Move the current artifact version of `source_models_dir` into `models_dir`.
+
+    Only adds a directory (nothing is mapped from it yet); the pointer is
+    switched separately, once the new bundle has loaded. Returns the name.
+    """
+    name = current_artifact_name(source_models_dir)
+    if name is None:
+        return None
+    target = os.path.join(models_dir, ARTIFACTS_DIR, name)
+    source = os.path.join(source_models_dir, ARTIFACTS_DIR, name)
+    if has_model_artifact(target):
+        # Same content hash: the published copy is identical
+        return name
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    os.replace(source, target)
+    return name
+
+
+def prune_artifacts(models_dir, keep):
+    """Delete artifact versions not in `keep`; returns the names still left behind.
+
+    A version still mapped by a bundle that in-flight requests hold cannot
+    be deleted on Windows; it is skipped and removed by a later call.
+    """
+    root = os.path.join(models_dir, ARTIFACTS_DIR)
+    if not os.path.isdir(root):
+        return []
+    left = []
+    for name in os.listdir(root):
+        if name in keep:
+            continue
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+        if os.path.exists(os.path.join(root, name)):
+            left.append(name)
+    return left
+
+
+def write_model_artifact(engine, models_dir, symptom_list, metrics):
+    """Write arrays and manifest as a new version under models_dir/artifacts and point at it"""
+    root = os.path.join(models_dir, ARTIFACTS_DIR)
+    staging = os.path.join(root, f'.tmp-{os.getpid()}')
+    shutil.rmtree(staging, ignore_errors=True)
+    files = save_arrays(engine, staging)
+    manifest = {
+        'format': ARTIFACT_FORMAT,
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'created_at': str(datetime.datetime.now()),
+        'content_hash': content_hash(staging, files),
+        'symptom_list': list(symptom_list),
+        'classes': [str(c) for c in engine.classes_],
+        'metrics': metrics,
+        'arrays': files
+    }
+    with open(os.path.join(staging, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    # A fresh directory nobody has mapped yet, so renaming it is safe everywhere
+    name = manifest['content_hash'][:12]
+    target = os.path.join(root, name)
+    if has_model_artifact(target):
+        shutil.rmtree(staging, ignore_errors=True)
+    else:
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(staging, target)
+    switch_artifact(models_dir, name)
+    return dict(manifest, directory=target)
+
+
+def has_model_artifact(directory):
+    return os.path.exists(os.path.join(directory, MANIFEST_NAME))
+
+
+def open_model_artifact(directory, verify=False):
+    """Return (NumpySVC over memory-mapped arrays, manifest)"""
+    with open(os.path.join(directory, MANIFEST_NAME), 'r') as f:
+        manifest = json.load(f)
+    if manifest.get('format') != ARTIFACT_FORMAT or manifest.get('format_version') != ARTIFACT_FORMAT_VERSION:
+        raise ValueError(f'Unsupported model artifact in {directory}!')
+    if verify and content_hash(directory, manifest['arrays']) != manifest['content_hash']:
+        raise ValueError(f'Model artifact in {directory} is corrupted (content hash mismatch)!')
+
+    engine = open_arrays(directory, manifest['arrays'].keys())
+    if engine.feature_names != manifest['symptom_list']:
+        raise ValueError('Model artifact arrays do not match its symptom_list!')
+    if [str(c) for c in engine.classes_] != manifest['classes']:
+        raise ValueError('Model artifact arrays do not match its classes!')
+    return engine, manifest
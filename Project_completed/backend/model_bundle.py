@@ -0,0 +1,157 @@
+"""Versioned bundle of the model and the catalog files that must match it."""
+import datetime
+import json
+import os
+import threading
+import warnings
+
+import numpy as np
+
+from ask_next import build_likelihoods
+from chart_data import load_chart_data
+from disease_index import DiseaseSymptomIndex
+from model_artifact import current_artifact_dir, open_model_artifact
+from svc_engine import NumpySVC, export_svc_arrays
+from symptom_bitset import SymptomBitset
+from symptom_normalizer import SymptomNormalizer
+from symptom_suggest import SymptomSuggester, load_cooccurrence
+
+# Files written by train_model.py that make up one bundle on disk (besides
+# the versioned artifact, see model_artifact)
+BUNDLE_FILES = (
+    'disease_model.pkl',
+    'symptom_list.json',
+    'disease_info.json',
+    'model_metrics.json',
+    'confusion_matrix.png',
+    'chart_data.json',
+    'symptom_cooccurrence.npz',
+)
+
+# Feature matrices are plain NumPy arrays in symptom_list order (checked below)
+warnings.filterwarnings('ignore', message='X does not have valid feature names')
+
+
+class ModelBundle:
+    """Model, predictor, symptom list, disease info and metrics of one version.
+
+    Request handlers read the active bundle once and use only that object, so
+    a retrain that swaps in a new bundle never mixes one model's classes with
+    another model's symptom list.
+    """
+
+    def __init__(self, version, model, predictor, symptom_list, disease_info,
+                 disease_symptoms, metrics, source='pickle', content_hash=None, chart_data=None,
+                 cooccurrence=None):
+        self.version = version
+        # The sklearn model is only loaded when serving from the pickle
+        self.model = model
+        self.predictor = predictor
+        self.symptom_list = symptom_list
+        # Symptom sets travel as bit masks over symptom_list (cache keys, reports, batches)
+        self.bitset = SymptomBitset.for_symptoms(symptom_list)
+        # Maps free-text names ('Body Ache', 'feverr', 'tired') onto symptom_list
+        self.normalizer = SymptomNormalizer(symptom_list)
+        # Bitset inverted indexes over disease_symptoms (symptom <-> disease queries)
+        self.disease_index = DiseaseSymptomIndex(disease_symptoms, self.bitset)
+        # Autocomplete trie ranked by symptom co-occurrence (CSV counts + catalog)
+        self.suggester = SymptomSuggester(symptom_list, self.normalizer.names, disease_symptoms,
+                                          cooccurrence['counts'] if cooccurrence else None)
+        self.disease_info = disease_info
+        self.disease_symptoms = disease_symptoms
+        self.metrics = metrics
+        # Insights charts computed by train_model.py (None if not available)
+        self.chart_data = chart_data
+        self.classes_ = predictor.classes_
+        # P(symptom | disease) in classes_ order, for next-question ranking
+        self.likelihoods = build_likelihoods(self.classes_, symptom_list, disease_symptoms, cooccurrence)
+        self.source = source
+        self.content_hash = content_hash
+        self.loaded_at = str(datetime.datetime.now())
+        # Pre-encoded catalog responses, rendered by the API when it installs the bundle
+        self.catalog = None
+        # One preallocated feature row per worker thread, reused across requests
+        self._feature_row = threading.local()
+
+    @property
+    def engine(self):
+        return getattr(self.predictor, 'engine_name', 'sklearn')
+
+    def encode_mask(self, mask):
+        """Encode one symptom bit mask into the calling thread's reusable feature row"""
+        row = getattr(self._feature_row, 'row', None)
+        if row is None:
+            row = self._feature_row.row = np.zeros((1, len(self.symptom_list)), dtype=np.float64)
+        row[0] = self.bitset.unpack([mask])[0]
+        return row
+
+    def predict_proba(self, X):
+        return self.predictor.predict_proba(X)
+
+    def describe(self):
+        return {
+            'version': self.version,
+            'engine': self.engine,
+            'source': self.source,
+            'content_hash': self.content_hash,
+            'loaded_at': self.loaded_at,
+            'total_diseases': len(self.classes_),
+            'total_symptoms': len(self.symptom_list)
+        }
+
+
+def _load_json(path, default=None):
+    if default is not None and not os.path.exists(path):
+        return default
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def load_bundle(models_dir, version, inference_engine='numpy', fallback_dir=None):
+    """Load and validate every bundle file from `models_dir`.
+
+    With the NumPy engine the artifact models_dir/artifact.current points at
+    is used when present; otherwise the pickled SVC is loaded. Files missing
+    from `models_dir` that train_model.py does not produce
+    (disease_symptoms.json), and an artifact version already published
+    there, are taken from `fallback_dir` when given.
+    """
+    disease_info = _load_json(os.path.join(models_dir, 'disease_info.json'))
+    disease_symptoms_path = os.path.join(models_dir, 'disease_symptoms.json')
+    if not os.path.exists(disease_symptoms_path) and fallback_dir is not None:
+        disease_symptoms_path = os.path.join(fallback_dir, 'disease_symptoms.json')
+    try:
+        disease_symptoms = _load_json(disease_symptoms_path)
+    except Exception:
+        disease_symptoms = {}
+
+    artifact_dir = current_artifact_dir(models_dir, fallback_dir) if inference_engine == 'numpy' else None
+    if artifact_dir is not None:
+        engine, manifest = open_model_artifact(artifact_dir)
+        return ModelBundle(version, None, engine, manifest['symptom_list'], disease_info,
+                           disease_symptoms, manifest['metrics'], source='artifact',
+                           content_hash=manifest['content_hash'],
+                           chart_data=load_chart_data(models_dir, manifest['content_hash']),
+                           cooccurrence=load_cooccurrence(models_dir, manifest['symptom_list']))
+
+    # Unpickling imports scikit-learn, so joblib is only imported on this path
+    import joblib
+    model = joblib.load(os.path.join(models_dir, 'disease_model.pkl'))
+    symptom_list = _load_json(os.path.join(models_dir, 'symptom_list.json'))
+    metrics = _load_json(os.path.join(models_dir, 'model_metrics.json'))
+
+    # The column order must match what the model was fitted on
+    if hasattr(model, 'feature_names_in_') and list(model.feature_names_in_) != symptom_list:
+        raise RuntimeError('symptom_list.json does not match the model feature order!')
+
+    # Without an artifact the NumPy engine is built from the unpickled model
+    predictor = model
+    if inference_engine == 'numpy':
+        try:
+            predictor = NumpySVC(export_svc_arrays(model, symptom_list))
+        except ValueError as e:
+            print(f"⚠ {e} Using scikit-learn inference")
+
+    return ModelBundle(version, model, predictor, symptom_list, disease_info,
+                       disease_symptoms, metrics, chart_data=load_chart_data(models_dir),
+                       cooccurrence=load_cooccurrence(models_dir, symptom_list))
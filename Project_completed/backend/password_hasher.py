@@ -0,0 +1,143 @@
+"""bcrypt hashing on a small dedicated thread pool.
+
+A bcrypt hash or check costs tens to hundreds of milliseconds of CPU. Run on
+the request thread, a burst of /login calls puts that many hashes on the CPU
+at once and /predict waits behind all of them. `PasswordHasher` caps how many
+hashes run concurrently (`max_workers`), how many may wait (`max_queue`) and
+how long one may wait before it is dropped (`queue_timeout`); requests beyond
+those limits fail fast with `HasherBusy` so the route can answer 503.
+
+`max_workers=0` hashes inline on the calling thread (the old behaviour).
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_ROUNDS = 12
+# Cost factors bcrypt.gensalt accepts
+MIN_ROUNDS = 4
+MAX_ROUNDS = 31
+
+
+class HasherBusy(Exception):
+    """The hashing queue is full or a request waited longer than queue_timeout"""
+
+
+def hash_rounds(hashed):
+    """Cost factor of a '$2b$12$...' bcrypt hash (None if unparseable)"""
+    try:
+        return int(hashed.split(b'$')[2])
+    except (IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """Bounded executor for bcrypt hashpw/checkpw with rehash-on-verify"""
+
+    def __init__(self, rounds=DEFAULT_ROUNDS, max_workers=1, max_queue=32, queue_timeout=5.0):
+        # Checked here so a bad setting fails at startup, not inside /signup
+        if not MIN_ROUNDS <= rounds <= MAX_ROUNDS:
+            raise ValueError(f'bcrypt rounds must be between {MIN_ROUNDS} and {MAX_ROUNDS}, got {rounds}!')
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._executor = None
+        if max_workers > 0:
+            self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix='password-hasher')
+        # Admission control: running + waiting jobs
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue) if max_workers > 0 else None
+        self._stats_lock = threading.Lock()
+        self._counts = {'hashed': 0, 'verified': 0, 'rehashed': 0, 'rejected_full': 0, 'rejected_timeout': 0}
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._work_total = 0.0
+
+    def _count(self, key, amount=1):
+        with self._stats_lock:
+            self._counts[key] += amount
+
+    def _run(self, fn, *args):
+        if self._executor is None:
+            started = time.perf_counter()
+            result = fn(*args)
+            with self._stats_lock:
+                self._work_total += time.perf_counter() - started
+            return result
+        if not self._slots.acquire(blocking=False):
+            self._count('rejected_full')
+            raise HasherBusy('Too many pending password checks!')
+        enqueued_at = time.perf_counter()
+        picked_up = threading.Event()
+
+        def job():
+            picked_up.set()
+            started = time.perf_counter()
+            waited = started - enqueued_at
+            with self._stats_lock:
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+            try:
+                return fn(*args)
+            finally:
+                with self._stats_lock:
+                    self._work_total += time.perf_counter() - started
+
+        future = self._executor.submit(job)
+        try:
+            # Only the wait for a worker is bounded; once picked up, the hash
+            # (a fixed cost) runs to completion. A job that cannot be
+            # cancelled has just been picked up.
+            if not picked_up.wait(self.queue_timeout) and future.cancel():
+                self._count('rejected_timeout')
+                raise HasherBusy('Timed out waiting for a password check!')
+            return future.result()
+        finally:
+            self._slots.release()
+
+    def _hash(self, password):
+        import bcrypt
+        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(self.rounds))
+
+    def _verify(self, password, hashed):
+        import bcrypt
+        if not bcrypt.checkpw(password.encode('utf-8'), hashed):
+            return False, None
+        # Only ever upgrade: a temporarily lowered `rounds` must not weaken stored hashes
+        stored_rounds = hash_rounds(hashed)
+        if stored_rounds is None or stored_rounds < self.rounds:
+            return True, self._hash(password)
+        return True, None
+
+    def hash(self, password):
+        """bcrypt hash of `password` at the configured cost"""
+        hashed = self._run(self._hash, password)
+        self._count('hashed')
+        return hashed
+
+    def verify(self, password, hashed):
+        """(matches, new_hash) - new_hash is set when the stored cost is below `rounds`"""
+        ok, new_hash = self._run(self._verify, password, hashed)
+        self._count('verified')
+        if new_hash is not None:
+            self._count('rehashed')
+        return ok, new_hash
+
+    def stats(self):
+        with self._stats_lock:
+            counts = dict(self._counts)
+            completed = counts['hashed'] + counts['verified']
+            return {
+                'rounds': self.rounds,
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'queue_timeout_s': self.queue_timeout,
+                **counts,
+                'mean_wait_ms': round(self._wait_total / completed * 1000, 2) if completed else 0.0,
+                'max_wait_ms': round(self._wait_max * 1000, 2),
+                'mean_hash_ms': round(self._work_total / completed * 1000, 2) if completed else 0.0
+            }
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,83 @@
+"""In-process LRU cache of predict_proba rows keyed by symptom set."""
+import sys
+import threading
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """Thread-safe LRU cache bounded by entry count and approximate memory.
+
+    Keys are (bundle version, symptom bit mask) pairs (see symptom_bitset);
+    values are the probability rows returned by the model. `clear()` must be called whenever
+    the model is replaced so stale probabilities are never served; callers
+    that score on a miss pass the `generation` they read before scoring, so a
+    result computed against the old model is dropped instead of cached.
+    """
+
+    def __init__(self, max_entries=4096, max_bytes=8 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.flushes = 0
+        self.generation = 0
+
+    @staticmethod
+    def _entry_size(key, probabilities):
+        return sys.getsizeof(key) + sum(sys.getsizeof(part) for part in key) + probabilities.nbytes
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, probabilities, generation=None):
+        probabilities = probabilities.copy()
+        probabilities.flags.writeable = False
+        size = self._entry_size(key, probabilities)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (probabilities, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry (called when the model is replaced)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.flushes += 1
+            self.generation += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'flushes': self.flushes,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,133 @@
+"""In-process token-bucket admission control for the CPU-heavy routes.
+
+Each (route, client key) pair owns one bucket of `burst` tokens refilled at
+`rate` tokens per second; a request takes one token or is rejected with the
+number of seconds until one is available (the route answers 429 with
+Retry-After). A bucket is two floats plus two counters, so memory is O(1)
+per active key. A bucket idle long enough to have refilled completely is
+indistinguishable from a new one, so `sweep()` (run every `sweep_interval`
+seconds from `acquire`) drops it.
+
+Keys carry usernames and client IPs, so `stats()` only reports them as
+pseudonyms: the key kind ('user', 'ip') plus a keyed hash that is stable for
+the life of the process (the same client shows up under the same name
+between calls) but cannot be reversed or brute-forced without the in-memory
+salt.
+"""
+import hashlib
+import hmac
+import math
+import os
+import threading
+import time
+
+# route endpoint -> (tokens per second, burst)
+DEFAULT_LIMITS = {
+    'predict': (20.0, 40),
+    'predict_batch': (2.0, 5),
+    'ask_next': (10.0, 20),
+    'login': (1.0, 5),
+    'signup': (0.2, 3),
+    'retrain_model': (1 / 60, 2)
+}
+
+
+def parse_limits(value):
+    """'predict=20:40,login=1:5' -> {'predict': (20.0, 40), 'login': (1.0, 5)}"""
+    limits = {}
+    for item in filter(None, (part.strip() for part in (value or '').split(','))):
+        route, _, budget = item.partition('=')
+        rate, _, burst = budget.partition(':')
+        limits[route.strip()] = (float(rate), int(burst or math.ceil(float(rate))))
+    return limits
+
+
+class _Bucket:
+    __slots__ = ('tokens', 'updated', 'allowed', 'rejected')
+
+    def __init__(self, tokens, now):
+        self.tokens = tokens
+        self.updated = now
+        self.allowed = 0
+        self.rejected = 0
+
+
+class RateLimiter:
+    """Token buckets per (route, key) with separate budgets per route"""
+
+    def __init__(self, limits=None, sweep_interval=60.0):
+        self.limits = dict(DEFAULT_LIMITS if limits is None else limits)
+        self.sweep_interval = sweep_interval
+        self._buckets = {route: {} for route in self.limits}
+        self._totals = {route: {'allowed': 0, 'rejected': 0, 'evicted': 0} for route in self.limits}
+        self._lock = threading.Lock()
+        self._next_sweep = time.monotonic() + sweep_interval
+        self._salt = os.urandom(16)
+
+    def limited(self, route):
+        return route in self.limits
+
+    def acquire(self, route, key):
+        """0.0 if the request may proceed, else seconds until a token is available"""
+        rate, burst = self.limits[route]
+        now = time.monotonic()
+        with self._lock:
+            if now >= self._next_sweep:
+                self._sweep(now)
+            buckets = self._buckets[route]
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = _Bucket(float(burst), now)
+            else:
+                bucket.tokens = min(float(burst), bucket.tokens + (now - bucket.updated) * rate)
+                bucket.updated = now
+            if bucket.tokens >= 1.0:
+                bucket.tokens -= 1.0
+                bucket.allowed += 1
+                self._totals[route]['allowed'] += 1
+                return 0.0
+            bucket.rejected += 1
+            self._totals[route]['rejected'] += 1
+            return (1.0 - bucket.tokens) / rate if rate > 0 else float('inf')
+
+    def _sweep(self, now):
+        for route, buckets in self._buckets.items():
+            rate, burst = self.limits[route]
+            refill = burst / rate if rate > 0 else float('inf')
+            idle = [key for key, bucket in buckets.items() if now - bucket.updated >= refill]
+            for key in idle:
+                del buckets[key]
+            self._totals[route]['evicted'] += len(idle)
+        self._next_sweep = now + self.sweep_interval
+
+    def sweep(self):
+        """Drop every bucket that has refilled completely"""
+        with self._lock:
+            self._sweep(time.monotonic())
+
+    def redact(self, key):
+        """'user:3f2a9c0d1b7e' for 'user:<name>': the kind, then a salted hash of the rest"""
+        kind, _, identity = key.partition(':')
+        return f"{kind}:{hmac.new(self._salt, identity.encode('utf-8'), hashlib.sha256).hexdigest()[:12]}"
+
+    def stats(self, top=10):
+        """Budgets, totals and the busiest keys per route"""
+        with self._lock:
+            routes = {}
+            for route, buckets in self._buckets.items():
+                rate, burst = self.limits[route]
+                busiest = sorted(buckets.items(), key=lambda item: (item[1].rejected, item[1].allowed),
+                                 reverse=True)[:top]
+                routes[route] = {
+                    'rate_per_second': rate,
+                    'burst': burst,
+                    'active_keys': len(buckets),
+                    **self._totals[route],
+                    'busiest_keys': [{
+                        'key': self.redact(key),
+                        'allowed': bucket.allowed,
+                        'rejected': bucket.rejected,
+                        'tokens': round(bucket.tokens, 2)
+                    } for key, bucket in busiest]
+                }
+            return routes
@@ -0,0 +1,161 @@
+"""Report analytics kept as counters, updated on every save.
+
+The counters are one set for all reports and one per user: count per
+predicted disease, per confidence bucket and per day, plus the confidence
+sum for the mean. Counting a report is O(1) and a summary only walks the
+disease and bucket counters and the requested days, so reading stats never
+depends on how many reports exist.
+
+The report store keeps them next to the reports (report_store
+`report_summary`): `ReportStats` holds them in memory for the in-process
+stores, and SQLiteStore keeps the `counter_rows` of every report in a table
+updated in the same transaction as the insert, so every process sharing the
+database reads the same totals.
+"""
+import datetime
+import math
+import threading
+from collections import Counter
+
+# Upper bounds (percent) of the confidence buckets
+CONFIDENCE_BUCKETS = (20, 40, 60, 80, 100)
+MAX_DAYS = 365
+
+
+def confidence_value(confidence):
+    """Confidence as a finite float, None if missing, not a number, NaN or infinite"""
+    try:
+        value = float(confidence)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+def confidence_bucket(confidence):
+    """'0-20' .. '80-100' for a confidence percentage, 'unknown' if not a finite number"""
+    value = confidence_value(confidence)
+    if value is None:
+        return 'unknown'
+    lower = 0
+    for upper in CONFIDENCE_BUCKETS:
+        if value < upper or upper == CONFIDENCE_BUCKETS[-1]:
+            return f'{lower}-{upper}'
+        lower = upper
+
+
+def report_keys(report):
+    """(disease, confidence bucket, confidence or None, day) a report is counted under"""
+    confidence = confidence_value(report.get('confidence'))
+    return (report.get('prediction') or 'Unknown', confidence_bucket(confidence), confidence,
+            str(report.get('timestamp', ''))[:10])
+
+
+def counter_rows(report):
+    """(counter, key, confidence) rows one report adds to the stored counters"""
+    disease, bucket, confidence, day = report_keys(report)
+    rows = [('total', '', 0.0), ('disease', disease, 0.0), ('confidence', bucket, 0.0), ('day', day, 0.0)]
+    if confidence is not None:
+        rows.append(('confidence_sum', '', confidence))
+    return rows
+
+
+def summary_from_rows(rows, days, today=None):
+    """Summary from stored (counter, key, count, confidence total) rows"""
+    counters = _Counters()
+    for counter, key, count, total in rows:
+        if counter == 'total':
+            counters.total = count
+        elif counter == 'disease':
+            counters.by_disease[key] = count
+        elif counter == 'confidence':
+            counters.by_confidence[key] = count
+        elif counter == 'day':
+            counters.by_day[key] = count
+        elif counter == 'confidence_sum':
+            counters.confidence_count = count
+            counters.confidence_sum = total
+    return counters.summary(days, today or datetime.date.today())
+
+
+def first_day(days, today=None):
+    """Oldest date (YYYY-MM-DD) in a summary of the last `days` days"""
+    return ((today or datetime.date.today()) - datetime.timedelta(days=days - 1)).isoformat()
+
+
+class _Counters:
+    __slots__ = ('total', 'by_disease', 'by_confidence', 'by_day', 'confidence_sum', 'confidence_count')
+
+    def __init__(self):
+        self.total = 0
+        self.by_disease = Counter()
+        self.by_confidence = Counter()
+        self.by_day = Counter()
+        self.confidence_sum = 0.0
+        self.confidence_count = 0
+
+    def add(self, disease, bucket, confidence, day):
+        self.total += 1
+        self.by_disease[disease] += 1
+        self.by_confidence[bucket] += 1
+        self.by_day[day] += 1
+        if confidence is not None:
+            self.confidence_sum += confidence
+            self.confidence_count += 1
+
+    def summary(self, days, today):
+        dates = [(today - datetime.timedelta(days=offset)).isoformat() for offset in range(days - 1, -1, -1)]
+        most_common = self.by_disease.most_common(1)
+        return {
+            'total': self.total,
+            'by_disease': dict(self.by_disease.most_common()),
+            'most_common_disease': most_common[0][0] if most_common else None,
+            'confidence_buckets': {**{bucket: 0 for bucket in _bucket_names()}, **self.by_confidence},
+            'mean_confidence': round(self.confidence_sum / self.confidence_count, 2) if self.confidence_count else None,
+            'per_day': [{'date': date, 'count': self.by_day.get(date, 0)} for date in dates]
+        }
+
+
+def _bucket_names():
+    lower = 0
+    for upper in CONFIDENCE_BUCKETS:
+        yield f'{lower}-{upper}'
+        lower = upper
+
+
+class ReportStats:
+    """Global and per-user report counters in process memory"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._global = _Counters()
+        self._users = {}
+
+    def record(self, username, report):
+        """Count one saved report (its prediction, confidence and timestamp)"""
+        disease, bucket, confidence, day = report_keys(report)
+        with self._lock:
+            counters = self._users.get(username)
+            if counters is None:
+                counters = self._users[username] = _Counters()
+            counters.add(disease, bucket, confidence, day)
+            self._global.add(disease, bucket, confidence, day)
+
+    def rebuild(self, store):
+        """Reset and recount from every report persisted in `store`"""
+        with self._lock:
+            self._global = _Counters()
+            self._users = {}
+        count = 0
+        for username, report in store.iter_reports():
+            self.record(username, report)
+            count += 1
+        return count
+
+    def summary(self, username=None, days=30):
+        """{'global': ..., 'user': ...} with the last `days` days of volume"""
+        today = datetime.date.today()
+        with self._lock:
+            result = {'global': self._global.summary(days, today)}
+            if username is not None:
+                result['user'] = self._users.get(username, _Counters()).summary(days, today)
+        return result
@@ -0,0 +1,867 @@
+"""User accounts and saved reports behind one small storage interface.
+
+`signup`, `login`, `save_report` and `get_reports` only talk to a store:
+
+* `create_user(username, record)` -> False if the username is taken
+* `get_user(username)` -> {'password', 'email', 'fullname', 'created_at'} or None
+* `update_password(username, hashed)`
+* `add_report(username, report)` -> the new report id (the store assigns the
+  id and the timestamp together, see REPORT_QUERY)
+* `list_reports(username, **query)` -> stored report dicts (see REPORT_QUERY)
+* `count_reports(username, disease=, start=, end=)` -> number of the user's
+  reports matching the same filters as list_reports (all of them by default)
+* `iter_reports()` -> (username, summary report) for every stored report
+* `report_summary(username, days)` -> /report-stats counters (see report_stats)
+* `save_codec(codec_id, symptom_list)`, `load_codecs()` -> {codec_id: symptom_list}
+* `revoke_token(digest, expires_at)`, `token_revoked(digest)` -> logged-out
+  JWTs (hex SHA-256 digests), remembered until they expire
+
+Stored reports keep the packed form built by app.pack_report_symptoms
+(`symptom_bits` bytes + `symptom_codec`, optional `extra_symptoms`, or a raw
+`symptoms` value when no bundle was loaded). The symptom list behind every
+codec is stored with the reports, so masks saved before a retrain can still
+be decoded after a restart.
+
+`MemoryStore` keeps the original pair of dicts, guarded by per-user lock
+stripes (nothing survives a restart; handy for tests and benchmarks), and
+its report counters in a ReportStats.
+
+`SQLiteStore` persists to one database file in WAL mode: readers never block
+the writer, request threads borrow connections from a bounded pool, and
+report inserts go through a MicroBatcher so concurrent saves share one
+transaction (group commit) while each caller still waits for its own row to
+be committed. The report counters live in the `report_counts` table and are
+updated in that same transaction, so processes sharing the database agree. With the default `commit_wait_ms=0` a batch is whatever queued
+up while the previous commit ran; waiting longer only pays off when commits
+are expensive (synchronous=FULL, slow disks).
+
+`JournalStore` is for deployments without a database: a MemoryStore whose
+changes are appended to an NDJSON journal (one fsync per group-committed
+batch) and periodically compacted into a snapshot file; see its docstring.
+"""
+import datetime
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from micro_batcher import MicroBatcher
+from report_stats import ReportStats, counter_rows, first_day, summary_from_rows
+
+REPORT_FIELDS = ('id', 'prediction', 'confidence', 'timestamp',
+                 'symptom_bits', 'symptom_codec', 'extra_symptoms', 'symptoms')
+SUMMARY_FIELDS = REPORT_FIELDS[:4]
+JSON_FIELDS = ('extra_symptoms', 'symptoms')
+
+# list_reports keyword arguments. Pages are keyset-paginated on the per-user
+# report id (ids grow in save order), so fetching a page never skips over the
+# reports before it. Timestamps grow with the id as well (the store stamps a
+# report while it numbers it, under the same lock or write transaction), so
+# date bounds are looked up as id bounds instead of scanning the history:
+#   limit       - page size (None = everything left)
+#   after       - id of the last report of the previous page
+#   descending  - newest first (`after` then means "older than")
+#   start, end  - timestamp bounds, start inclusive, end exclusive
+#   disease     - only reports with this prediction
+#   summary     - only SUMMARY_FIELDS (no symptoms)
+REPORT_QUERY = {'limit': None, 'after': None, 'descending': False,
+                'start': None, 'end': None, 'disease': None, 'summary': False}
+
+
+def query_reports(reports, limit=None, after=None, descending=False,
+                  start=None, end=None, disease=None, summary=False):
+    """Apply a REPORT_QUERY to an id-ordered list of report dicts.
+
+    `after`, `start` and `end` are binary searches, so a page costs the same
+    however long the list is; `disease` is only checked here, callers pass
+    the per-disease list when they have one.
+    """
+    first = 0 if start is None else _bisect(reports, 'timestamp', start)
+    stop = len(reports) if end is None else _bisect(reports, 'timestamp', end)
+    if after is not None and descending:
+        stop = min(stop, _bisect(reports, 'id', after))
+    elif after is not None:
+        first = max(first, _bisect(reports, 'id', after, right=True))
+    positions = range(stop - 1, first - 1, -1) if descending else range(first, stop)
+    page = []
+    for pos in positions:
+        report = reports[pos]
+        if disease is not None and report.get('prediction') != disease:
+            continue
+        page.append({field: report[field] for field in SUMMARY_FIELDS if field in report} if summary else report)
+        if limit is not None and len(page) >= limit:
+            break
+    return page
+
+
+def now_timestamp():
+    return str(datetime.datetime.now())
+
+
+def count_matching(reports, start=None, end=None):
+    """Number of reports of an id-ordered list inside the timestamp bounds"""
+    first = 0 if start is None else _bisect(reports, 'timestamp', start)
+    stop = len(reports) if end is None else _bisect(reports, 'timestamp', end)
+    return max(stop - first, 0)
+
+
+def _bisect(reports, field, value, right=False):
+    """bisect_left (bisect_right if `right`) of `value` among the reports' `field`.
+
+    Spelled out because bisect only takes a key= from Python 3.10.
+    """
+    low, high = 0, len(reports)
+    while low < high:
+        middle = (low + high) // 2
+        current = reports[middle][field]
+        if current < value or (right and current == value):
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+class MemoryStore:
+    """Users and reports in process memory, safe under a threaded server.
+
+    Every username hashes to one of `stripes` locks; creating the user,
+    allocating a report id and appending the report happen under that lock,
+    so ids are unique and each user's list stays in id order, while saves of
+    users on different stripes never wait for each other. The dicts
+    themselves are only changed with single (atomic) item assignments.
+
+    `disease_reports` keeps a second id-ordered list per (user, prediction)
+    holding the same report dicts, so a `disease` filter never walks the
+    reports of other diseases.
+    """
+
+    def __init__(self, stripes=64, clock=now_timestamp):
+        # Timestamps saved reports (benchmarks pass a synthetic one)
+        self.clock = clock
+        self.users = {}
+        self.user_reports = {}
+        self.disease_reports = {}
+        self.codecs = {}
+        self.counters = ReportStats()
+        # Revoked token digest -> expiry (unix time)
+        self.revoked_tokens = {}
+        self._revoked_lock = threading.Lock()
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+    def _lock(self, username):
+        return self._locks[hash(username) % len(self._locks)]
+
+    def create_user(self, username, record):
+        with self._lock(username):
+            if username in self.users:
+                return False
+            self.user_reports.setdefault(username, [])
+            self.users[username] = dict(record)
+        return True
+
+    def get_user(self, username):
+        return self.users.get(username)
+
+    def update_password(self, username, hashed):
+        with self._lock(username):
+            self.users[username]['password'] = hashed
+
+    def add_report(self, username, report):
+        return self._add_report(username, report)['id']
+
+    def _add_report(self, username, report):
+        """Number, timestamp and append one report; returns the stored dict"""
+        with self._lock(username):
+            reports = self.user_reports.get(username)
+            if reports is None:
+                reports = self.user_reports[username] = []
+            # After the highest id, not the count: a replayed journal can have gaps
+            report = dict(report, id=reports[-1]['id'] + 1 if reports else 1, timestamp=self.clock())
+            reports.append(report)
+            self.disease_reports.setdefault((username, report.get('prediction')), []).append(report)
+            self.counters.record(username, report)
+        return report
+
+    def _index_diseases(self):
+        """Rebuild disease_reports from user_reports (after a bulk load)"""
+        self.disease_reports = {}
+        for username, reports in self.user_reports.items():
+            for report in reports:
+                self.disease_reports.setdefault((username, report.get('prediction')), []).append(report)
+
+    def list_reports(self, username, disease=None, **query):
+        with self._lock(username):
+            if disease is None:
+                return query_reports(self.user_reports.get(username, []), **query)
+            return query_reports(self.disease_reports.get((username, disease), []), disease=disease, **query)
+
+    def count_reports(self, username, disease=None, start=None, end=None):
+        with self._lock(username):
+            if disease is None:
+                return count_matching(self.user_reports.get(username, []), start, end)
+            return count_matching(self.disease_reports.get((username, disease), []), start, end)
+
+    def iter_reports(self):
+        for username in list(self.user_reports):
+            with self._lock(username):
+                reports = list(self.user_reports[username])
+            for report in reports:
+                yield username, {field: report[field] for field in SUMMARY_FIELDS if field in report}
+
+    def report_summary(self, username=None, days=30):
+        return self.counters.summary(username, days)
+
+    def save_codec(self, codec_id, symptom_list):
+        """Remember the symptom list of a codec; False if it was already known"""
+        if codec_id in self.codecs:
+            return False
+        self.codecs[codec_id] = list(symptom_list)
+        return True
+
+    def load_codecs(self):
+        return dict(self.codecs)
+
+    def revoke_token(self, digest, expires_at):
+        now = time.time()
+        with self._revoked_lock:
+            # Expired tokens fail jwt.decode anyway: forget them here
+            for stale in [key for key, until in self.revoked_tokens.items() if until <= now]:
+                del self.revoked_tokens[stale]
+            if expires_at > now:
+                self.revoked_tokens[digest] = expires_at
+
+    def token_revoked(self, digest):
+        expires_at = self.revoked_tokens.get(digest)
+        return expires_at is not None and expires_at > time.time()
+
+    def stats(self):
+        return {
+            'backend': 'memory',
+            'users': len(self.users),
+            'reports': sum(len(reports) for reports in self.user_reports.values()),
+            'revoked_tokens': len(self.revoked_tokens)
+        }
+
+    def close(self):
+        pass
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    password BLOB NOT NULL,
+    email TEXT,
+    fullname TEXT,
+    created_at TEXT
+);
+CREATE TABLE IF NOT EXISTS reports (
+    username TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    prediction TEXT,
+    confidence,
+    timestamp TEXT NOT NULL,
+    symptom_bits BLOB,
+    symptom_codec TEXT,
+    extra_symptoms TEXT,
+    symptoms TEXT,
+    PRIMARY KEY (username, id)
+);
+CREATE INDEX IF NOT EXISTS reports_username_timestamp ON reports (username, timestamp);
+CREATE INDEX IF NOT EXISTS reports_username_prediction ON reports (username, prediction, id);
+CREATE TABLE IF NOT EXISTS symptom_codecs (
+    codec_id TEXT PRIMARY KEY,
+    symptom_list TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS report_counts (
+    username TEXT NOT NULL,
+    counter TEXT NOT NULL,
+    key TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    total REAL NOT NULL,
+    PRIMARY KEY (username, counter, key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS revoked_tokens (
+    digest TEXT PRIMARY KEY,
+    expires_at REAL NOT NULL
+);
+"""
+
+# report_counts rows: report_stats.counter_rows of every report, once under
+# its username and once under ALL_USERS (usernames are never empty)
+ALL_USERS = ''
+COUNT_SQL = ('INSERT INTO report_counts (username, counter, key, count, total) VALUES (?, ?, ?, ?, ?) '
+             'ON CONFLICT (username, counter, key) DO UPDATE SET '
+             'count = count + excluded.count, total = total + excluded.total')
+
+
+def _count_report(deltas, username, report):
+    for counter, key, confidence in counter_rows(report):
+        for scope in (username, ALL_USERS):
+            count, total = deltas.get((scope, counter, key), (0, 0.0))
+            deltas[scope, counter, key] = (count + 1, total + confidence)
+
+
+def _write_counts(connection, deltas):
+    connection.executemany(COUNT_SQL, [(scope, counter, key, count, total)
+                                       for (scope, counter, key), (count, total) in deltas.items()])
+
+
+class SQLiteStore:
+    """Users and reports in a SQLite database (WAL, pooled connections, group commit)"""
+
+    def __init__(self, path, commit_batch_size=64, commit_wait_ms=0.0, pool_size=8, clock=now_timestamp):
+        self.path = path
+        self.clock = clock
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        # Request threads borrow connections from a bounded pool (a threaded
+        # server runs every request on a fresh thread, so per-thread
+        # connections would never be closed); the writer keeps its own
+        self.pool_size = pool_size
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self._write_connection = self._open()
+        self._write_connection.executescript(SCHEMA)
+        self._count_existing_reports()
+        self._writer = MicroBatcher(self._write_reports, max_wait_ms=commit_wait_ms,
+                                    max_batch_size=commit_batch_size)
+
+    def _open(self):
+        connection = sqlite3.connect(self.path, timeout=10.0, check_same_thread=False)
+        connection.execute('PRAGMA journal_mode=WAL')
+        # Durable across process crashes; an OS crash may lose the last commits
+        connection.execute('PRAGMA synchronous=NORMAL')
+        with self._connections_lock:
+            self._connections.append(connection)
+        return connection
+
+    def _count_existing_reports(self):
+        """Fill report_counts once for a database created before it existed"""
+        connection = self._write_connection
+        with connection:
+            # Taking the write lock first: concurrent processes count only once
+            connection.execute('BEGIN IMMEDIATE')
+            if connection.execute('SELECT 1 FROM report_counts LIMIT 1').fetchone() is not None:
+                return
+            deltas = {}
+            for username, report in self.iter_reports():
+                _count_report(deltas, username, report)
+            _write_counts(connection, deltas)
+
+    @contextmanager
+    def _connection(self):
+        """Borrow a pooled connection for the duration of the block"""
+        if not self._slots.acquire(timeout=30.0):
+            raise TimeoutError('Timed out waiting for a database connection!')
+        try:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                connection = self._open()
+            try:
+                yield connection
+            finally:
+                self._idle.put(connection)
+        finally:
+            self._slots.release()
+
+    def create_user(self, username, record):
+        with self._connection() as connection, connection:
+            cursor = connection.execute(
+                'INSERT OR IGNORE INTO users (username, password, email, fullname, created_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (username, record['password'], record.get('email'), record.get('fullname'),
+                 record.get('created_at')))
+        return cursor.rowcount == 1
+
+    def get_user(self, username):
+        with self._connection() as connection:
+            row = connection.execute(
+                'SELECT password, email, fullname, created_at FROM users WHERE username = ?',
+                (username,)).fetchone()
+        if row is None:
+            return None
+        return {'password': bytes(row[0]), 'email': row[1], 'fullname': row[2], 'created_at': row[3]}
+
+    def update_password(self, username, hashed):
+        with self._connection() as connection, connection:
+            connection.execute('UPDATE users SET password = ? WHERE username = ?', (hashed, username))
+
+    def _write_reports(self, items):
+        # Runs on the MicroBatcher thread: one transaction for the whole batch.
+        # BEGIN IMMEDIATE takes the database write lock before any id is read,
+        # so ids and timestamps are assigned in commit order even when several
+        # processes write to the same file.
+        # Rows are inserted one statement at a time, so a row that cannot be
+        # bound only fails its own caller (SQLite keeps the transaction open
+        # after a failed statement) instead of every save in the batch.
+        connection = self._write_connection
+        sql = (f"INSERT INTO reports (username, {', '.join(REPORT_FIELDS)}) "
+               f"VALUES ({', '.join('?' * (len(REPORT_FIELDS) + 1))})")
+        results = []
+        deltas = {}
+        next_ids = {}
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            for username, report in items:
+                report_id = next_ids.get(username)
+                if report_id is None:
+                    report_id = connection.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM reports WHERE username = ?',
+                                                   (username,)).fetchone()[0]
+                report = dict(report, timestamp=self.clock())
+                try:
+                    connection.execute(sql, [username, report_id] + [
+                        json.dumps(report[field]) if field in JSON_FIELDS and field in report
+                        else report.get(field)
+                        for field in REPORT_FIELDS[1:]])
+                except (sqlite3.InterfaceError, sqlite3.ProgrammingError, TypeError, ValueError,
+                        OverflowError) as e:
+                    next_ids[username] = report_id
+                    results.append(ValueError(f'Report cannot be stored: {e}'))
+                else:
+                    next_ids[username] = report_id + 1
+                    results.append(report_id)
+                    _count_report(deltas, username, report)
+            _write_counts(connection, deltas)
+        return results
+
+    def add_report(self, username, report):
+        result = self._writer.submit((username, report), timeout=30.0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    @staticmethod
+    def _report(row, fields=REPORT_FIELDS):
+        report = {}
+        for field, value in zip(fields, row):
+            if value is None and field != 'prediction' and field != 'confidence':
+                continue
+            if field in JSON_FIELDS:
+                value = json.loads(value)
+            elif field == 'symptom_bits':
+                value = bytes(value)
+            report[field] = value
+        return report
+
+    @staticmethod
+    def _id_bounds(connection, username, start, end):
+        """(lowest, highest) report id inside the timestamp bounds, or None if none are.
+
+        Two lookups on the (username, timestamp) index; the page query then
+        walks the primary key (or the disease index) between these ids.
+        """
+        low = high = None
+        if start is not None:
+            row = connection.execute('SELECT id FROM reports WHERE username = ? AND timestamp >= ? '
+                                     'ORDER BY timestamp LIMIT 1', (username, start)).fetchone()
+            if row is None:
+                return None
+            low = row[0]
+        if end is not None:
+            row = connection.execute('SELECT id FROM reports WHERE username = ? AND timestamp < ? '
+                                     'ORDER BY timestamp DESC LIMIT 1', (username, end)).fetchone()
+            if row is None:
+                return None
+            high = row[0]
+        return low, high
+
+    def _filter(self, connection, username, disease, start, end):
+        """(WHERE clause, params) for the list_reports filters, None if nothing can match"""
+        where = ' WHERE username = ?'
+        params = [username]
+        if disease is not None:
+            where += ' AND prediction = ?'
+            params.append(disease)
+        if start is not None or end is not None:
+            bounds = self._id_bounds(connection, username, start, end)
+            if bounds is None:
+                return None
+            for condition, value in zip((' AND id >= ?', ' AND id <= ?'), bounds):
+                if value is not None:
+                    where += condition
+                    params.append(value)
+        return where, params
+
+    def list_reports(self, username, limit=None, after=None, descending=False,
+                     start=None, end=None, disease=None, summary=False):
+        fields = SUMMARY_FIELDS if summary else REPORT_FIELDS
+        with self._connection() as connection:
+            where = self._filter(connection, username, disease, start, end)
+            if where is None:
+                return []
+            sql = f"SELECT {', '.join(fields)} FROM reports" + where[0]
+            params = where[1]
+            if after is not None:
+                sql += ' AND id < ?' if descending else ' AND id > ?'
+                params.append(after)
+            sql += ' ORDER BY id DESC' if descending else ' ORDER BY id'
+            if limit is not None:
+                sql += ' LIMIT ?'
+                params.append(limit)
+            rows = connection.execute(sql, params).fetchall()
+        return [self._report(row, fields) for row in rows]
+
+    def count_reports(self, username, disease=None, start=None, end=None):
+        with self._connection() as connection:
+            if disease is None and start is None and end is None:
+                row = connection.execute("SELECT count FROM report_counts WHERE username = ? AND counter = 'total'",
+                                         (username,)).fetchone()
+                return row[0] if row is not None else 0
+            # Filtered totals count index entries between the page query's bounds
+            where = self._filter(connection, username, disease, start, end)
+            if where is None:
+                return 0
+            return connection.execute('SELECT COUNT(*) FROM reports' + where[0], where[1]).fetchone()[0]
+
+    def report_summary(self, username=None, days=30):
+        sql = ("SELECT counter, key, count, total FROM report_counts "
+               "WHERE username = ? AND (counter != 'day' OR key >= ?)")
+        today = datetime.date.today()
+        since = first_day(days, today)
+        with self._connection() as connection:
+            result = {'global': summary_from_rows(connection.execute(sql, (ALL_USERS, since)), days, today)}
+            if username is not None:
+                result['user'] = summary_from_rows(connection.execute(sql, (username, since)), days, today)
+        return result
+
+    def iter_reports(self):
+        # Streams rows from the cursor instead of fetching the whole table
+        with self._connection() as connection:
+            for row in connection.execute(f"SELECT username, {', '.join(SUMMARY_FIELDS)} FROM reports"):
+                yield row[0], dict(zip(SUMMARY_FIELDS, row[1:]))
+
+    def save_codec(self, codec_id, symptom_list):
+        with self._connection() as connection, connection:
+            cursor = connection.execute(
+                'INSERT OR IGNORE INTO symptom_codecs (codec_id, symptom_list) VALUES (?, ?)',
+                (codec_id, json.dumps(list(symptom_list))))
+        return cursor.rowcount == 1
+
+    def load_codecs(self):
+        with self._connection() as connection:
+            rows = connection.execute('SELECT codec_id, symptom_list FROM symptom_codecs').fetchall()
+        return {codec_id: json.loads(symptom_list) for codec_id, symptom_list in rows}
+
+    def revoke_token(self, digest, expires_at):
+        now = time.time()
+        with self._connection() as connection, connection:
+            connection.execute('DELETE FROM revoked_tokens WHERE expires_at <= ?', (now,))
+            if expires_at > now:
+                connection.execute('INSERT OR REPLACE INTO revoked_tokens (digest, expires_at) VALUES (?, ?)',
+                                   (digest, expires_at))
+
+    def token_revoked(self, digest):
+        with self._connection() as connection:
+            return connection.execute('SELECT 1 FROM revoked_tokens WHERE digest = ? AND expires_at > ?',
+                                      (digest, time.time())).fetchone() is not None
+
+    def stats(self):
+        with self._connection() as connection:
+            users = connection.execute('SELECT COUNT(*) FROM users').fetchone()[0]
+            reports = connection.execute('SELECT COUNT(*) FROM reports').fetchone()[0]
+            revoked_tokens = connection.execute('SELECT COUNT(*) FROM revoked_tokens').fetchone()[0]
+        return {
+            'backend': 'sqlite',
+            'path': self.path,
+            'users': users,
+            'reports': reports,
+            'revoked_tokens': revoked_tokens,
+            'connections': len(self._connections),
+            'pool_size': self.pool_size,
+            'group_commit': self._writer.stats()
+        }
+
+    def close(self):
+        with self._connections_lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+
+
+JOURNAL_FILE = 'journal.ndjson'
+ROTATED_JOURNAL_FILE = 'journal.ndjson.1'
+SNAPSHOT_FILE = 'snapshot.ndjson'
+
+
+def _user_record(username, user):
+    return {'op': 'user', 'username': username,
+            'user': dict(user, password=user['password'].decode('ascii'))}
+
+
+def _codec_record(codec_id, symptom_list):
+    return {'op': 'codec', 'codec_id': codec_id, 'symptom_list': symptom_list}
+
+
+def _revoke_record(digest, expires_at):
+    return {'op': 'revoke', 'digest': digest, 'expires_at': expires_at}
+
+
+def _report_record(username, report):
+    if 'symptom_bits' in report:
+        report = dict(report, symptom_bits=report['symptom_bits'].hex())
+    return {'op': 'report', 'username': username, 'report': report}
+
+
+# One shared encoder: json.dumps builds a new one per call for non-default separators
+_json_encoder = json.JSONEncoder(separators=(',', ':'))
+_json_decoder = json.JSONDecoder()
+
+
+def _encode(record):
+    return _json_encoder.encode(record) + '\n'
+
+
+def _fsync_directory(directory):
+    # Makes renames durable; directories cannot be opened on Windows
+    if os.name == 'nt':
+        return
+    descriptor = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+class JournalStore(MemoryStore):
+    """MemoryStore persisted as a snapshot plus an append-only NDJSON journal.
+
+    Every change (new user, password upgrade, new report, new symptom codec,
+    revoked token) is applied in memory and then appended to journal.ndjson as one JSON
+    line. Appends go through a MicroBatcher: the writer thread writes a whole
+    batch, fsyncs once and only then releases the callers, so an acknowledged
+    save is on disk without paying one fsync per report.
+
+    After `snapshot_every` journal records (and on close) the writer thread
+    rotates the journal to journal.ndjson.1, starts a fresh one and hands
+    compaction to a background thread, so saves keep flowing: the in-memory
+    state (a superset of everything rotated) is streamed to
+    snapshot.ndjson.tmp, fsynced and renamed over snapshot.ndjson, then the
+    rotated journal is deleted.
+
+    Startup streams the snapshot, the rotated journal (left by a crash
+    during compaction) and the journal, line by line. Records are idempotent
+    (reports are keyed by (username, id)), so a crash between the rename and
+    the delete, or a report journaled after the snapshot already saw it in
+    memory, only replays a duplicate that is dropped. A torn last line from a
+    crash mid-append is cut off.
+    """
+
+    def __init__(self, directory, fsync_batch_size=256, fsync_wait_ms=0.0, snapshot_every=100000, stripes=64,
+                 clock=now_timestamp):
+        super().__init__(stripes, clock)
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        os.makedirs(directory, exist_ok=True)
+        self._journal_path = os.path.join(directory, JOURNAL_FILE)
+        self._rotated_path = os.path.join(directory, ROTATED_JOURNAL_FILE)
+        self._snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+        self.snapshots = 0
+        self.last_snapshot_ms = None
+        self._compactor = None
+        self._compact_lock = threading.Lock()
+
+        started = time.perf_counter()
+        last_ids, unordered = {}, set()
+        replayed = (self._replay(self._snapshot_path, last_ids, unordered) +
+                    self._replay(self._rotated_path, last_ids, unordered, repair=True))
+        journal_records = self._replay(self._journal_path, last_ids, unordered, repair=True)
+        # Concurrent saves may be journaled out of id order, and a compaction
+        # can repeat a report: restore id order and drop the repeats
+        for username in unordered:
+            by_id = {report['id']: report for report in self.user_reports[username]}
+            self.user_reports[username] = [by_id[report_id] for report_id in sorted(by_id)]
+        self._index_diseases()
+        self.counters.rebuild(self)
+        self.replay = {'records': replayed + journal_records, 'seconds': round(time.perf_counter() - started, 3)}
+
+        # A compaction interrupted by a crash is finished before journaling
+        # again, so rotating can never overwrite an unmerged journal.ndjson.1
+        if os.path.exists(self._rotated_path):
+            self._compact()
+        self._journal = open(self._journal_path, 'ab')
+        self._journal_records = journal_records
+        self._writer = MicroBatcher(self._append, max_wait_ms=fsync_wait_ms, max_batch_size=fsync_batch_size)
+
+    # ---- replay ----
+    def _replay(self, path, last_ids, unordered, repair=False):
+        """Apply every record of one NDJSON file; returns the number applied.
+
+        `last_ids` (username -> highest report id so far) and `unordered`
+        (users whose reports arrived out of id order) carry over between files.
+        """
+        if not os.path.exists(path):
+            return 0
+        applied = 0
+        offset = 0
+        # Lines are known to be one UTF-8 object each: skip json.loads' encoding
+        # detection and whitespace handling (about a third of the replay time)
+        decode = _json_decoder.raw_decode
+        user_reports = self.user_reports
+        with open(path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    print(f"⚠ {os.path.basename(path)}: dropping a torn last record")
+                    break
+                offset += len(line)
+                try:
+                    record = decode(line.decode('utf-8'))[0]
+                except ValueError:
+                    print(f"⚠ {os.path.basename(path)}: skipping an unreadable record")
+                    continue
+                if record['op'] == 'codec':
+                    self.codecs[record['codec_id']] = record['symptom_list']
+                    applied += 1
+                    continue
+                if record['op'] == 'revoke':
+                    self.revoked_tokens[record['digest']] = record['expires_at']
+                    applied += 1
+                    continue
+                username = record['username']
+                if record['op'] == 'report':
+                    report = record['report']
+                    if 'symptom_bits' in report:
+                        report['symptom_bits'] = bytes.fromhex(report['symptom_bits'])
+                    reports = user_reports.get(username)
+                    if reports is None:
+                        reports = user_reports[username] = []
+                    last_id = last_ids.get(username, 0)
+                    if report['id'] <= last_id:
+                        unordered.add(username)
+                    else:
+                        last_ids[username] = report['id']
+                    reports.append(report)
+                elif record['op'] == 'user':
+                    user = record['user']
+                    user['password'] = user['password'].encode('ascii')
+                    self.users[username] = user
+                    self.user_reports.setdefault(username, [])
+                elif record['op'] == 'password':
+                    self.users[username]['password'] = record['password'].encode('ascii')
+                applied += 1
+        if repair and offset < os.path.getsize(path):
+            with open(path, 'r+b') as f:
+                f.truncate(offset)
+        return applied
+
+    # ---- writes ----
+
+    def _append(self, records):
+        # Runs on the MicroBatcher thread; None asks for a compaction
+        lines = [_encode(record) for record in records if record is not None]
+        if lines:
+            self._journal.write(''.join(lines).encode('utf-8'))
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._journal_records += len(lines)
+        requested = None in records
+        if requested or self._journal_records >= self.snapshot_every:
+            if requested and self._compactor is not None:
+                self._compactor.join()
+            if self._compactor is None or not self._compactor.is_alive():
+                self._rotate()
+        return [None] * len(records)
+
+    def _rotate(self):
+        # Runs on the MicroBatcher thread, so no append can interleave
+        self._journal.close()
+        os.replace(self._journal_path, self._rotated_path)
+        self._journal = open(self._journal_path, 'ab')
+        _fsync_directory(self.directory)
+        self._journal_records = 0
+        self._compactor = threading.Thread(target=self._compact, name='journal-compactor', daemon=True)
+        self._compactor.start()
+
+    def _compact(self):
+        started = time.perf_counter()
+        temporary = self._snapshot_path + '.tmp'
+        with open(temporary, 'wb') as f:
+            f.write(''.join(_encode(_codec_record(codec_id, symptom_list))
+                            for codec_id, symptom_list in list(self.codecs.items())).encode('utf-8'))
+            now = time.time()
+            f.write(''.join(_encode(_revoke_record(digest, expires_at))
+                            for digest, expires_at in list(self.revoked_tokens.items())
+                            if expires_at > now).encode('utf-8'))
+            for username in list(self.users):
+                with self._lock(username):
+                    lines = [_encode(_user_record(username, self.users[username]))]
+                    lines.extend(_encode(_report_record(username, report))
+                                 for report in self.user_reports.get(username, []))
+                f.write(''.join(lines).encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self._snapshot_path)
+        _fsync_directory(self.directory)
+        if os.path.exists(self._rotated_path):
+            os.remove(self._rotated_path)
+        self.snapshots += 1
+        self.last_snapshot_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    def create_user(self, username, record):
+        if not super().create_user(username, record):
+            return False
+        self._writer.submit(_user_record(username, record), timeout=30.0)
+        return True
+
+    def update_password(self, username, hashed):
+        super().update_password(username, hashed)
+        self._writer.submit({'op': 'password', 'username': username, 'password': hashed.decode('ascii')},
+                            timeout=30.0)
+
+    def add_report(self, username, report):
+        stored = self._add_report(username, report)
+        self._writer.submit(_report_record(username, stored), timeout=30.0)
+        return stored['id']
+
+    def save_codec(self, codec_id, symptom_list):
+        if not super().save_codec(codec_id, symptom_list):
+            return False
+        self._writer.submit(_codec_record(codec_id, self.codecs[codec_id]), timeout=30.0)
+        return True
+
+    def revoke_token(self, digest, expires_at):
+        super().revoke_token(digest, expires_at)
+        self._writer.submit(_revoke_record(digest, expires_at), timeout=30.0)
+
+    def compact(self):
+        """Rotate the journal and wait until it is merged into the snapshot"""
+        self._writer.submit(None, timeout=300.0)
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+
+    def stats(self):
+        return {
+            **super().stats(),
+            'backend': 'journal',
+            'directory': self.directory,
+            'journal_records': self._journal_records,
+            'snapshot_every': self.snapshot_every,
+            'snapshots': self.snapshots,
+            'compacting': self._compactor is not None and self._compactor.is_alive(),
+            'last_snapshot_ms': self.last_snapshot_ms,
+            'replay': self.replay,
+            'group_commit': self._writer.stats()
+        }
+
+    def close(self):
+        if self._journal.closed:
+            return
+        self.compact()
+        self._journal.close()
+
+
+def open_store(backend, path=None, **options):
+    """'memory', 'sqlite' (database file `path`) or 'journal' (directory `path`) store"""
+    if backend == 'memory':
+        return MemoryStore()
+    if backend == 'sqlite':
+        return SQLiteStore(path, **options)
+    if backend == 'journal':
+        return JournalStore(path, **options)
+    raise ValueError(f'Unknown report store backend: {backend!r}')
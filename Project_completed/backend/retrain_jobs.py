@@ -0,0 +1,99 @@
+"""Background model retraining jobs."""
+import datetime
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import uuid
+from collections import OrderedDict
+
+MAX_LOG_LINES = 500
+MAX_JOBS_KEPT = 20
+
+
+class RetrainJobs:
+    """Runs train_model.py in a background thread, one job at a time.
+
+    Each job trains into its own staging directory under `models_dir`. When
+    training succeeds, `install(staging_dir)` is called to load and swap in
+    the new bundle; it returns the installed bundle version. The staging
+    directory is always removed afterwards.
+    """
+
+    def __init__(self, backend_dir, models_dir, install):
+        self.backend_dir = backend_dir
+        self.models_dir = models_dir
+        self.install = install
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._running = None
+
+    def start(self):
+        """Start a new job; returns its snapshot, or None if one is already running"""
+        with self._lock:
+            if self._running is not None:
+                return None
+            job_id = uuid.uuid4().hex[:12]
+            job = {
+                'job_id': job_id,
+                'status': 'queued',
+                'created_at': str(datetime.datetime.now()),
+                'finished_at': None,
+                'returncode': None,
+                'bundle_version': None,
+                'error': None,
+                'log': []
+            }
+            self._jobs[job_id] = job
+            while len(self._jobs) > MAX_JOBS_KEPT:
+                self._jobs.popitem(last=False)
+            self._running = job_id
+        threading.Thread(target=self._run, args=(job,), name=f'retrain-{job_id}', daemon=True).start()
+        return self._snapshot(job)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._snapshot(job) if job is not None else None
+
+    def running(self):
+        with self._lock:
+            return self._running
+
+    def _snapshot(self, job):
+        snapshot = dict(job)
+        snapshot['log'] = list(job['log'])
+        return snapshot
+
+    def _update(self, job, **fields):
+        with self._lock:
+            job.update(fields)
+
+    def _run(self, job):
+        staging_dir = os.path.abspath(os.path.join(self.models_dir, f".staging-{job['job_id']}"))
+        env = dict(os.environ, DIAGNO_MODELS_DIR=staging_dir, MPLBACKEND='Agg', PYTHONUNBUFFERED='1')
+        try:
+            self._update(job, status='training')
+            process = subprocess.Popen([sys.executable, 'train_model.py'], cwd=self.backend_dir, env=env,
+                                       stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+            for line in process.stdout:
+                with self._lock:
+                    job['log'].append(line.rstrip('\n'))
+                    del job['log'][:-MAX_LOG_LINES]
+            returncode = process.wait()
+            self._update(job, returncode=returncode)
+            if returncode != 0:
+                self._update(job, status='failed', error=f'train_model.py exited with code {returncode}')
+                return
+
+            self._update(job, status='installing')
+            version = self.install(staging_dir)
+            self._update(job, status='succeeded', bundle_version=version)
+        except Exception as e:
+            self._update(job, status='failed', error=str(e))
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            with self._lock:
+                job['finished_at'] = str(datetime.datetime.now())
+                self._running = None
@@ -0,0 +1,215 @@
+"""Pure-NumPy inference for the trained RBF SVC.
+
+`export_svc_arrays` extracts everything libsvm needs at prediction time
+(support vectors, dual coefficients, intercepts, gamma and the pairwise
+Platt sigmoid parameters) from a fitted SVC. `NumpySVC` is built from those
+arrays (train time) or from the model artifact that stores them
+(model_artifact, at serving time) and reproduces `SVC.predict_proba` without
+importing scikit-learn:
+
+1. RBF kernel between the inputs and all support vectors (one matmul).
+2. One-vs-one decision values for every class pair (one more matmul against a
+   precomputed support-vector x pair coefficient matrix).
+3. Platt scaling of each pairwise decision value into r_ij.
+4. Pairwise coupling (Wu, Lin & Weng 2004, method 2). libsvm solves this
+   iteratively to a tolerance; here the same quadratic problem is solved
+   exactly as a small batched linear system, so results agree with sklearn
+   to within libsvm's own convergence tolerance.
+
+`python -m svc_engine` checks that on a few fixed rows, for the exported
+pickle and the current model artifact.
+"""
+import numpy as np
+
+EXPORT_FORMAT_VERSION = 1
+
+# libsvm clamps pairwise probabilities to [MIN_PROB, 1 - MIN_PROB]
+MIN_PROB = 1e-7
+
+
+def export_svc_arrays(model, feature_names=None):
+    """Prediction-time parameters of a fitted SVC, as the arrays NumpySVC takes"""
+    if model.kernel != 'rbf':
+        raise ValueError('Only RBF SVC models can be exported!')
+    if not getattr(model, 'probability', False):
+        raise ValueError('Model must be trained with probability=True!')
+    if feature_names is None:
+        feature_names = getattr(model, 'feature_names_in_', [])
+    return dict(
+        format_version=np.array(EXPORT_FORMAT_VERSION),
+        classes=np.asarray(model.classes_).astype(str),
+        feature_names=np.asarray(feature_names).astype(str),
+        support_vectors=np.asarray(model.support_vectors_, dtype=np.float64),
+        n_support=np.asarray(model.n_support_, dtype=np.int64),
+        dual_coef=np.asarray(model.dual_coef_, dtype=np.float64),
+        intercept=np.asarray(model.intercept_, dtype=np.float64),
+        gamma=np.array(float(model._gamma)),
+        prob_a=np.asarray(model.probA_, dtype=np.float64),
+        prob_b=np.asarray(model.probB_, dtype=np.float64),
+    )
+
+
+class NumpySVC:
+    """Drop-in `predict_proba` / `predict` for an exported RBF SVC"""
+
+    engine_name = 'numpy'
+
+    def __init__(self, arrays):
+        version = int(arrays['format_version'])
+        if version != EXPORT_FORMAT_VERSION:
+            raise ValueError(f'Unsupported SVC export format version {version}!')
+
+        self.classes_ = np.asarray(arrays['classes'])
+        self.feature_names = [str(name) for name in arrays['feature_names']]
+        self.support_vectors = np.ascontiguousarray(arrays['support_vectors'], dtype=np.float64)
+        self.n_support = np.asarray(arrays['n_support'], dtype=np.int64)
+        self.intercept = np.asarray(arrays['intercept'], dtype=np.float64)
+        self.gamma = float(arrays['gamma'])
+        self.prob_a = np.asarray(arrays['prob_a'], dtype=np.float64)
+        self.prob_b = np.asarray(arrays['prob_b'], dtype=np.float64)
+
+        n_classes = len(self.classes_)
+        self.pairs_i, self.pairs_j = np.triu_indices(n_classes, k=1)
+
+        # Derived arrays are recomputed unless supplied (see shared_arrays)
+        if 'sv_sq_norms' in arrays:
+            self.sv_sq_norms = np.asarray(arrays['sv_sq_norms'], dtype=np.float64)
+        else:
+            self.sv_sq_norms = np.einsum('ij,ij->i', self.support_vectors, self.support_vectors)
+        if 'pair_coef' in arrays:
+            self.pair_coef = np.asarray(arrays['pair_coef'], dtype=np.float64)
+        else:
+            self.pair_coef = self._pair_coefficients(np.asarray(arrays['dual_coef'], dtype=np.float64))
+
+    def _pair_coefficients(self, dual_coef):
+        # Pair p = (i, j) sums the kernel row over the support vectors of class
+        # i (weights in dual_coef row j - 1) and of class j (row i); fold that
+        # into one (n_SV x n_pairs) matrix so all decision values are a matmul.
+        starts = np.concatenate(([0], np.cumsum(self.n_support)))
+        pair_coef = np.zeros((len(self.support_vectors), len(self.pairs_i)))
+        for p, (i, j) in enumerate(zip(self.pairs_i, self.pairs_j)):
+            pair_coef[starts[i]:starts[i + 1], p] = dual_coef[j - 1, starts[i]:starts[i + 1]]
+            pair_coef[starts[j]:starts[j + 1], p] = dual_coef[i, starts[j]:starts[j + 1]]
+        return pair_coef
+
+    def shared_arrays(self):
+        """Every array needed for inference, including the derived ones, so a
+        copy opened from disk (e.g. memory-mapped) does no per-process work"""
+        return {
+            'format_version': np.array(EXPORT_FORMAT_VERSION),
+            'classes': np.asarray(self.classes_).astype(str),
+            'feature_names': np.asarray(self.feature_names).astype(str),
+            'support_vectors': self.support_vectors,
+            'n_support': self.n_support,
+            'intercept': self.intercept,
+            'gamma': np.array(self.gamma),
+            'prob_a': self.prob_a,
+            'prob_b': self.prob_b,
+            'sv_sq_norms': self.sv_sq_norms,
+            'pair_coef': self.pair_coef,
+        }
+
+    @property
+    def n_features_in_(self):
+        return self.support_vectors.shape[1]
+
+    def decision_function(self, X):
+        """One-vs-one decision values, shape (n_samples, n_pairs)"""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        sq_dist = np.einsum('ij,ij->i', X, X)[:, None] + self.sv_sq_norms[None, :] - 2.0 * (X @ self.support_vectors.T)
+        np.maximum(sq_dist, 0.0, out=sq_dist)
+        kernel = np.exp(-self.gamma * sq_dist)
+        return kernel @ self.pair_coef + self.intercept
+
+    def predict_proba(self, X):
+        decision = self.decision_function(X)
+        n_samples = decision.shape[0]
+        n_classes = len(self.classes_)
+
+        # Platt-scaled pairwise probabilities r_ij = P(class i | i or j)
+        pairwise = 1.0 / (1.0 + np.exp(decision * self.prob_a + self.prob_b))
+        np.clip(pairwise, MIN_PROB, 1.0 - MIN_PROB, out=pairwise)
+        r = np.zeros((n_samples, n_classes, n_classes))
+        r[:, self.pairs_i, self.pairs_j] = pairwise
+        r[:, self.pairs_j, self.pairs_i] = 1.0 - pairwise
+
+        # Pairwise coupling: minimise p'Qp subject to sum(p) == 1, with
+        # Q_tt = sum_{j != t} r_jt^2 and Q_tj = -r_jt * r_tj
+        r_t = np.swapaxes(r, 1, 2)
+        q = -r_t * r
+        diag = np.arange(n_classes)
+        q[:, diag, diag] = np.einsum('ijk,ijk->ik', r, r)
+
+        system = np.ones((n_samples, n_classes + 1, n_classes + 1))
+        system[:, :n_classes, :n_classes] = q
+        system[:, n_classes, n_classes] = 0.0
+        rhs = np.zeros((n_samples, n_classes + 1, 1))
+        rhs[:, n_classes, 0] = 1.0
+        probabilities = np.linalg.solve(system, rhs)[:, :n_classes, 0]
+
+        np.clip(probabilities, 0.0, None, out=probabilities)
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        return probabilities
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def parity_rows(n_features, n_rows=8, seed=0):
+    """Fixed 0/1 symptom rows: no symptoms, then seeded sets of 2 to 6 symptoms"""
+    rng = np.random.default_rng(seed)
+    X = np.zeros((n_rows, n_features))
+    for row in range(1, n_rows):
+        X[row, rng.choice(n_features, size=min(2 + row % 5, n_features), replace=False)] = 1.0
+    return X
+
+
+def check_parity(model, engine, X, tolerance=1e-3):
+    """Problems found comparing engine.predict_proba with the SVC's on X (empty list = parity)"""
+    expected = model.predict_proba(X)
+    actual = engine.predict_proba(X)
+    problems = []
+    if [str(c) for c in engine.classes_] != [str(c) for c in model.classes_]:
+        problems.append('classes differ')
+    worst = np.abs(actual - expected).max(axis=1)
+    for row in np.flatnonzero(worst > tolerance):
+        problems.append(f'row {row}: max |difference| {worst[row]:.2e} > {tolerance:g}')
+    for row in np.flatnonzero(actual.argmax(axis=1) != expected.argmax(axis=1)):
+        problems.append(f'row {row}: most likely class {engine.classes_[actual[row].argmax()]} '
+                        f'instead of {model.classes_[expected[row].argmax()]}')
+    return problems
+
+
+if __name__ == '__main__':
+    # python -m svc_engine [models_dir]: compare both NumPy engines with the
+    # trained SVC on a few fixed rows; exits 1 on any difference
+    import json
+    import os
+    import sys
+    import warnings
+
+    import joblib
+    from model_artifact import current_artifact_dir, open_model_artifact
+
+    warnings.filterwarnings('ignore')
+    models_dir = sys.argv[1] if len(sys.argv) > 1 else '../models'
+    model = joblib.load(os.path.join(models_dir, 'disease_model.pkl'))
+    with open(os.path.join(models_dir, 'symptom_list.json'), 'r') as f:
+        symptom_list = json.load(f)
+    engines = {'exported from disease_model.pkl': NumpySVC(export_svc_arrays(model, symptom_list))}
+    artifact_dir = current_artifact_dir(models_dir)
+    if artifact_dir is not None:
+        engines[f'artifact {os.path.basename(artifact_dir)}'] = open_model_artifact(artifact_dir)[0]
+
+    X = parity_rows(len(symptom_list))
+    failed = False
+    for label, engine in engines.items():
+        problems = check_parity(model, engine, X)
+        worst = np.abs(engine.predict_proba(X) - model.predict_proba(X)).max()
+        print(f"{label}: {'OK' if not problems else 'FAILED'} ({len(X)} rows, max |difference| {worst:.2e})")
+        for problem in problems:
+            print(f"  {problem}")
+        failed = failed or bool(problems)
+    sys.exit(1 if failed else 0)
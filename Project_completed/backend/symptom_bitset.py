@@ -0,0 +1,87 @@
+"""Packed bitset encoding of symptom sets over one symptom_list.
+
+Bit i of a mask is set when symptom_list[i] is present, so a symptom set is
+a single Python int: hashable (cache keys), comparable with & | ^ and
+popcount, and storable in ceil(n / 8) bytes (13 bytes for 98 symptoms).
+Feature matrices for many masks are unpacked in one vectorized call.
+
+Masks only mean something together with the symptom list they were built
+against; `codec_id` identifies that list, and `SymptomBitset.for_symptoms`
+keeps one codec per distinct list in this process. The report store
+persists those lists, and the API registers them at startup, so stored masks
+can still be decoded after a retrain changes the columns and the process
+restarts.
+"""
+import hashlib
+import threading
+
+import numpy as np
+
+
+class SymptomBitset:
+    """Encode/decode symptom sets as bit masks in `symptom_list` order"""
+
+    _codecs = {}
+    _codecs_lock = threading.Lock()
+
+    def __init__(self, symptom_list):
+        self.symptom_list = list(symptom_list)
+        self.n_symptoms = len(self.symptom_list)
+        self.n_bytes = (self.n_symptoms + 7) // 8
+        self.full_mask = (1 << self.n_symptoms) - 1
+        self.bits = {symptom: 1 << idx for idx, symptom in enumerate(self.symptom_list)}
+        self.codec_id = hashlib.sha256('\n'.join(self.symptom_list).encode('utf-8')).hexdigest()[:12]
+
+    @classmethod
+    def for_symptoms(cls, symptom_list):
+        """Shared codec for `symptom_list` (registered so `get` can find it later)"""
+        codec = cls(symptom_list)
+        with cls._codecs_lock:
+            return cls._codecs.setdefault(codec.codec_id, codec)
+
+    @classmethod
+    def get(cls, codec_id):
+        with cls._codecs_lock:
+            return cls._codecs.get(codec_id)
+
+    def encode(self, symptoms):
+        """Mask of the known symptoms in `symptoms`; unknown and non-string items are ignored"""
+        mask = 0
+        bits = self.bits
+        for symptom in symptoms:
+            if isinstance(symptom, str):
+                mask |= bits.get(symptom, 0)
+        return mask
+
+    def decode(self, mask):
+        """Symptom names of `mask`, in symptom_list order"""
+        return [self.symptom_list[idx] for idx in range(mask.bit_length()) if mask >> idx & 1]
+
+    @staticmethod
+    def popcount(mask):
+        """Number of symptoms in a mask (int.bit_count needs Python 3.10)"""
+        return bin(mask).count('1')
+
+    # Serialized forms
+
+    def to_bytes(self, mask):
+        return mask.to_bytes(self.n_bytes, 'little')
+
+    def from_bytes(self, data):
+        return int.from_bytes(data, 'little')
+
+    def from_hex(self, text):
+        """Parse a hex mask (optionally 0x-prefixed); ValueError if invalid or out of range"""
+        mask = int(text, 16)
+        if mask < 0 or mask > self.full_mask:
+            raise ValueError(f'Symptom bitset has bits beyond the {self.n_symptoms} known symptoms!')
+        return mask
+
+    # Feature matrices
+
+    def unpack(self, masks, dtype=np.float64):
+        """0/1 feature matrix with one row per mask (rows in input order)"""
+        packed = np.frombuffer(b''.join(mask.to_bytes(self.n_bytes, 'little') for mask in masks),
+                               dtype=np.uint8).reshape(len(masks), self.n_bytes)
+        bits = np.unpackbits(packed, axis=1, count=self.n_symptoms, bitorder='little')
+        return bits.astype(dtype)
@@ -0,0 +1,255 @@
+"""Resolve free-text symptom names to symptom_list columns.
+
+Each input goes through, in order:
+
+1. exact match against symptom_list (the common case, one dict lookup)
+2. normalization: case folding, any run of spaces/punctuation -> '_',
+   a trailing plural 's' dropped or added, then the synonym table
+3. fuzzy matching: a character trigram index shortlists the closest names.
+   Only a typo inside one word is corrected: the candidate must have the
+   same words except one, that word must not be a body part ('eye' is
+   never turned into 'knee') and `difflib` must score the word pair at
+   least `cutoff`. Closer-looking names that fail this are only returned
+   as suggestions and are not scored.
+
+Steps 1-2 are O(1) per symptom; step 3 is O(k) in the trigram postings it
+touches and its results are memoized, so resolution is cheap enough to run
+on every /predict and /predict-batch row.
+"""
+import difflib
+import re
+import threading
+from collections import Counter
+
+# Common alternative names -> symptom_list column. Entries whose target is
+# not in the model's symptom list are ignored.
+SYMPTOM_SYNONYMS = {
+    'stomach_ache': 'abdominal_pain',
+    'stomachache': 'abdominal_pain',
+    'tummy_ache': 'abdominal_pain',
+    'belly_pain': 'abdominal_pain',
+    'hematuria': 'blood_in_urine',
+    'blurry_vision': 'blurred_vision',
+    'body_aches': 'body_ache',
+    'aching_body': 'body_ache',
+    'painful_urination': 'burning_urination',
+    'dysuria': 'burning_urination',
+    'coughing_up_blood': 'coughing_blood',
+    'hemoptysis': 'coughing_blood',
+    'diarrhoea': 'diarrhea',
+    'loose_stools': 'diarrhea',
+    'breathing_difficulty': 'difficulty_breathing',
+    'trouble_breathing': 'difficulty_breathing',
+    'dizzy': 'dizziness',
+    'lightheadedness': 'dizziness',
+    'vertigo': 'dizziness',
+    'thirst': 'excessive_thirst',
+    'thirsty': 'excessive_thirst',
+    'tired': 'fatigue',
+    'tiredness': 'fatigue',
+    'exhaustion': 'fatigue',
+    'temperature': 'fever',
+    'pyrexia': 'fever',
+    'high_temperature': 'high_fever',
+    'head_ache': 'headache',
+    'ear_ache': 'ear_pain',
+    'earache': 'ear_pain',
+    'back_ache': 'back_pain',
+    'backache': 'back_pain',
+    'neck_ache': 'neck_pain',
+    'knee_ache': 'knee_pain',
+    'eye_ache': 'eye_pain',
+    'itchy_eye': 'itchy_eyes',
+    'no_appetite': 'loss_of_appetite',
+    'poor_appetite': 'loss_of_appetite',
+    'myalgia': 'muscle_pain',
+    'muscle_ache': 'muscle_pain',
+    'sore_muscles': 'muscle_pain',
+    'arthralgia': 'joint_pain',
+    'joint_ache': 'joint_pain',
+    'feeling_sick': 'nausea',
+    'queasiness': 'nausea',
+    'nose_bleed': 'nosebleeds',
+    'nosebleed': 'nosebleeds',
+    'photophobia': 'sensitivity_to_light',
+    'breathlessness': 'shortness_of_breath',
+    'short_of_breath': 'shortness_of_breath',
+    'shivering': 'chills',
+    'throwing_up': 'vomiting',
+    'puking': 'vomiting',
+    'palpitations': 'rapid_heartbeat',
+    'racing_heart': 'rapid_heartbeat',
+    'fast_heartbeat': 'rapid_heartbeat',
+    'stuffy_nose': 'nasal_congestion',
+    'blocked_nose': 'nasal_congestion',
+    'sleeplessness': 'insomnia',
+    'blood_in_stool': 'bloody_stool',
+    'jaundice': 'yellowish_skin',
+    'yellow_skin': 'yellowish_skin',
+    'bruising': 'skin_bruising',
+    'fainting': 'loss_of_consciousness',
+    'passing_out': 'loss_of_consciousness',
+    'pins_and_needles': 'tingling',
+    'shaking': 'tremors',
+    'swollen_glands': 'swollen_lymph_nodes',
+    'hoarseness': 'loss_of_voice',
+    'hoarse_voice': 'loss_of_voice',
+    'acid_reflux': 'heartburn',
+    'heart_burn': 'heartburn',
+    'slurred_speech': 'blurred_speech',
+    'nocturia': 'increased_urination_at_night',
+    'losing_weight': 'weight_loss',
+    'weight_lost': 'weight_loss',
+}
+
+SEPARATORS = re.compile(r'[^a-z0-9]+')
+FUZZY_CUTOFF = 0.85
+SUGGEST_CUTOFF = 0.7
+MAX_SUGGESTIONS = 3
+FUZZY_SHORTLIST = 5
+# Shorter words are never corrected: one changed letter is a different word
+MIN_TYPO_LENGTH = 4
+# Words that name where a symptom is; a fuzzy match must keep them as typed
+BODY_PARTS = frozenset({
+    'abdomen', 'abdominal', 'arm', 'back', 'bladder', 'blood', 'body', 'bowel', 'chest', 'ear',
+    'eye', 'face', 'feet', 'finger', 'foot', 'hand', 'head', 'heart', 'hip', 'jaw', 'joint', 'kidney',
+    'knee', 'leg', 'lip', 'liver', 'lung', 'lymph', 'mouth', 'muscle', 'nail', 'neck', 'nose',
+    'pelvic', 'pelvis', 'shoulder', 'skin', 'stomach', 'stool', 'throat', 'toe', 'tongue', 'tooth',
+    'teeth', 'urine', 'wrist',
+})
+MAX_MEMOIZED = 10000
+
+
+def normalize_name(text):
+    """'Body-Ache ' -> 'body_ache'"""
+    return SEPARATORS.sub('_', text.casefold()).strip('_')
+
+
+def _body_part(word):
+    return word in BODY_PARTS or (word.endswith('s') and word[:-1] in BODY_PARTS)
+
+
+def _typo_score(words, spelling):
+    """Score of `spelling` as a one-word typo of `words`, or None if it is not one"""
+    other = spelling.split('_')
+    if len(other) != len(words):
+        return None
+    changed = [(a, b) for a, b in zip(words, other) if a != b]
+    if len(changed) != 1:
+        return None
+    a, b = changed[0]
+    if min(len(a), len(b)) < MIN_TYPO_LENGTH or _body_part(a) or _body_part(b):
+        return None
+    return difflib.SequenceMatcher(None, a, b).ratio()
+
+
+def _trigrams(name):
+    padded = f'#{name}#'
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SymptomNormalizer:
+    """Index over one symptom list; `resolve` maps raw inputs onto it"""
+
+    def __init__(self, symptom_list, synonyms=SYMPTOM_SYNONYMS, cutoff=FUZZY_CUTOFF):
+        self.cutoff = cutoff
+        known = set(symptom_list)
+        # Every accepted spelling (canonical names and synonyms) -> column
+        self.names = {name: name for name in symptom_list}
+        for alias, target in synonyms.items():
+            if target in known:
+                self.names.setdefault(normalize_name(alias), target)
+
+        # Trigram postings over the accepted spellings, for fuzzy lookups
+        self._spellings = list(self.names)
+        self._gram_counts = []
+        self._postings = {}
+        for pos, spelling in enumerate(self._spellings):
+            grams = _trigrams(spelling)
+            self._gram_counts.append(len(grams))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(pos)
+
+        self._fuzzy_memo = {}
+        self._memo_lock = threading.Lock()
+
+    def _lookup(self, name):
+        target = self.names.get(name)
+        if target is None and len(name) > 3:
+            # Plural/singular variants ('headaches', 'nosebleed')
+            target = self.names.get(name[:-1]) if name.endswith('s') else self.names.get(name + 's')
+        return target
+
+    def _fuzzy(self, name):
+        with self._memo_lock:
+            if name in self._fuzzy_memo:
+                return self._fuzzy_memo[name]
+
+        grams = _trigrams(name)
+        shared = Counter(pos for gram in grams for pos in self._postings.get(gram, ()))
+        best = (None, [])
+        if shared:
+            # Dice coefficient on trigrams picks a shortlist, difflib decides
+            shortlist = sorted(shared, key=lambda pos: 2 * shared[pos] / (len(grams) + self._gram_counts[pos]),
+                               reverse=True)[:FUZZY_SHORTLIST]
+            words = name.split('_')
+            typos = [(score, spelling) for score, spelling in
+                     ((_typo_score(words, self._spellings[pos]), self._spellings[pos]) for pos in shortlist)
+                     if score is not None and score >= self.cutoff]
+            if typos:
+                score, spelling = max(typos)
+                best = ((self.names[spelling], round(score, 3)), [])
+            else:
+                scored = sorted(((difflib.SequenceMatcher(None, name, self._spellings[pos]).ratio(),
+                                  self._spellings[pos]) for pos in shortlist), reverse=True)
+                suggestions = []
+                for score, spelling in scored:
+                    if score < SUGGEST_CUTOFF or len(suggestions) == MAX_SUGGESTIONS:
+                        break
+                    if self.names[spelling] not in suggestions:
+                        suggestions.append(self.names[spelling])
+                best = (None, suggestions)
+
+        with self._memo_lock:
+            if len(self._fuzzy_memo) >= MAX_MEMOIZED:
+                self._fuzzy_memo.clear()
+            self._fuzzy_memo[name] = best
+        return best
+
+    def resolve(self, symptoms):
+        """Return (columns, report) for a list of raw symptom names.
+
+        `columns` is de-duplicated in input order; `report` lists inputs that
+        were mapped (normalized or synonym), corrected (one-word typo, with
+        its score) or unknown (including non-string items). Unknown inputs
+        that resemble a symptom are also listed under suggested, with the
+        closest columns; those are not in `columns`. Exact column names
+        appear in none of the lists.
+        """
+        columns = []
+        seen = set()
+        report = {'mapped': [], 'corrected': [], 'suggested': [], 'unknown': []}
+        for raw in symptoms:
+            if not isinstance(raw, str):
+                report['unknown'].append(raw)
+                continue
+            target = self.names.get(raw)
+            if target is None or target != raw:
+                name = normalize_name(raw)
+                target = self._lookup(name) if name else None
+                if target is not None:
+                    report['mapped'].append({'input': raw, 'symptom': target})
+                elif name:
+                    match, suggestions = self._fuzzy(name)
+                    if match is not None:
+                        target = match[0]
+                        report['corrected'].append({'input': raw, 'symptom': target, 'score': match[1]})
+                    elif suggestions:
+                        report['suggested'].append({'input': raw, 'suggestions': suggestions})
+                if target is None:
+                    report['unknown'].append(raw)
+                    continue
+            if target not in seen:
+                seen.add(target)
+                columns.append(target)
+        return columns, report
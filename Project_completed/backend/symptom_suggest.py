@@ -0,0 +1,151 @@
+"""Symptom autocomplete: prefix trie ranked by co-occurrence.
+
+`SymptomSuggester` is built once per bundle. The trie holds every accepted
+spelling of a symptom (column name, each of its words, synonyms), and every
+node keeps the symptom indices of its whole subtree, so a prefix lookup is
+O(len(prefix)) and returns the candidates directly.
+
+Candidates are ranked by how likely they are to co-occur with the symptoms
+already selected: the average of P(candidate | selected) estimated from the
+training CSV (counts precomputed by train_model.py into
+symptom_cooccurrence.npz) and from disease_symptoms.json. With nothing
+selected, overall prevalence decides.
+"""
+import os
+
+import numpy as np
+
+from symptom_normalizer import normalize_name
+
+COOCCURRENCE_FILE = 'symptom_cooccurrence.npz'
+
+
+def compute_cooccurrence(X):
+    """Symptom x symptom counts of rows where both are present (diagonal = prevalence)"""
+    X = np.asarray(X, dtype=np.int64)
+    return X.T @ X
+
+
+def save_cooccurrence(path, symptom_list, X, y):
+    """Write symptom x symptom counts plus per-disease symptom counts of one dataset"""
+    X = np.asarray(X, dtype=np.int64)
+    y = np.asarray(y).astype(str)
+    diseases = np.unique(y)
+    disease_counts = np.stack([X[y == disease].sum(axis=0) for disease in diseases])
+    np.savez_compressed(path, symptom_list=np.asarray(symptom_list).astype(str),
+                        counts=compute_cooccurrence(X), samples=np.array(len(X)),
+                        diseases=diseases, disease_counts=disease_counts,
+                        disease_totals=np.array([(y == disease).sum() for disease in diseases]))
+
+
+def load_cooccurrence(models_dir, symptom_list):
+    """Arrays of symptom_cooccurrence.npz, or None if missing or built for other columns"""
+    path = os.path.join(models_dir, COOCCURRENCE_FILE)
+    if not os.path.exists(path):
+        return None
+    with np.load(path, allow_pickle=False) as data:
+        if [str(name) for name in data['symptom_list']] != list(symptom_list):
+            print(f"⚠ {COOCCURRENCE_FILE} does not match the symptom list, ranking by catalog only")
+            return None
+        return {key: data[key] for key in data.files}
+
+
+def _conditional(counts):
+    # P(column | row) = count(row & column) / count(row); rows never seen stay 0
+    totals = np.diag(counts).astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        conditional = np.where(totals[:, None] > 0, counts / totals[:, None], 0.0)
+    np.fill_diagonal(conditional, 0.0)
+    return conditional
+
+
+class _TrieNode:
+    __slots__ = ('children', 'symptoms')
+
+    def __init__(self):
+        self.children = {}
+        self.symptoms = set()
+
+
+class SymptomSuggester:
+    """Prefix trie over symptom spellings plus a co-occurrence ranking matrix"""
+
+    def __init__(self, symptom_list, spellings, disease_symptoms=None, csv_counts=None):
+        self.symptom_list = list(symptom_list)
+        self.symptom_index = {symptom: idx for idx, symptom in enumerate(self.symptom_list)}
+        self.labels = [symptom.replace('_', ' ').title() for symptom in self.symptom_list]
+
+        # Trie over full spellings and every word start inside them, so both
+        # 'body a' and 'ache' reach body_ache; synonyms reach their column
+        root = _TrieNode()
+        for spelling, symptom in spellings.items():
+            idx = self.symptom_index[symptom]
+            words = spelling.split('_')
+            for start in range(len(words)):
+                node = root
+                for char in '_'.join(words[start:]):
+                    node = node.children.setdefault(char, _TrieNode())
+                    node.symptoms.add(idx)
+        # Frozen as sorted index arrays for vectorized ranking
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            node.symptoms = np.array(sorted(node.symptoms), dtype=np.int64)
+            stack.extend(node.children.values())
+        self._root = root
+        self._all = np.arange(len(self.symptom_list))
+
+        # Co-occurrence from the catalog mapping (disease x symptom incidence)
+        n = len(self.symptom_list)
+        incidence = np.zeros((len(disease_symptoms or {}), n), dtype=np.int64)
+        for row, symptoms in enumerate((disease_symptoms or {}).values()):
+            for symptom in symptoms:
+                if symptom in self.symptom_index:
+                    incidence[row, self.symptom_index[symptom]] = 1
+        sources = [compute_cooccurrence(incidence)]
+        if csv_counts is not None:
+            sources.append(np.asarray(csv_counts))
+        sources = [counts for counts in sources if counts.trace() > 0]
+
+        if sources:
+            self.affinity = sum(_conditional(counts) for counts in sources) / len(sources)
+            self.prevalence = sum(np.diag(counts) / np.diag(counts).sum() for counts in sources) / len(sources)
+        else:
+            self.affinity = np.zeros((n, n))
+            self.prevalence = np.zeros(n)
+
+    def _prefix_node(self, prefix):
+        node = self._root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def suggest(self, query, selected=(), limit=10):
+        """Top `limit` [{symptom, label, score}] matching `query`, excluding `selected`"""
+        prefix = normalize_name(query) if query else ''
+        if prefix:
+            node = self._prefix_node(prefix)
+            if node is None:
+                return []
+            candidates = node.symptoms
+        else:
+            candidates = self._all
+
+        selected_idx = [self.symptom_index[s] for s in selected if s in self.symptom_index]
+        if selected_idx:
+            candidates = candidates[~np.isin(candidates, selected_idx)]
+            scores = self.affinity[np.ix_(selected_idx, candidates)].mean(axis=0)
+        else:
+            scores = self.prevalence[candidates]
+        if not len(candidates):
+            return []
+
+        # Highest score first; prevalence, then name order break ties
+        order = np.lexsort((candidates, -self.prevalence[candidates], -scores))[:limit]
+        return [{
+            'symptom': self.symptom_list[candidates[pos]],
+            'label': self.labels[candidates[pos]],
+            'score': round(float(scores[pos]), 4)
+        } for pos in order]
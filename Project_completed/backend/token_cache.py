@@ -0,0 +1,94 @@
+"""Cache of already verified JWTs for token_required.
+
+The frontend replays the same token on every authenticated call for its
+whole 24 hour lifetime, so verifying it once is enough: entries are keyed by
+the SHA-256 digest of the raw token (an exact match on every byte, including
+the signature) and expire at the token's own `exp`.
+
+Logging out revokes a token in the report store, which every API process
+shares and which survives restarts; callers check it before trusting a cache
+hit, and `discard(token)` drops the local entry. `clear()` empties the cache, e.g.
+when the signing secret changes; as in PredictionCache, callers pass the
+`generation` they read before verifying, so a token checked against the old
+secret while `clear()` runs is not cached.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+def token_digest(token):
+    return hashlib.sha256(token.encode('utf-8')).digest()
+
+
+class TokenCache:
+    """Thread-safe LRU of token digest -> (username, exp) bounded by entry count"""
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.generation = 0
+
+    def get(self, token):
+        """(username, exp) of a cached, unexpired token, else None"""
+        key = token_digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[1] <= time.time():
+                del self._entries[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, token, username, exp, generation=None):
+        """Remember a token verified by jwt.decode until its `exp` (unix time)"""
+        if exp is None or exp <= time.time():
+            return
+        key = token_digest(token)
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = (username, exp)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, token):
+        """Forget `token` (it was revoked)"""
+        with self._lock:
+            if self._entries.pop(token_digest(token), None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self.generation += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'expired': self.expired,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
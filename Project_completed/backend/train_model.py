@@ -10,12 +10,23 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import os
 
+from chart_data import compute_chart_data, write_chart_data
+from model_artifact import write_model_artifact
+from svc_engine import export_svc_arrays, NumpySVC
+from symptom_suggest import save_cooccurrence
+
 print("=" * 60)
 print("DIAGNO AI - MODEL TRAINING SYSTEM")
 print("=" * 60)
 
+# Output directory (the API trains into a staging directory before hot-swapping)
+MODELS_DIR = os.environ.get('DIAGNO_MODELS_DIR', '../models')
+
+# Parallel jobs for permutation importances (-1 = all cores)
+TRAIN_JOBS = int(os.environ.get('DIAGNO_TRAIN_JOBS', '-1'))
+
 # Create necessary directories
-os.makedirs('../models', exist_ok=True)
+os.makedirs(MODELS_DIR, exist_ok=True)
 os.makedirs('../data', exist_ok=True)
 
 # Load existing dataset with expanded symptoms
@@ -84,20 +95,34 @@ plt.xlabel('Predicted Disease', fontsize=12)
 plt.xticks(rotation=45, ha='right')
 plt.yticks(rotation=0)
 plt.tight_layout()
-plt.savefig('../models/confusion_matrix.png', dpi=300, bbox_inches='tight')
-print("✓ Confusion matrix saved to: ../models/confusion_matrix.png")
+confusion_matrix_path = os.path.join(MODELS_DIR, 'confusion_matrix.png')
+plt.savefig(confusion_matrix_path, dpi=300, bbox_inches='tight')
+print(f"✓ Confusion matrix saved to: {confusion_matrix_path}")
 
 # Save Model
-model_path = '../models/disease_model.pkl'
+model_path = os.path.join(MODELS_DIR, 'disease_model.pkl')
 joblib.dump(model, model_path)
 print(f"\n✓ Model saved to: {model_path}")
 
+# NumPy inference engine (saved below as the model artifact); check parity on the full dataset
+engine = NumpySVC(export_svc_arrays(model, feature_names=all_symptoms))
+parity_error = np.abs(engine.predict_proba(X.to_numpy(dtype=np.float64)) - model.predict_proba(X)).max()
+print(f"✓ NumPy SVC engine matches predict_proba (max |Δp| = {parity_error:.2e})")
+if parity_error > 1e-3:
+    raise SystemExit(f"NumPy SVC export does not match predict_proba (max error {parity_error:.2e})!")
+
 # Save symptom list
-symptom_list_path = '../models/symptom_list.json'
+symptom_list_path = os.path.join(MODELS_DIR, 'symptom_list.json')
 with open(symptom_list_path, 'w') as f:
     json.dump(all_symptoms, f, indent=2)
 print(f"✓ Symptom list saved to: {symptom_list_path}")
 
+# Symptom co-occurrence and per-disease symptom counts over the full dataset
+# (autocomplete ranking and next-question likelihoods)
+cooccurrence_path = os.path.join(MODELS_DIR, 'symptom_cooccurrence.npz')
+save_cooccurrence(cooccurrence_path, all_symptoms, X.to_numpy(), y.to_numpy())
+print(f"✓ Symptom co-occurrence saved to: {cooccurrence_path}")
+
 # Save disease information
 disease_info = {
     'Flu': {
@@ -262,7 +287,7 @@ disease_info = {
     }
 }
 
-disease_info_path = '../models/disease_info.json'
+disease_info_path = os.path.join(MODELS_DIR, 'disease_info.json')
 with open(disease_info_path, 'w') as f:
     json.dump(disease_info, f, indent=2)
 print(f"✓ Disease information saved to: {disease_info_path}")
@@ -278,11 +303,23 @@ metrics = {
     'kernel': 'RBF (Radial Basis Function)'
 }
 
-metrics_path = '../models/model_metrics.json'
+metrics_path = os.path.join(MODELS_DIR, 'model_metrics.json')
 with open(metrics_path, 'w') as f:
     json.dump(metrics, f, indent=2)
 print(f"✓ Model metrics saved to: {metrics_path}")
 
+# Write the fast-loading artifact (memory-mappable arrays + manifest)
+manifest = write_model_artifact(engine, MODELS_DIR, all_symptoms, metrics)
+artifact_path = manifest['directory']
+print(f"✓ Model artifact saved to: {artifact_path} (sha256 {manifest['content_hash'][:12]})")
+
+# Insights chart data, computed from the dataset and the held-out split
+print("\nComputing insights chart data (permutation importances)...")
+chart_data = compute_chart_data(model, engine, X, y, X_train, y_train, X_test, y_test, disease_info,
+                                content_hash=manifest['content_hash'], n_jobs=TRAIN_JOBS)
+chart_data_path = write_chart_data(chart_data, MODELS_DIR)
+print(f"✓ Chart data saved to: {chart_data_path}")
+
 print("\n" + "=" * 60)
 print("MODEL TRAINING COMPLETED SUCCESSFULLY!")
 print("=" * 60)
@@ -291,6 +328,9 @@ print(f"  1. Model: {model_path}")
 print(f"  2. Symptoms: {symptom_list_path}")
 print(f"  3. Disease Info: {disease_info_path}")
 print(f"  4. Metrics: {metrics_path}")
-print(f"  5. Confusion Matrix: ../models/confusion_matrix.png")
-print(f"  6. Dataset: ../data/disease_symptom_dataset.csv")
+print(f"  5. Confusion Matrix: {confusion_matrix_path}")
+print(f"  6. Model Artifact: {artifact_path}")
+print(f"  7. Chart Data: {chart_data_path}")
+print(f"  8. Symptom Co-occurrence: {cooccurrence_path}")
+print(f"  9. Dataset: ../data/disease_symptom_dataset.csv")
 print("\n✓ Ready to run Flask API server!")
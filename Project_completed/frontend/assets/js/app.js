@@ -59,8 +59,11 @@ function updateNavigation() {
 }
 
 // Logout Function
-function logout() {
+async function logout() {
     if (confirm('Are you sure you want to logout?')) {
+        // Revoke the token server-side too (stored with the accounts, so every
+        // server process rejects it even if copied)
+        await apiRequest('/logout', 'POST', null, true);
         removeToken();
         showAlert('Logged out successfully!', 'success');
         setTimeout(() => {